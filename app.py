@@ -3,12 +3,16 @@ My Opus Archive - 클래식 공연 연주 내역 관리 웹앱 (v2.0 - 개선판
 """
 
 import streamlit as st
-import json
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import os
-import time
-from datetime import datetime
 from pathlib import Path
 
+from opus_archive import metrics
+from opus_archive.exporter import EXPORT_FORMATS
+from opus_archive.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, get_runner
+from opus_archive.ranking import POPULAR, TOP_K, TRENDING
+from opus_archive.service import SEARCH_SORTS, export_file_name, get_archive
+
 # ==================== 설정 ====================
 st.set_page_config(
     page_title="My Opus Archive",
@@ -19,26 +23,18 @@ st.set_page_config(
 
 # 데이터 저장 경로
 DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
-USERS_FILE = DATA_DIR / "users.json"
-PERFORMANCES_FILE = DATA_DIR / "performances.json"
-COMMENTS_FILE = DATA_DIR / "comments.json"
-LIKES_FILE = DATA_DIR / "likes.json"
-CATEGORIES_FILE = DATA_DIR / "categories.json"
-
-# ==================== 데이터 로드/저장 함수 ====================
-
-def load_json(file_path):
-    """JSON 파일 로드"""
-    if file_path.exists():
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def save_json(file_path, data):
-    """JSON 파일 저장"""
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+
+# 데이터 함수 (opus_archive.service.Archive - 프로세스 동안 하나를 재사용)
+# 저장소 백엔드는 OPUS_STORAGE_BACKEND=json|jsonlog|sqlite (기본값 json)
+archive = get_archive(DATA_DIR)
+
+# 오래 걸리는 작업(연쇄 삭제, 카테고리 일괄 변경)은 프로세스 공용 작업 실행기에서 - 세션은 작업 ID만 보관
+runner = get_runner()
+
+# 로컬 JSON API (OPUS_API_PORT가 있을 때만) - 같은 Archive를 쓰므로 캐시를 공유, 프로세스당 한 번만 띄움
+if os.environ.get("OPUS_API_PORT"):
+    from opus_archive import api
+    api.start_background(archive, port=int(os.environ["OPUS_API_PORT"]))
 
 # ==================== 초기 세션 상태 ====================
 
@@ -49,235 +45,269 @@ if 'logged_in' not in st.session_state:
     st.session_state.comment_submitted = False
     st.session_state.editing_perf_id = None
     st.session_state.active_auth_tab = 0  # 0: 로그인, 1: 회원가입
+    st.session_state.auth_notice = None
+    st.session_state.jobs = []  # 이 세션이 시작한 백그라운드 작업 ID
 
-# ==================== 사용자 관리 함수 ====================
+# ==================== 성능 계측 (OPUS_METRICS=1일 때만) ====================
 
-def register_user(username, email, password):
-    """사용자 등록"""
-    users = load_json(USERS_FILE)
-    
-    if username in users:
-        return False, "이미 존재하는 사용자명입니다."
-    
-    if any(user['email'] == email for user in users.values()):
-        return False, "이미 등록된 이메일입니다."
-    
-    users[username] = {
-        'email': email,
-        'password': password,  # ⚠️ 실제 운영 환경에서는 해싱 필요
-        'created_at': datetime.now().isoformat()
-    }
-    save_json(USERS_FILE, users)
-    return True, "회원가입이 완료되었습니다."
-
-def login_user(username, password):
-    """사용자 로그인"""
-    users = load_json(USERS_FILE)
-    
-    if username not in users:
-        return False, "존재하지 않는 사용자입니다."
-    
-    if users[username]['password'] != password:
-        return False, "비밀번호가 일치하지 않습니다."
-    
-    return True, "로그인 성공"
+if metrics.enabled():
+    # 스크립트 스레드가 아닌 곳(다운로드 생성, 백그라운드 스레드)에서는 session_state를 읽지 않음
+    metrics.set_page_provider(
+        lambda: st.session_state.get('current_page') if get_script_run_ctx(suppress_warning=True) else None
+    )
+    # st.rerun()/st.stop()으로 끝나 닫히지 않은 이전 리런은 여기서 닫음
+    metrics.end_rerun(st.session_state.get('metrics_rerun'), interrupted=True)
+    st.session_state.metrics_rerun = metrics.begin_rerun(st.session_state.current_page)
 
-# ==================== 연주 내역 관리 함수 ====================
+# ==================== 통계 ====================
 
-def add_performance(user_id, data):
-    """연주 내역 추가"""
-    performances = load_json(PERFORMANCES_FILE)
-    
-    perf_id = f"perf_{datetime.now().timestamp()}"
-    performances[perf_id] = {
-        'id': perf_id,
-        'user_id': user_id,
-        'date': data['date'],
-        'venue': data['venue'],
-        'pieces': data['pieces'],
-        'instrument': data['instrument'],
-        'sub_part': data['sub_part'],
-        'is_guest': data['is_guest'],
-        'guest_fee': data.get('guest_fee', ''),
-        'conductor': data['conductor'],
-        'ensemble_name': data['ensemble_name'],
-        'is_public': data['is_public'],
-        'youtube_url': data.get('youtube_url', ''),
-        'poster_url': data.get('poster_url', ''),
-        'created_at': datetime.now().isoformat()
-    }
-    save_json(PERFORMANCES_FILE, performances)
-    return perf_id
-
-def get_user_performances(username):
-    """사용자의 연주 내역 조회"""
-    performances = load_json(PERFORMANCES_FILE)
-    user_perfs = [p for p in performances.values() if p['user_id'] == username]
-    return sorted(user_perfs, key=lambda x: x['date'], reverse=True)
-
-def get_public_performances():
-    """공개 연주 내역 조회"""
-    performances = load_json(PERFORMANCES_FILE)
-    public_perfs = [p for p in performances.values() if p['is_public']]
-    return sorted(public_perfs, key=lambda x: x['date'], reverse=True)
-
-def delete_performance(perf_id):
-    """연주 내역 삭제"""
-    performances = load_json(PERFORMANCES_FILE)
-    if perf_id in performances:
-        del performances[perf_id]
-        save_json(PERFORMANCES_FILE, performances)
-        
-        # 댓글과 좋아요도 함께 삭제
-        comments = load_json(COMMENTS_FILE)
-        comments = {k: v for k, v in comments.items() if v['performance_id'] != perf_id}
-        save_json(COMMENTS_FILE, comments)
-        
-        likes = load_json(LIKES_FILE)
-        likes = {k: v for k, v in likes.items() if v['performance_id'] != perf_id}
-        save_json(LIKES_FILE, likes)
-        
-        return True
-    return False
-
-def update_performance(perf_id, data):
-    """연주 내역 수정"""
-    performances = load_json(PERFORMANCES_FILE)
-    if perf_id in performances:
-        performances[perf_id].update(data)
-        performances[perf_id]['updated_at'] = datetime.now().isoformat()
-        save_json(PERFORMANCES_FILE, performances)
-        return True
-    return False
-
-# ==================== 댓글 기능 ====================
-
-def add_comment(performance_id, user_id, content):
-    """댓글 추가"""
-    comments = load_json(COMMENTS_FILE)
-    comment_id = f"comment_{datetime.now().timestamp()}"
-    comments[comment_id] = {
-        'id': comment_id,
-        'performance_id': performance_id,
-        'user_id': user_id,
-        'content': content,
-        'created_at': datetime.now().isoformat()
-    }
-    save_json(COMMENTS_FILE, comments)
-    return comment_id
-
-def get_comments(performance_id):
-    """댓글 조회"""
-    comments = load_json(COMMENTS_FILE)
-    perf_comments = [c for c in comments.values() if c['performance_id'] == performance_id]
-    return sorted(perf_comments, key=lambda x: x['created_at'])
-
-def delete_comment(comment_id):
-    """댓글 삭제"""
-    comments = load_json(COMMENTS_FILE)
-    if comment_id in comments:
-        del comments[comment_id]
-        save_json(COMMENTS_FILE, comments)
-        return True
-    return False
-
-# ==================== 좋아요 기능 ====================
-
-def toggle_like(performance_id, user_id):
-    """좋아요 토글"""
-    likes = load_json(LIKES_FILE)
-    like_key = f"{performance_id}_{user_id}"
+def render_count_table(counts, label):
+    """[(값, 공연 수)] 표"""
+    st.dataframe([{label: value, "공연 수": count} for value, count in counts], hide_index=True)
+
+# ==================== 일괄 가져오기 ====================
+
+# 가져오기 파일 예시 (CSV)
+IMPORT_SAMPLE_CSV = (
+    "날짜,장소,곡목,악기,세부 파트,지휘자,단체명,객원,페이,공개\n"
+    "2023-11-04,예술의전당 콘서트홀,차이코프스키 교향곡 5번|브람스 대학축전 서곡,바이올린,1st Violin,"
+    "라포 시닉,서울 필하모닉,예,200000,예\n"
+)
+
+# ==================== 내보내기 ====================
+
+def render_export_button(fmt, user_id=None, key="export"):
+    """내보내기 다운로드 버튼 - 파일은 버튼을 누를 때 별도 스레드에서 조각 단위로 만듦
+
+    user_id가 없으면 공개 아카이브 전체를 내보냅니다.
+    """
+    st.download_button(
+        f"📥 {fmt.upper()} 다운로드",
+        data=lambda: archive.export_stream(fmt, user_id),
+        file_name=export_file_name(fmt, user_id),
+        mime=EXPORT_FORMATS[fmt][0],
+        on_click="ignore",
+        key=key
+    )
+
+# ==================== 페이지네이션 ====================
+
+PAGE_SIZE_OPTIONS = [10, 20, 50, 100]
+
+# 공개 아카이브 정렬 (None이면 최신순 페이지, 나머지는 미리 정렬해 둔 순위의 상위 TOP_K건)
+PUBLIC_ORDERS = {"🆕 최신순": None, "❤️ 인기순": POPULAR, "🔥 급상승": TRENDING}
+
+def reset_page_cursors():
+    """모든 목록을 첫 페이지로 (페이지 크기가 바뀌었을 때)"""
+    for key in [k for k in st.session_state if str(k).endswith('_cursors')]:
+        del st.session_state[key]
+
+def get_page_cursor(list_key):
+    """현재 페이지 커서 (세션별로 지나온 페이지 커서를 스택으로 보관)"""
+    if f"{list_key}_cursors" not in st.session_state:
+        st.session_state[f"{list_key}_cursors"] = [None]
+    return st.session_state[f"{list_key}_cursors"][-1]
+
+def render_pager(list_key, next_cursor, total, page_size):
+    """이전/다음 버튼과 페이지 위치 표시"""
+    cursors = st.session_state[f"{list_key}_cursors"]
+    total_pages = max(1, -(-total // page_size))
     
-    if like_key in likes:
-        del likes[like_key]
-        save_json(LIKES_FILE, likes)
-        return False, "좋아요 취소"
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ 이전", key=f"{list_key}_prev", use_container_width=True, disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"{len(cursors)} / {total_pages} 페이지")
+    with col3:
+        if st.button("다음 ▶", key=f"{list_key}_next", use_container_width=True, disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+# ==================== 좋아요/댓글 fragment ====================
+# 좋아요/댓글 버튼은 st.fragment 안에 있어서 누르면 해당 카드의 fragment만 다시 실행됩니다.
+# 처음 그릴 때는 페이지에서 한 번에 조회한 값을 인자로 받고, 버튼 콜백이 그 공연 것만 다시
+# 조회해서 card_updates에 넣어 두면 fragment가 인자 대신 그 값을 씁니다.
+# card_updates는 전체 리런마다 비우므로 (reset_card_updates) 다른 사람의 변경도 그때 반영됩니다.
+
+def reset_card_updates():
+    """전체 리런 시작 시 호출 - fragment가 갱신한 값 버리기 (아직 표시하지 않은 메시지는 유지)"""
+    updates = st.session_state.get('card_updates', {})
+    st.session_state.card_updates = {k: v for k, v in updates.items() if k[0] == 'message'}
+
+def on_like_click(perf_id):
+    """좋아요 버튼 콜백 - 토글 후 이 공연의 좋아요 상태만 다시 조회"""
+    user_id = st.session_state.current_user
+    liked, _ = archive.toggle_like(perf_id, user_id)
+    st.session_state.card_updates[('like', perf_id)] = (archive.get_like_count(perf_id), liked)
+
+def on_comment_submit(perf_id):
+    """댓글 작성 콜백 (입력 필드는 콜백 안에서만 비울 수 있음)"""
+    content = st.session_state[f"comment_{perf_id}"]
+    if content.strip():
+        archive.add_comment(perf_id, st.session_state.current_user, content)
+        st.session_state[f"comment_{perf_id}"] = ""
+        st.session_state.card_updates[('message', perf_id)] = ('success', "댓글이 등록되었습니다!")
     else:
-        likes[like_key] = {
-            'performance_id': performance_id,
-            'user_id': user_id,
-            'created_at': datetime.now().isoformat()
-        }
-        save_json(LIKES_FILE, likes)
-        return True, "좋아요 완료"
-
-def get_like_count(performance_id):
-    """좋아요 개수 조회"""
-    likes = load_json(LIKES_FILE)
-    return len([l for l in likes.values() if l['performance_id'] == performance_id])
-
-def is_liked_by_user(performance_id, user_id):
-    """사용자가 이미 좋아요했는지 확인"""
-    likes = load_json(LIKES_FILE)
-    like_key = f"{performance_id}_{user_id}"
-    return like_key in likes
-
-# ==================== 검색/필터 함수 ====================
-
-def filter_performances(performances, filters):
-    """연주 내역 필터링"""
-    result = performances
-    
-    if filters['venue']:
-        result = [p for p in result if filters['venue'].lower() in p['venue'].lower()]
-    
-    if filters['conductor']:
-        result = [p for p in result if filters['conductor'].lower() in p['conductor'].lower()]
+        st.session_state.card_updates[('message', perf_id)] = ('warning', "댓글을 입력해주세요.")
+    st.session_state.card_updates[('comments', perf_id)] = archive.get_comments(perf_id)
+
+def on_comment_delete(perf_id, comment_id):
+    """댓글 삭제 콜백"""
+    if archive.delete_comment(comment_id):
+        st.session_state.card_updates[('message', perf_id)] = ('success', "댓글이 삭제되었습니다.")
+    st.session_state.card_updates[('comments', perf_id)] = archive.get_comments(perf_id)
+
+@st.fragment
+def render_like_button(perf_id, like_count, is_liked):
+    """좋아요 버튼 (fragment)"""
+    like_count, is_liked = st.session_state.card_updates.get(('like', perf_id), (like_count, is_liked))
+    like_button_text = f"❤️ {like_count}" if is_liked else f"🤍 {like_count}"
+    st.button(like_button_text, key=f"like_{perf_id}", use_container_width=True,
+              on_click=on_like_click, args=(perf_id,))
+
+@st.fragment
+def render_comments(perf_id, comments):
+    """댓글 목록과 입력창 (fragment)"""
+    comments = st.session_state.card_updates.get(('comments', perf_id), comments)
     
-    if filters['ensemble']:
-        result = [p for p in result if filters['ensemble'].lower() in p['ensemble_name'].lower()]
-    
-    if filters['instrument']:
-        result = [p for p in result if filters['instrument'].lower() in p['instrument'].lower()]
+    st.markdown("**💬 댓글**")
+    if comments:
+        for comment in comments:
+            comment_col1, comment_col2 = st.columns([4, 1])
+            with comment_col1:
+                with st.container(border=True):
+                    st.caption(f"👤 **{comment['user_id']}**")
+                    st.write(comment['content'])
+            with comment_col2:
+                if comment['user_id'] == st.session_state.current_user:
+                    st.button("🗑️", key=f"delete_comment_{comment['id']}",
+                              on_click=on_comment_delete, args=(perf_id, comment['id']))
+    else:
+        st.caption("_등록된 댓글이 없습니다._")
     
-    if filters['date_from']:
-        result = [p for p in result if p['date'] >= filters['date_from']]
+    st.divider()
     
-    if filters['date_to']:
-        result = [p for p in result if p['date'] <= filters['date_to']]
+    # 댓글 입력
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.text_input("💬 댓글 작성", placeholder="댓글을 입력하세요...",
+                      key=f"comment_{perf_id}", label_visibility="collapsed")
+    with col2:
+        st.button("작성", key=f"submit_comment_{perf_id}", use_container_width=True,
+                  on_click=on_comment_submit, args=(perf_id,))
     
-    return result
-
-# ==================== 드롭다운 카테고리 관리 ====================
-
-def get_default_categories():
-    """기본 카테고리"""
-    return {
-        'venues': ['예술의전당 콘서트홀', '세종문화회관', 'LG아트센터', '강남심포니 홀'],
-        'instruments': ['바이올린', '비올라', '첼로', '콘트라베이스', '플루트', '클라리넷', '오보에'],
-        'sub_parts': ['1st Violin', '2nd Violin', 'Viola', 'Cello', 'Bass', 'Solo']
-    }
-
-def load_categories():
-    """카테고리 로드 (없으면 기본값 생성)"""
-    if CATEGORIES_FILE.exists():
-        return load_json(CATEGORIES_FILE)
+    message = st.session_state.card_updates.pop(('message', perf_id), None)
+    if message is not None:
+        kind, text = message
+        (st.success if kind == 'success' else st.warning)(text)
+
+# ==================== 성능 디버그 패널 ====================
+
+def render_metrics_panel():
+    """사이드바 성능 디버그 패널 - 직전 리런의 함수별 시간/바이트와 현재 페이지의 누적 p50/p99"""
+    with st.sidebar.expander("🛠️ 성능 디버그"):
+        last = st.session_state.get('metrics_last_rerun')
+        if last:
+            st.caption(f"직전 리런 ({last['page']}): 전체 {last['total_ms']:.1f}ms | "
+                       f"데이터 함수 밖(렌더링 등) {last['other_ms']:.1f}ms")
+            calls = sorted(last['calls'].items(), key=lambda item: -item[1]['ms'])
+            st.dataframe([{"함수": name, "호출": c['calls'], "ms": c['ms'],
+                           "읽음(B)": c['bytes_read'], "씀(B)": c['bytes_written']} for name, c in calls],
+                         hide_index=True)
+        
+        page = st.session_state.get('current_page')
+        rows = [{"함수": s['name'], "호출": s['calls'], "p50(ms)": round(s['p50_ms'], 2), "p99(ms)": round(s['p99_ms'], 2)}
+                for s in metrics.snapshot() if s['page'] == page]
+        st.caption(f"'{page}' 페이지 누적 (이 서버 프로세스)")
+        st.dataframe(sorted(rows, key=lambda row: -row["p99(ms)"]), hide_index=True)
+
+# ==================== 백그라운드 작업 ====================
+# 작업은 opus_archive.jobs 실행기 스레드에서 돌고, 세션은 작업 ID 목록(jobs)만 들고 있습니다.
+# 끝나지 않은 작업이 있으면 사이드바 목록만 fragment로 JOB_POLL_SECONDS마다 다시 그리고,
+# 모두 끝나면 전체 리런 한 번으로 페이지(목록, 카테고리)에 결과를 반영합니다.
+
+JOB_POLL_SECONDS = 1.0
+JOB_STATUS_LABELS = {QUEUED: "⏳ 대기", RUNNING: "🔄 진행 중", DONE: "✅ 완료", FAILED: "❌ 실패", CANCELLED: "⛔ 취소됨"}
+
+def start_job(name, fn, *args):
+    """백그라운드 작업 시작 (fn은 progress 인자를 받는 Archive 메서드)"""
+    job_id = runner.submit(name, fn, *args, owner=st.session_state.current_user)
+    st.session_state.jobs = st.session_state.get('jobs', []) + [job_id]
+    return job_id
+
+def session_jobs():
+    """이 세션의 작업 (보관 기간이 지나 사라진 것은 목록에서도 뺌)"""
+    jobs = [runner.get(job_id) for job_id in st.session_state.get('jobs', [])]
+    st.session_state.jobs = [job.id for job in jobs if job is not None]
+    return [job for job in jobs if job is not None]
+
+def on_job_close(job_id):
+    """끝난 작업을 목록에서 지우기"""
+    runner.forget(job_id)
+    st.session_state.jobs = [i for i in st.session_state.jobs if i != job_id]
+
+def render_job(job):
+    """작업 한 줄 - 진행률 막대와 취소/닫기 버튼"""
+    job = job.snapshot()
+    status = JOB_STATUS_LABELS[job['status']]
+    if job['status'] == RUNNING and job['cancel_requested']:
+        status = "⛔ 취소 중"
+    st.caption(f"**{job['name']}** · {status}")
+    if job['status'] in (QUEUED, RUNNING):
+        progress = f"{job['done']:,} / {job['total']:,}" if job['total'] else ""
+        st.progress(job['fraction'] or 0.0, text=progress)
+        st.button("취소", key=f"job_cancel_{job['id']}", disabled=job['cancel_requested'],
+                  on_click=runner.cancel, args=(job['id'],))
     else:
-        categories = get_default_categories()
-        save_json(CATEGORIES_FILE, categories)
-        return categories
-
-def save_categories(categories):
-    """카테고리 저장"""
-    save_json(CATEGORIES_FILE, categories)
-
-def add_category(category_type, value):
-    """카테고리 추가"""
-    categories = load_categories()
-    if value not in categories[category_type]:
-        categories[category_type].append(value)
-        save_categories(categories)
-        return True
-    return False
-
-def remove_category(category_type, value):
-    """카테고리 삭제"""
-    categories = load_categories()
-    if value in categories[category_type]:
-        categories[category_type].remove(value)
-        save_categories(categories)
-        return True
-    return False
+        if job['status'] == DONE and isinstance(job['result'], int):
+            st.caption(f"{job['result']:,}건 처리")
+        elif job['status'] == FAILED:
+            st.caption(job['error'])
+        elif job['status'] == CANCELLED and job['done']:
+            st.caption(f"취소 전까지 {job['done']:,} / {job['total']:,}건 처리")
+        st.button("닫기", key=f"job_close_{job['id']}", on_click=on_job_close, args=(job['id'],))
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def render_running_jobs():
+    """진행 중인 작업이 있을 때의 작업 목록 (fragment - 주기적으로 이것만 다시 실행)"""
+    jobs = session_jobs()
+    for job in jobs:
+        render_job(job)
+    if all(job.finished for job in jobs):
+        st.rerun()   # 결과를 페이지에 반영하고 주기적 실행을 멈춤
+
+def render_jobs():
+    """사이드바 작업 목록"""
+    jobs = session_jobs()
+    if not jobs:
+        return
+    with st.sidebar:
+        st.markdown("**🧰 작업**")
+        if all(job.finished for job in jobs):
+            for job in jobs:
+                render_job(job)
+        else:
+            render_running_jobs()
+        st.markdown("---")
+
+def render_category_rename(category_type, values, label):
+    """카테고리 값 이름 바꾸기 - 그 값을 쓰는 연주 내역까지 백그라운드 작업으로 바꿈"""
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        old = st.selectbox(f"바꿀 {label}", values, key=f"rename_{category_type}_old")
+    with col2:
+        new = st.text_input("새 이름", key=f"rename_{category_type}_new")
+    with col3:
+        st.write("")
+        if st.button("✏️ 바꾸기", key=f"rename_{category_type}", disabled=not old or not new.strip()):
+            if new.strip() == old:
+                st.warning("같은 이름입니다.")
+            else:
+                start_job(f"{label} 이름 바꾸기: '{old}' → '{new.strip()}'",
+                          archive.rename_category, category_type, old, new.strip())
+                st.rerun()
 
 # ==================== UI: 헤더 ====================
 
@@ -297,8 +327,8 @@ if st.session_state.logged_in:
     st.sidebar.markdown("---")
     
     # 페이지 네비게이션 (사이드바)
-    pages = ["내 연주 내역", "새 연주 기록", "공개 아카이브", "검색/필터", "설정 관리"]
-    icons = ["📚", "✏️", "🌍", "🔍", "⚙️"]
+    pages = ["내 연주 내역", "새 연주 기록", "공개 아카이브", "연주 통계", "검색/필터", "가져오기", "설정 관리"]
+    icons = ["📚", "✏️", "🌍", "📊", "🔍", "📥", "⚙️"]
     
     for page, icon in zip(pages, icons):
         if st.sidebar.button(
@@ -308,6 +338,15 @@ if st.session_state.logged_in:
         ):
             st.session_state.current_page = page
             st.rerun()
+    
+    st.sidebar.markdown("---")
+    st.sidebar.selectbox("페이지당 표시 개수", PAGE_SIZE_OPTIONS, index=1,
+                         key="page_size", on_change=reset_page_cursors)
+    
+    render_jobs()
+
+if metrics.enabled():
+    render_metrics_panel()
 
 # ==================== UI: 메인 콘텐츠 ====================
 
@@ -339,11 +378,14 @@ if not st.session_state.logged_in:
         # 로그인 화면
         if st.session_state.active_auth_tab == 0:
             st.subheader("로그인")
+            if st.session_state.get('auth_notice'):
+                st.success(st.session_state.auth_notice)
+                st.session_state.auth_notice = None
             login_username = st.text_input("사용자명", key="login_username_main")
             login_password = st.text_input("비밀번호", type="password", key="login_password_main")
             
             if st.button("🔓 로그인", use_container_width=True):
-                success, message = login_user(login_username, login_password)
+                success, message = archive.login_user(login_username, login_password)
                 if success:
                     st.session_state.logged_in = True
                     st.session_state.current_user = login_username
@@ -366,10 +408,10 @@ if not st.session_state.logged_in:
                 elif signup_password != signup_password_check:
                     st.error("비밀번호가 일치하지 않습니다.")
                 else:
-                    success, message = register_user(signup_username, signup_email, signup_password)
+                    success, message = archive.register_user(signup_username, signup_email, signup_password)
                     if success:
-                        st.success("✅ 회원가입 성공!")
-                        time.sleep(1.5)  # 1.5초 대기
+                        # 로그인 탭으로 바로 넘어가서 거기서 알림을 보여 줌
+                        st.session_state.auth_notice = "✅ 회원가입 성공! 로그인해주세요."
                         st.session_state.active_auth_tab = 0
                         st.rerun()
                     else:
@@ -383,14 +425,13 @@ else:
         
         # ==================== 수정 모드 ====================
         if st.session_state.editing_perf_id:
-            performances = get_user_performances(st.session_state.current_user)
-            perf_to_edit = next((p for p in performances if p['id'] == st.session_state.editing_perf_id), None)
+            perf_to_edit = archive.get_performance(st.session_state.editing_perf_id)
             
-            if perf_to_edit:
+            if perf_to_edit and perf_to_edit['user_id'] == st.session_state.current_user:
                 st.warning("✏️ 연주 내역 수정 모드")
                 st.divider()
                 
-                categories = load_categories()
+                categories = archive.load_categories()
                 
                 with st.form("edit_performance_form"):
                     col1, col2 = st.columns(2)
@@ -465,7 +506,7 @@ else:
                                 'poster_url': edit_poster_url
                             }
                             
-                            if update_performance(st.session_state.editing_perf_id, updated_data):
+                            if archive.update_performance(st.session_state.editing_perf_id, updated_data):
                                 st.success("✅ 연주 내역이 수정되었습니다!")
                                 st.session_state.editing_perf_id = None
                                 st.rerun()
@@ -479,12 +520,44 @@ else:
                 st.divider()
         
         # ==================== 연주 내역 목록 ====================
-        performances = get_user_performances(st.session_state.current_user)
+        page_size = st.session_state.page_size
+        total = archive.count_user_performances(st.session_state.current_user)
+        performances, next_cursor = archive.get_user_performances_page(
+            st.session_state.current_user, page_size, get_page_cursor("my_perfs"))
+        if not performances and total:
+            # 마지막 항목을 지워 현재 페이지가 비었으면 첫 페이지로
+            st.session_state["my_perfs_cursors"] = [None]
+            st.rerun()
         
         if not performances:
             st.info("아직 연주 내역이 없습니다. 새로운 연주를 기록해보세요!")
         else:
-            st.markdown(f"**총 {len(performances)}건의 연주 내역**")
+            st.markdown(f"**총 {total}건의 연주 내역**")
+            
+            with st.expander("📥 내보내기"):
+                export_format = st.radio("파일 형식", list(EXPORT_FORMATS), horizontal=True,
+                                         format_func=str.upper, key="my_export_format")
+                st.caption("비공개 내역을 포함한 전체 연주 내역을 좋아요/댓글 수와 함께 내보냅니다.")
+                render_export_button(export_format, st.session_state.current_user, key="my_export")
+            
+            with st.expander("🗂️ 기간으로 일괄 삭제"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    bulk_from = st.date_input("시작 날짜", key="bulk_delete_from", value=None)
+                with col2:
+                    bulk_to = st.date_input("종료 날짜", key="bulk_delete_to", value=None)
+                
+                if bulk_from and bulk_to:
+                    targets = archive.search_performances('', None, st.session_state.current_user,
+                                                  bulk_from.isoformat(), bulk_to.isoformat())
+                    st.caption(f"삭제 대상: {len(targets)}건 (댓글과 좋아요도 함께 삭제됩니다)")
+                    confirmed = st.checkbox("삭제 후에는 되돌릴 수 없음을 확인했습니다", key="bulk_delete_confirm")
+                    if st.button("🗑️ 일괄 삭제", disabled=not targets or not confirmed, key="bulk_delete"):
+                        # 댓글/좋아요까지 지우는 연쇄 삭제는 백그라운드 작업으로 (사이드바에 진행률)
+                        start_job(f"일괄 삭제 {bulk_from} ~ {bulk_to} ({len(targets)}건)",
+                                  archive.delete_performances, [perf['id'] for perf in targets])
+                        st.session_state["my_perfs_cursors"] = [None]
+                        st.rerun()
             
             for perf in performances:
                 with st.container(border=True):
@@ -505,6 +578,7 @@ else:
                     with col2:
                         is_public = "🌍 공개" if perf['is_public'] else "🔒 비공개"
                         st.caption(is_public)
+                        st.caption(f"❤️ {perf.get('like_count', 0)} | 💬 {perf.get('comment_count', 0)}")
                     
                     with col3:
                         edit_btn, delete_btn = st.columns(2)
@@ -514,13 +588,15 @@ else:
                                 st.rerun()
                         with delete_btn:
                             if st.button("🗑️", key=f"delete_{perf['id']}", help="삭제"):
-                                if delete_performance(perf['id']):
-                                    st.success("삭제되었습니다.")
-                                    st.rerun()
+                                start_job(f"연주 내역 삭제: {perf['date']} {perf['venue']}",
+                                          archive.delete_performances, [perf['id']])
+                                st.rerun()
+            
+            render_pager("my_perfs", next_cursor, total, page_size)
     elif st.session_state.current_page == "새 연주 기록":
         st.header("✏️ 새 연주 기록")
         
-        categories = load_categories()
+        categories = archive.load_categories()
         
         with st.form("performance_form"):
             col1, col2 = st.columns(2)
@@ -594,7 +670,7 @@ else:
                         'youtube_url': youtube_url,
                         'poster_url': poster_url
                     }
-                    perf_id = add_performance(st.session_state.current_user, perf_data)
+                    perf_id = archive.add_performance(st.session_state.current_user, perf_data)
                     st.success(f"✅ 연주 내역이 저장되었습니다!")
                 st.info("📌 팁: 장소, 악기, 세부 파트를 추가하려면 '설정 관리' 페이지를 방문하세요.")
 
@@ -602,12 +678,39 @@ else:
         st.header("🌍 공개 아카이브")
         st.markdown("_다른 음악가들의 연주 내역을 감상하세요!_")
         
-        performances = get_public_performances()
+        order = PUBLIC_ORDERS[st.radio("정렬", list(PUBLIC_ORDERS), horizontal=True, key="public_order",
+                                       label_visibility="collapsed")]
+        page_size = st.session_state.page_size
+        total = archive.count_public_performances()
+        if order is None:
+            performances, next_cursor = archive.get_public_performances_page(page_size, get_page_cursor("public_perfs"))
+        else:
+            performances, next_cursor = archive.get_ranked_performances(order, TOP_K), None
+        if not performances and total and order is None:
+            # 마지막 항목을 지워 현재 페이지가 비었으면 첫 페이지로
+            st.session_state["public_perfs_cursors"] = [None]
+            st.rerun()
         
         if not performances:
             st.info("아직 공개된 연주 내역이 없습니다.")
         else:
-            st.markdown(f"**총 {len(performances)}건의 공개 연주 내역**")
+            if order is None:
+                st.markdown(f"**총 {total}건의 공개 연주 내역**")
+            else:
+                st.markdown(f"**총 {total}건 중 상위 {len(performances)}건**")
+                if order == TRENDING:
+                    st.caption("최근 좋아요와 댓글이 많은 순서입니다 (오래된 것일수록 적게 반영).")
+            
+            with st.expander("📥 내보내기"):
+                export_format = st.radio("파일 형식", list(EXPORT_FORMATS), horizontal=True,
+                                         format_func=str.upper, key="public_export_format")
+                render_export_button(export_format, key="public_export")
+            
+            # 카드마다 파일을 훑지 않도록 좋아요/댓글을 한 번에 조회 (개수는 레코드에 있음)
+            reset_card_updates()
+            perf_ids = [perf['id'] for perf in performances]
+            liked_set = archive.get_liked_set(st.session_state.current_user, perf_ids)
+            comments_by_perf = archive.get_comments_grouped(perf_ids)
             
             for perf in performances:
                 with st.container(border=True):
@@ -626,58 +729,57 @@ else:
                             st.markdown(f"**곡목**: {' | '.join(perf['pieces'][:3])}")
                     
                     with col2:
-                        like_count = get_like_count(perf['id'])
-                        is_liked = is_liked_by_user(perf['id'], st.session_state.current_user)
-                        
-                        like_button_text = f"❤️ {like_count}" if is_liked else f"🤍 {like_count}"
-                        
-                        if st.button(like_button_text, key=f"like_{perf['id']}", use_container_width=True):
-                            toggle_like(perf['id'], st.session_state.current_user)
-                            st.rerun()
-                    
-                    # 댓글
-                    st.markdown("**💬 댓글**")
-                    comments = get_comments(perf['id'])
-                    
-                    if comments:
-                        for comment in comments:
-                            comment_col1, comment_col2 = st.columns([4, 1])
-                            with comment_col1:
-                                with st.container(border=True):
-                                    st.caption(f"👤 **{comment['user_id']}**")
-                                    st.write(comment['content'])
-                            with comment_col2:
-                                if comment['user_id'] == st.session_state.current_user:
-                                    if st.button("🗑️", key=f"delete_comment_{comment['id']}"):
-                                        if delete_comment(comment['id']):
-                                            st.success("댓글이 삭제되었습니다.")
-                                            st.rerun()
-                    else:
-                        st.caption("_등록된 댓글이 없습니다._")
-                    
-                    st.divider()
-                    
-                    # 댓글 입력
-                    col1, col2 = st.columns([4, 1])
-                    with col1:
-                        new_comment = st.text_input("💬 댓글 작성", placeholder="댓글을 입력하세요...", 
-                                                  key=f"comment_{perf['id']}", label_visibility="collapsed")
-                    with col2:
-                        comment_submitted = st.button("작성", key=f"submit_comment_{perf['id']}", use_container_width=True)
+                        render_like_button(perf['id'], perf.get('like_count', 0), perf['id'] in liked_set)
                     
-                    if comment_submitted:
-                        if new_comment.strip():
-                            add_comment(perf['id'], st.session_state.current_user, new_comment)
-                            st.success("댓글이 등록되었습니다!")
-                            # 입력 필드 비우기
-                            st.session_state[f"comment_{perf['id']}"] = ""
-                            st.rerun()
-                        else:
-                            st.warning("댓글을 입력해주세요.")
+                    render_comments(perf['id'], comments_by_perf[perf['id']])
+            
+            if order is None:
+                render_pager("public_perfs", next_cursor, total, page_size)
+
+    elif st.session_state.current_page == "연주 통계":
+        st.header("📊 연주 통계")
+        
+        scope = st.radio("범위", ["내 연주 내역", "공개 아카이브 전체"], horizontal=True, key="stats_scope")
+        summary = archive.get_performance_stats(st.session_state.current_user if scope == "내 연주 내역" else None)
+        
+        if not summary['total']:
+            st.info("아직 통계를 낼 연주 내역이 없습니다.")
+        else:
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("총 공연", f"{summary['total']:,}회")
+            col2.metric("객원 공연", f"{summary['guest_count']:,}회")
+            col3.metric("객원 페이 합계", f"{summary['fee_total']:,}원")
+            if summary['first_date']:
+                col4.metric("활동 기간", f"{summary['first_date'][:4]} ~ {summary['last_date'][:4]}")
+            
+            by_year = summary['by_year']
+            # 연도를 문자열로 넘겨야 축에 2,024처럼 표시되지 않음
+            years = [str(year) for year in by_year['year']]
+            st.subheader("연도별 공연 수")
+            st.bar_chart({"연도": years, "공연 수": by_year['count']}, x="연도", y="공연 수")
+            if summary['fee_total']:
+                st.subheader("연도별 객원 페이 합계")
+                st.bar_chart({"연도": years, "페이 (원)": by_year['fee_total']}, x="연도", y="페이 (원)")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("악기별")
+                render_count_table(summary['by_instrument'], "악기")
+                st.subheader("단체별 (상위 10)")
+                render_count_table(summary['by_ensemble'], "단체")
+            with col2:
+                st.subheader("파트별")
+                render_count_table(summary['by_sub_part'], "파트")
+                st.subheader("지휘자별 (상위 10)")
+                render_count_table(summary['by_conductor'], "지휘자")
 
     elif st.session_state.current_page == "검색/필터":
         st.header("🔍 검색 및 필터")
         
+        search_query = st.text_input(
+            "통합 검색", placeholder="곡목, 지휘자, 단체명, 장소, 악기 (예: 차이코프스키)", key="search_query"
+        )
+        
         # 필터 설정
         col1, col2 = st.columns(2)
         with col1:
@@ -691,23 +793,28 @@ else:
             filter_date_to = st.date_input("종료 날짜", key="filter_date_to", value=None)
         
         search_scope = st.radio("검색 범위", ["내 연주 내역만", "공개 아카이브"], horizontal=True)
+        search_sort = st.radio("정렬", list(SEARCH_SORTS), horizontal=True, key="search_sort")
         
         if st.button("🔍 검색"):
-            if search_scope == "내 연주 내역만":
-                performances = get_user_performances(st.session_state.current_user)
-            else:
-                performances = get_public_performances()
-            
-            filters = {
-                'venue': filter_venue,
-                'conductor': filter_conductor,
-                'ensemble': filter_ensemble,
-                'instrument': filter_instrument,
-                'date_from': filter_date_from.isoformat() if filter_date_from else None,
-                'date_to': filter_date_to.isoformat() if filter_date_to else None
-            }
+            # 텍스트 조건은 검색 색인, 기간은 날짜 정렬 인덱스로 - 더 좁은 쪽이 후보를 만듦
+            user_id = st.session_state.current_user if search_scope == "내 연주 내역만" else None
+            filtered = archive.search_performances(
+                search_query,
+                {
+                    'venue': filter_venue,
+                    'conductor': filter_conductor,
+                    'ensemble_name': filter_ensemble,
+                    'instrument': filter_instrument
+                },
+                user_id,
+                filter_date_from.isoformat() if filter_date_from else None,
+                filter_date_to.isoformat() if filter_date_to else None
+            )
             
-            filtered = filter_performances(performances, filters)
+            sort_key = SEARCH_SORTS[search_sort]
+            if sort_key:
+                # 개수는 레코드에 저장되어 있으므로 좋아요/댓글 저장소를 읽지 않고 정렬
+                filtered = sorted(filtered, key=sort_key, reverse=True)
             
             st.markdown(f"**검색 결과: {len(filtered)}건**")
             
@@ -717,16 +824,59 @@ else:
                 for perf in filtered:
                     with st.container(border=True):
                         st.markdown(f"**👤 {perf['user_id']}** | **📍 {perf['venue']}**")
-                        st.caption(f"📅 {perf['date']} | 🎻 {perf['instrument']} | 🎩 {perf['conductor']}")
+                        st.caption(f"📅 {perf['date']} | 🎻 {perf['instrument']} | 🎩 {perf['conductor']}"
+                                   f" | ❤️ {perf.get('like_count', 0)} | 💬 {perf.get('comment_count', 0)}")
                         if perf['pieces']:
                             st.caption(f"곡목: {' | '.join(perf['pieces'][:2])}")
 
+    elif st.session_state.current_page == "가져오기":
+        st.header("📥 연주 내역 가져오기")
+        st.markdown("_스프레드시트(CSV)나 JSONL 파일로 지난 연주 내역을 한 번에 추가하세요._")
+        
+        with st.expander("📄 파일 형식 안내"):
+            st.markdown(
+                "- 머리글: `날짜, 장소, 곡목, 악기, 세부 파트, 지휘자, 단체명` (필수), "
+                "`객원, 페이, 공개, 유튜브, 포스터` (선택)\n"
+                "- 날짜는 `2024-02-13` 형식, 곡목이 여러 개면 `|`로 구분\n"
+                "- 장소/악기/세부 파트는 '설정 관리'에 등록된 값이어야 합니다\n"
+                "- JSONL은 한 줄에 하나씩 같은 이름(또는 date, venue, ...)의 객체"
+            )
+            st.download_button("예시 CSV 받기", IMPORT_SAMPLE_CSV.encode('utf-8-sig'),
+                               file_name="opus_import_example.csv", mime="text/csv")
+        
+        uploaded = st.file_uploader("파일 선택", type=["csv", "jsonl"], key="import_file")
+        add_missing = st.checkbox("목록에 없는 장소/악기/세부 파트는 카테고리에 추가", key="import_add_categories")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            validate_clicked = st.button("🔎 검증만 하기", disabled=uploaded is None, use_container_width=True)
+        with col2:
+            import_clicked = st.button("📥 가져오기", type="primary", disabled=uploaded is None, use_container_width=True)
+        
+        if uploaded is not None and (validate_clicked or import_clicked):
+            with st.spinner("파일을 읽는 중..."):
+                report = archive.import_performances_file(st.session_state.current_user, uploaded,
+                                                  add_missing, dry_run=validate_clicked)
+            
+            if validate_clicked:
+                st.info(f"검증 통과: {report.imported}건 / 오류: {report.failed}건 (아직 저장하지 않았습니다)")
+            elif report.imported:
+                st.success(f"✅ {report.imported}건을 가져왔습니다.")
+            
+            for category, values in report.new_categories.items():
+                st.caption(f"새로 추가{'될' if validate_clicked else '된'} 카테고리 ({category}): {', '.join(values)}")
+            
+            if report.errors:
+                st.warning(f"건너뛴 행: {report.failed}건")
+                st.dataframe([{"행": line_no, "오류": message} for line_no, message in report.errors],
+                             use_container_width=True, hide_index=True)
+
     elif st.session_state.current_page == "설정 관리":
         st.header("⚙️ 설정 관리")
         st.markdown("_드롭다운 메뉴에 표시될 카테고리를 관리하세요._")
         st.divider()
         
-        categories = load_categories()
+        categories = archive.load_categories()
         
         # 장소 (Venues)
         with st.expander("📍 장소 관리", expanded=True):
@@ -737,12 +887,14 @@ else:
                 st.write("")
                 if st.button("➕ 추가", key="add_venue"):
                     if new_venue.strip():
-                        if add_category('venues', new_venue.strip()):
+                        if archive.add_category('venues', new_venue.strip()):
                             st.success(f"✅ '{new_venue}'이 추가되었습니다.")
                             st.rerun()
                         else:
                             st.warning(f"⚠️ '{new_venue}'은 이미 있습니다.")
             
+            render_category_rename('venues', categories['venues'], "장소")
+            
             st.write("**현재 장소:**")
             for i, venue in enumerate(categories['venues']):
                 col1, col2 = st.columns([4, 1])
@@ -750,7 +902,7 @@ else:
                     st.caption(f"• {venue}")
                 with col2:
                     if st.button("🗑️", key=f"delete_venue_{i}"):
-                        remove_category('venues', venue)
+                        archive.remove_category('venues', venue)
                         st.success(f"✅ '{venue}'이 삭제되었습니다.")
                         st.rerun()
         
@@ -763,12 +915,14 @@ else:
                 st.write("")
                 if st.button("➕ 추가", key="add_instrument"):
                     if new_instrument.strip():
-                        if add_category('instruments', new_instrument.strip()):
+                        if archive.add_category('instruments', new_instrument.strip()):
                             st.success(f"✅ '{new_instrument}'이 추가되었습니다.")
                             st.rerun()
                         else:
                             st.warning(f"⚠️ '{new_instrument}'은 이미 있습니다.")
             
+            render_category_rename('instruments', categories['instruments'], "악기")
+            
             st.write("**현재 악기:**")
             cols = st.columns(3)
             for i, instrument in enumerate(categories['instruments']):
@@ -778,7 +932,7 @@ else:
                         st.caption(f"• {instrument}")
                     with col2:
                         if st.button("🗑️", key=f"delete_instrument_{i}"):
-                            remove_category('instruments', instrument)
+                            archive.remove_category('instruments', instrument)
                             st.success(f"✅ '{instrument}'이 삭제되었습니다.")
                             st.rerun()
         
@@ -791,12 +945,14 @@ else:
                 st.write("")
                 if st.button("➕ 추가", key="add_sub_part"):
                     if new_sub_part.strip():
-                        if add_category('sub_parts', new_sub_part.strip()):
+                        if archive.add_category('sub_parts', new_sub_part.strip()):
                             st.success(f"✅ '{new_sub_part}'이 추가되었습니다.")
                             st.rerun()
                         else:
                             st.warning(f"⚠️ '{new_sub_part}'은 이미 있습니다.")
             
+            render_category_rename('sub_parts', categories['sub_parts'], "파트")
+            
             st.write("**현재 파트:**")
             cols = st.columns(3)
             for i, sub_part in enumerate(categories['sub_parts']):
@@ -806,14 +962,20 @@ else:
                         st.caption(f"• {sub_part}")
                     with col2:
                         if st.button("🗑️", key=f"delete_sub_part_{i}"):
-                            remove_category('sub_parts', sub_part)
+                            archive.remove_category('sub_parts', sub_part)
                             st.success(f"✅ '{sub_part}'이 삭제되었습니다.")
                             st.rerun()
         
         st.divider()
-        st.info("💡 여기서 추가한 항목들은 '새 연주 기록' 페이지의 드롭다운에 나타납니다.")
+        st.info("💡 여기서 추가한 항목들은 '새 연주 기록' 페이지의 드롭다운에 나타납니다. "
+                "이름을 바꾸면 그 값으로 기록한 연주 내역도 함께 바뀝니다 (사이드바에 진행률 표시).")
 
 # ==================== 푸터 ====================
 
 st.markdown("---")
 st.caption("🎼 My Opus Archive v1.0 | Made with Streamlit")
+
+if metrics.enabled():
+    finished = metrics.end_rerun(st.session_state.get('metrics_rerun'))
+    if finished is not None:
+        st.session_state.metrics_last_rerun = finished.to_dict()
@@ -0,0 +1,239 @@
+"""
+HTTP API 처리량 벤치마크 - opus_archive.api 서버에 여러 클라이언트가 동시에 요청
+
+    python benchmarks/bench_api.py [--performances 20000] [--workers 1,4,8] [--clients 16] [--seconds 10]
+
+datagen으로 만든 데이터로 작업 스레드 수(--workers)마다 API 서버를 별도 프로세스로 띄우고,
+클라이언트 프로세스 --procs개가 keep-alive 연결 --clients개(모두 합쳐서)를 나눠 들고
+--seconds초 동안 요청을 보냅니다. 클라이언트마다 다른 계정으로 씁니다.
+
+요청 (가중치):
+- list       : 공개 목록 첫 페이지
+- list_etag  : 같은 요청에 지난번 ETag를 If-None-Match로 (바뀐 것이 없으면 304)
+- next_page  : 지난번 목록의 next_cursor로 다음 페이지
+- filter     : 악기 필터 (filter_performances)
+- comments   : 공연 하나의 댓글 목록
+- like       : 좋아요 토글 (POST, Basic 인증)
+- comment    : 댓글 작성 (POST, Basic 인증)
+
+--no-writes이면 쓰기 요청을 빼고 읽기만 보냅니다 (데이터가 바뀌지 않으므로 ETag와 필터 결과가
+계속 재사용됨). 클라이언트도 같은 머신에서 돌기 때문에 CPU가 적으면 작업 스레드를 늘려도
+처리량이 늘지 않습니다.
+
+보고: 작업 스레드 수마다 처리량(요청/초), 요청별 p50/p90/p99, 304 비율, 오류 수.
+"""
+
+import argparse
+import base64
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import INSTRUMENT_PARTS, generate_dataset  # noqa: E402
+from loadtest import percentile  # noqa: E402
+
+REQUESTS = {'list': 5, 'list_etag': 4, 'next_page': 2, 'filter': 1, 'comments': 2, 'like': 1, 'comment': 1}
+WRITE_REQUESTS = ('like', 'comment')
+PAGE_LIMIT = 20
+
+
+def start_server(data_dir, backend, workers):
+    """API 서버 프로세스 시작 -> (프로세스, 포트)"""
+    env = {**os.environ, 'OPUS_STORAGE_BACKEND': backend, 'PYTHONPATH': str(REPO)}
+    proc = subprocess.Popen([sys.executable, '-m', 'opus_archive.api', '--data-dir', str(data_dir),
+                             '--port', '0', '--workers', str(workers)],
+                            cwd=REPO, env=env, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line:
+        proc.wait()
+        raise RuntimeError("API 서버를 시작하지 못했습니다")
+    port = int(line.split()[0].rsplit(':', 1)[1].split('/')[0])
+    return proc, port
+
+
+class Client:
+    """keep-alive 연결 하나로 요청을 반복하는 가상 클라이언트"""
+
+    def __init__(self, port, user_id, seed):
+        self.conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        self.auth = 'Basic ' + base64.b64encode(f"{user_id}:pw".encode('utf-8')).decode('ascii')
+        self.rng = random.Random(seed)
+        self.etag = None
+        self.cursor = None
+        self.perf_ids = []
+        self.instruments = [instrument for instrument, _, _ in INSTRUMENT_PARTS]
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        self.conn.request(method, path, body=data, headers=headers)
+        response = self.conn.getresponse()
+        raw = response.read()
+        return response.status, response.getheader('ETag'), json.loads(raw) if raw else None
+
+    def run_one(self, name):
+        """요청 하나 -> 상태 코드"""
+        if name in ('list', 'list_etag'):
+            headers = {'If-None-Match': self.etag} if name == 'list_etag' and self.etag else None
+            status, etag, body = self.request('GET', f'/api/performances?limit={PAGE_LIMIT}', headers=headers)
+            self.etag = etag or self.etag
+            if status == 200:
+                self.cursor = body['next_cursor']
+                self.perf_ids = [p['id'] for p in body['items']]
+            return status
+        if name == 'next_page':
+            cursor = f'&cursor={self.cursor}' if self.cursor else ''
+            status, _, body = self.request('GET', f'/api/performances?limit={PAGE_LIMIT}{cursor}')
+            if status == 200:
+                self.cursor = body['next_cursor']
+            return status
+        if name == 'filter':
+            instrument = self.rng.choice(self.instruments)
+            return self.request('GET', f'/api/performances?limit={PAGE_LIMIT}&instrument={quote(instrument)}')[0]
+        if not self.perf_ids:
+            return self.run_one('list')
+        perf_id = self.rng.choice(self.perf_ids)
+        if name == 'comments':
+            return self.request('GET', f'/api/performances/{perf_id}/comments')[0]
+        if name == 'like':
+            return self.request('POST', f'/api/performances/{perf_id}/like', headers={'Authorization': self.auth})[0]
+        return self.request('POST', f'/api/performances/{perf_id}/comments', {'content': "API 벤치마크 댓글"},
+                            headers={'Authorization': self.auth})[0]
+
+
+def run_clients(port, user_ids, start_at, seconds, seed, requests=REQUESTS):
+    """클라이언트 프로세스 하나 - 스레드마다 Client 하나 -> [(요청, ms, 상태)]
+
+    프로세스를 띄우는 시간이 측정에 섞이지 않도록 모든 프로세스가 start_at(time.time())에 함께 시작합니다.
+    """
+    names = list(requests)
+    weights = [requests[name] for name in names]
+    results = []
+    lock = threading.Lock()
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.perf_counter() + seconds
+
+    def loop(i, user_id):
+        client = Client(port, user_id, seed + i)
+        local = []
+        while time.perf_counter() < deadline:
+            name = client.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = client.run_one(name)
+            except (OSError, http.client.HTTPException) as e:
+                status = f"{type(e).__name__}"
+                client.conn.close()
+            local.append((name, (time.perf_counter() - start) * 1000, status))
+        client.conn.close()
+        with lock:
+            results.extend(local)
+
+    threads = [threading.Thread(target=loop, args=(i, user_id)) for i, user_id in enumerate(user_ids)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_round(data_dir, backend, workers, args):
+    """작업 스레드 workers개 서버로 한 번 측정 -> 보고 dict"""
+    proc, port = start_server(data_dir, backend, workers)
+    try:
+        # 첫 요청에서 캐시를 채우는 비용은 빼고 잼
+        Client(port, 'user00000', 0).run_one('list')
+        user_ids = [f"user{i:05d}" for i in range(args.clients)]
+        groups = [user_ids[i::args.procs] for i in range(args.procs) if user_ids[i::args.procs]]
+        context = multiprocessing.get_context('spawn')
+        start_at = time.time() + 3
+        requests = {name: weight for name, weight in REQUESTS.items()
+                    if not (args.no_writes and name in WRITE_REQUESTS)}
+        with context.Pool(len(groups)) as pool:
+            jobs = [pool.apply_async(run_clients, (port, group, start_at, args.seconds, args.seed + 1000 * i, requests))
+                    for i, group in enumerate(groups)]
+            results = [r for job in jobs for r in job.get()]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    by_request = {}
+    for name, ms, status in results:
+        by_request.setdefault(name, []).append((ms, status))
+    report = {'workers': workers, 'requests': len(results), 'seconds': args.seconds,
+              'requests_per_s': round(len(results) / args.seconds, 1),
+              'errors': sum(1 for _, _, status in results if not isinstance(status, int) or status >= 500),
+              'by_request': {}}
+    for name, items in by_request.items():
+        times = [ms for ms, _ in items]
+        report['by_request'][name] = {
+            'count': len(items), 'p50_ms': percentile(times, 0.5), 'p90_ms': percentile(times, 0.9),
+            'p99_ms': percentile(times, 0.99),
+            'not_modified': sum(1 for _, status in items if status == 304),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\n작업 스레드 {report['workers']}개: {report['requests']:,}건 / {report['seconds']}초 = "
+          f"{report['requests_per_s']:,.1f} 요청/초, 오류 {report['errors']}건")
+    print(f"  {'요청':<12}{'건수':>8}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}{'304':>8}")
+    for name in REQUESTS:
+        r = report['by_request'].get(name)
+        if r:
+            print(f"  {name:<12}{r['count']:>8,}{r['p50_ms']:>10.1f}{r['p90_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+                  f"{r['not_modified']:>8,}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API 서버 처리량 벤치마크")
+    parser.add_argument('--performances', type=int, default=20000, help="합성 데이터 연주 내역 수")
+    parser.add_argument('--backend', default='json', choices=['json', 'jsonlog', 'sqlite'])
+    parser.add_argument('--workers', default='1,4,8', help="쉼표로 구분한 서버 작업 스레드 수")
+    parser.add_argument('--clients', type=int, default=16, help="동시 연결 수 (전체)")
+    parser.add_argument('--procs', type=int, default=4, help="클라이언트 프로세스 수")
+    parser.add_argument('--seconds', type=float, default=10, help="작업 스레드 수마다 측정 시간")
+    parser.add_argument('--no-writes', action='store_true', help="좋아요/댓글 쓰기 없이 읽기만")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    reports = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = Path(work_dir) / "data"
+        generate_dataset(data_dir, args.performances, seed=args.seed, log=lambda *a: None)
+        if args.backend == 'sqlite':
+            from opus_archive.backends import default_sqlite_path
+            from opus_archive.migrate import migrate
+            migrate(data_dir, default_sqlite_path(data_dir), log=lambda *a: None)
+        print(f"{args.backend} 백엔드, 연주 내역 {args.performances:,}건, 연결 {args.clients}개 "
+              f"(클라이언트 프로세스 {args.procs}개), {args.seconds}초씩", file=sys.stderr)
+        for workers in [int(w) for w in args.workers.split(',') if w.strip()]:
+            report = run_round(data_dir, args.backend, workers, args)
+            print_report(report)
+            reports.append(report)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'config': vars(args), 'rounds': reports}, ensure_ascii=False,
+                                                indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+프로세스 간 캐시 일관성 확인 + 변경 감지 비용 - 같은 데이터 디렉터리를 여러 프로세스가 동시에 씀
+
+    python benchmarks/bench_changefeed.py [--procs 4] [--writes 30] [--performances 2000] [--sharded]
+
+JSON 백엔드로 --procs개 프로세스가 함께 시작해서 각자 --writes번씩 사용자/연주 내역/댓글/
+좋아요/카테고리를 추가합니다 (모두 같은 파일을 동시에 수정). 쓰는 사이사이 다른 프로세스의
+기록을 읽어서 캐시를 채워 두고, 모두 끝나면(배리어) 각 프로세스가 자기 캐시로 다음을 셉니다:
+
+- missing : 다른 프로세스가 쓴 기록 중 이 프로세스에서 안 보이는 것 (캐시가 낡음)
+- lost    : 파일에 남지 않은 기록 (잃어버린 수정)
+- notices : 변경 로그로 받은 다른 프로세스의 쓰기 알림 수 (store.get_stats)
+
+카테고리는 따로 --procs개 프로세스가 쉬지 않고 --categories번씩 add_category를 불러
+(목록 전체를 읽고-고쳐-쓰는 경로) 새 프로세스에서 모든 값이 남았는지 확인합니다.
+
+이어서 쓰기가 없는 상태에서 backend.data_version()(리런마다 캐시 확인)을 반복한 시간을
+변경 로그를 쓸 때와 끌 때(파일마다 stat) 비교합니다 - 샤드 레이아웃(--sharded)에서
+사용자 수만큼 stat하던 비용이 로그 파일 하나로 줄어듭니다.
+"""
+
+import argparse
+import json
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import generate_dataset  # noqa: E402
+
+CATEGORY_TYPE = 'venues'
+
+
+def _performance(worker, i):
+    return {'date': '2025-01-01', 'venue': f"변경 알림 {worker}-{i}", 'pieces': ["작곡가 작품"],
+            'instrument': "바이올린", 'sub_part': "1st Violin", 'is_guest': False, 'conductor': "지휘자",
+            'ensemble_name': "악단", 'is_public': True}
+
+
+def run_worker(data_dir, worker, procs, writes, start_at, barrier, queue):
+    """프로세스 하나 - 동시에 쓰고, 배리어 뒤에 다른 프로세스의 쓰기가 보이는지 셈"""
+    from opus_archive import store
+    from opus_archive.service import get_archive
+
+    archive = get_archive(data_dir, 'json')
+    backend = archive.backend
+    target = backend.get_public_performances()[0]['id']
+    time.sleep(max(0.0, start_at - time.time()))
+
+    for i in range(writes):
+        archive.register_user(f"feed{worker}_{i}", f"feed{worker}_{i}@example.com", 'pw')
+        archive.add_performance(f"feed{worker}_{i}", _performance(worker, i))
+        archive.add_comment(target, f"feed{worker}_{i}", f"변경 알림 댓글 {worker}-{i}")
+        archive.toggle_like(target, f"feed{worker}_{i}")
+        archive.add_category(CATEGORY_TYPE, f"공연장 {worker}-{i}")
+        # 다른 프로세스가 쓴 내용을 캐시에 올려 둠 (배리어 뒤에 낡은 캐시가 남는지 보려고)
+        archive.get_public_performances_page(20)
+        archive.get_comments(target)
+        archive.load_categories()
+    barrier.wait()
+
+    expected = {(w, i) for w in range(procs) for i in range(writes)}
+    venues_used = {p['venue'] for p in backend.get_public_performances()}
+    comments = {c['content'] for c in archive.get_comments(target)}
+    venues = set(archive.load_categories()[CATEGORY_TYPE])
+    seen = {
+        'users': {(w, i) for w, i in expected if backend.get_user(f"feed{w}_{i}") is not None},
+        'performances': {(w, i) for w, i in expected if f"변경 알림 {w}-{i}" in venues_used},
+        'comments': {(w, i) for w, i in expected if f"변경 알림 댓글 {w}-{i}" in comments},
+        'likes': {(w, i) for w, i in expected if target in backend.get_liked_set(f"feed{w}_{i}", [target])},
+        'categories': {(w, i) for w, i in expected if f"공연장 {w}-{i}" in venues},
+    }
+    queue.put({'worker': worker, 'notices': store.get_stats()['notices'],
+               'missing': {name: len(expected - found) for name, found in seen.items()}})
+
+
+def add_categories(data_dir, worker, count, start_at, queue):
+    """프로세스 하나 - 사이에 다른 일 없이 add_category만 count번"""
+    from opus_archive.service import get_archive
+
+    archive = get_archive(data_dir, 'json')
+    time.sleep(max(0.0, start_at - time.time()))
+    for i in range(count):
+        archive.add_category(CATEGORY_TYPE, f"연속 추가 {worker}-{i}")
+    queue.put(worker)
+
+
+def check_categories(data_dir, procs, count, queue):
+    """새 프로세스에서 add_categories가 추가한 값 중 남지 않은 수"""
+    from opus_archive.backends.json_backend import JsonBackend
+
+    venues = set(JsonBackend(data_dir).load_categories()[CATEGORY_TYPE])
+    queue.put(sum(f"연속 추가 {w}-{i}" not in venues for w in range(procs) for i in range(count)))
+
+
+def check_lost(data_dir, procs, writes, queue):
+    """새 프로세스(캐시 없음)에서 파일에 남은 기록 확인 -> {컬렉션: 잃어버린 수}"""
+    from opus_archive.backends.json_backend import JsonBackend
+
+    backend = JsonBackend(data_dir)
+    target = backend.get_public_performances()[0]['id']
+    venues_used = {p['venue'] for p in backend.get_public_performances()}
+    comments = {c['content'] for c in backend.get_comments_grouped([target])[target]}
+    venues = set(backend.load_categories()[CATEGORY_TYPE])
+    lost = dict.fromkeys(['users', 'performances', 'comments', 'likes', 'categories'], 0)
+    for w in range(procs):
+        for i in range(writes):
+            lost['users'] += backend.get_user(f"feed{w}_{i}") is None
+            lost['performances'] += f"변경 알림 {w}-{i}" not in venues_used
+            lost['comments'] += f"변경 알림 댓글 {w}-{i}" not in comments
+            lost['likes'] += target not in backend.get_liked_set(f"feed{w}_{i}", [target])
+            lost['categories'] += f"공연장 {w}-{i}" not in venues
+    queue.put(lost)
+
+
+def measure_version(data_dir, feed, repeat, queue):
+    """쓰기 없이 data_version()을 repeat번 -> 1회당 µs (feed=False면 변경 로그 없이 파일마다 stat)"""
+    from opus_archive import store
+    from opus_archive.backends.json_backend import JsonBackend
+
+    backend = JsonBackend(data_dir)
+    if not feed:
+        store._feeds.clear()
+    backend.data_version()
+    rounds = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            backend.data_version()
+        rounds.append((time.perf_counter() - start) / repeat * 1e6)
+    queue.put(statistics.median(rounds))
+
+
+def _in_process(context, target, *args):
+    queue = context.Queue()
+    proc = context.Process(target=target, args=(*args, queue))
+    proc.start()
+    result = queue.get(timeout=600)
+    proc.join()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="프로세스 간 캐시 일관성 확인과 변경 감지 비용")
+    parser.add_argument('--procs', type=int, default=4, help="동시에 쓰는 프로세스 수")
+    parser.add_argument('--writes', type=int, default=30, help="프로세스마다 컬렉션별 쓰기 수")
+    parser.add_argument('--categories', type=int, default=100, help="프로세스마다 연속 add_category 수")
+    parser.add_argument('--performances', type=int, default=2000, help="합성 데이터 연주 내역 수")
+    parser.add_argument('--sharded', action='store_true', help="연주 내역을 사용자별 샤드로")
+    parser.add_argument('--repeat', type=int, default=2000, help="data_version() 반복 수")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = Path(work_dir) / "data"
+        generate_dataset(data_dir, args.performances, seed=args.seed, log=lambda *a: None)
+        if args.sharded:
+            from opus_archive.reshard import to_sharded
+            to_sharded(data_dir, log=lambda *a: None)
+
+        queue = context.Queue()
+        barrier = context.Barrier(args.procs)
+        start_at = time.time() + 3
+        workers = [context.Process(target=run_worker, args=(data_dir, w, args.procs, args.writes, start_at,
+                                                            barrier, queue))
+                   for w in range(args.procs)]
+        for proc in workers:
+            proc.start()
+        results = sorted((queue.get(timeout=600) for _ in workers), key=lambda r: r['worker'])
+        for proc in workers:
+            proc.join()
+        lost = _in_process(context, check_lost, data_dir, args.procs, args.writes)
+
+        start_at = time.time() + 3
+        adders = [context.Process(target=add_categories, args=(data_dir, w, args.categories, start_at, queue))
+                  for w in range(args.procs)]
+        for proc in adders:
+            proc.start()
+        for _ in adders:
+            queue.get(timeout=600)
+        for proc in adders:
+            proc.join()
+        categories_lost = _in_process(context, check_categories, data_dir, args.procs, args.categories)
+
+        version_us = {'feed': _in_process(context, measure_version, data_dir, True, args.repeat),
+                      'stat': _in_process(context, measure_version, data_dir, False, args.repeat)}
+
+    layout = "샤드" if args.sharded else "단일 파일"
+    print(f"{layout} 레이아웃, 프로세스 {args.procs}개 x 쓰기 {args.writes}번 (컬렉션마다)")
+    print(f"  {'프로세스':<8}{'알림':>8}  안 보이는 기록 (다른 프로세스가 쓴 것)")
+    for r in results:
+        missing = ', '.join(f"{name} {count}" for name, count in r['missing'].items())
+        print(f"  {r['worker']:<8}{r['notices']:>8,}  {missing}")
+    print(f"  잃어버린 수정: {', '.join(f'{name} {count}' for name, count in lost.items())}")
+    print(f"  연속 add_category {args.procs}x{args.categories}번: 잃어버린 값 {categories_lost}")
+    print(f"  data_version() 1회: 변경 로그 {version_us['feed']:.1f}µs, 파일마다 stat {version_us['stat']:.1f}µs")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({'config': vars(args), 'workers': results, 'lost': lost,
+                                                 'categories_lost': categories_lost, 'data_version_us': version_us}, ensure_ascii=False, indent=2),
+                                     encoding='utf-8')
+    failed = sum(lost.values()) + categories_lost + sum(sum(r['missing'].values()) for r in results)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
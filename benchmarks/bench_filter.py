@@ -0,0 +1,131 @@
+"""
+검색/필터 벤치마크 - 기존 filter_performances(필터마다 리스트를 새로 만들고 매번
+.lower()) 대비 색인 + 날짜 정렬 인덱스 + 컴파일된 술어
+
+    python benchmarks/bench_filter.py [--records 100000] [--repeat 5]
+
+임시 디렉터리에 합성 데이터를 만들어 JSON 백엔드로 측정합니다. 색인을 처음
+만드는 시간은 따로 표시하고, 쿼리 시간은 색인이 만들어진 뒤의 중앙값입니다.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from opus_archive.backends import JsonBackend  # noqa: E402
+
+VENUES = ['예술의전당 콘서트홀', '세종문화회관', 'LG아트센터', '롯데콘서트홀', '부천아트센터']
+COMPOSERS = ['차이코프스키', '베토벤', '브람스', '모차르트', '말러', '드보르작', '시벨리우스', '라흐마니노프']
+WORKS = ['교향곡 1번', '교향곡 5번', '교향곡 9번', '바이올린 협주곡', '피아노 협주곡 2번', '서곡', '세레나데']
+INSTRUMENTS = ['바이올린', '비올라', '첼로', '콘트라베이스', '플루트', '클라리넷', '오보에']
+
+
+def legacy_filter(performances, filters):
+    """변경 전 filter_performances (비교 기준)"""
+    result = performances
+    if filters['venue']:
+        result = [p for p in result if filters['venue'].lower() in p['venue'].lower()]
+    if filters['conductor']:
+        result = [p for p in result if filters['conductor'].lower() in p['conductor'].lower()]
+    if filters['ensemble']:
+        result = [p for p in result if filters['ensemble'].lower() in p['ensemble_name'].lower()]
+    if filters['instrument']:
+        result = [p for p in result if filters['instrument'].lower() in p['instrument'].lower()]
+    if filters['date_from']:
+        result = [p for p in result if p['date'] >= filters['date_from']]
+    if filters['date_to']:
+        result = [p for p in result if p['date'] <= filters['date_to']]
+    return result
+
+
+def generate(count, seed=42):
+    """합성 연주 내역 {id: record}"""
+    rng = random.Random(seed)
+    performances = {}
+    for i in range(count):
+        perf_id = f"perf_{i}"
+        performances[perf_id] = {
+            'id': perf_id,
+            'user_id': f"user{rng.randrange(1000)}",
+            'date': f"{rng.randint(2000, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'venue': rng.choice(VENUES),
+            'pieces': [f"{rng.choice(COMPOSERS)} {rng.choice(WORKS)}" for _ in range(rng.randint(1, 3))],
+            'instrument': rng.choice(INSTRUMENTS),
+            'sub_part': '',
+            'is_guest': False,
+            'guest_fee': '',
+            'conductor': f"지휘자{rng.randrange(400)}",
+            'ensemble_name': f"{rng.choice(['서울', '부산', '대전', '광주'])} 필하모닉 {rng.randrange(200)}",
+            'is_public': rng.random() < 0.8,
+            'youtube_url': '',
+            'poster_url': '',
+            'created_at': '2024-01-01T00:00:00'
+        }
+    return performances
+
+
+def measure(fn, repeat):
+    """중앙값 (ms)과 마지막 결과"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+# (이름, 기존 filters, 새 검색 인자)
+SCENARIOS = [
+    ("기간 1개월",
+     {'venue': '', 'conductor': '', 'ensemble': '', 'instrument': '', 'date_from': '2015-03-01', 'date_to': '2015-03-31'},
+     dict(query='', field_queries={}, date_from='2015-03-01', date_to='2015-03-31')),
+    ("기간 5년",
+     {'venue': '', 'conductor': '', 'ensemble': '', 'instrument': '', 'date_from': '2010-01-01', 'date_to': '2014-12-31'},
+     dict(query='', field_queries={}, date_from='2010-01-01', date_to='2014-12-31')),
+    ("지휘자",
+     {'venue': '', 'conductor': '지휘자123', 'ensemble': '', 'instrument': '', 'date_from': None, 'date_to': None},
+     dict(query='', field_queries={'conductor': '지휘자123'})),
+    ("장소 + 악기 + 기간",
+     {'venue': '콘서트홀', 'conductor': '', 'ensemble': '', 'instrument': '첼로', 'date_from': '2020-01-01', 'date_to': '2020-12-31'},
+     dict(query='', field_queries={'venue': '콘서트홀', 'instrument': '첼로'}, date_from='2020-01-01', date_to='2020-12-31')),
+    ("단체명 + 지휘자 + 기간 1주",
+     {'venue': '', 'conductor': '지휘자1', 'ensemble': '서울', 'instrument': '', 'date_from': '2018-05-01', 'date_to': '2018-05-07'},
+     dict(query='', field_queries={'conductor': '지휘자1', 'ensemble_name': '서울'}, date_from='2018-05-01', date_to='2018-05-07')),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="검색/필터 성능 비교")
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        with open(data_dir / "performances.json", 'w', encoding='utf-8') as f:
+            json.dump(generate(args.records), f, ensure_ascii=False)
+        backend = JsonBackend(data_dir)
+
+        start = time.perf_counter()
+        backend.search_performances('워밍업', {})
+        print(f"연주 내역 {args.records:,}건 - 검색 색인 생성 {time.perf_counter() - start:.2f}s\n")
+
+        print(f"{'시나리오':<24}{'결과':>8}{'기존(ms)':>12}{'신규(ms)':>12}{'배율':>8}")
+        for name, filters, kwargs in SCENARIOS:
+            legacy_ms, legacy = measure(lambda: legacy_filter(backend.get_public_performances(), filters), args.repeat)
+            new_ms, result = measure(lambda: backend.search_performances(**kwargs), args.repeat)
+            assert {p['id'] for p in result} == {p['id'] for p in legacy}, name
+            print(f"{name:<24}{len(result):>8}{legacy_ms:>12.1f}{new_ms:>12.1f}{legacy_ms / new_ms:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
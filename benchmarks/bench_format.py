@@ -0,0 +1,94 @@
+"""
+저장 형식 벤치마크 - 데이터 파일 전체의 읽기/쓰기 시간과 파일 크기 비교
+
+    python benchmarks/bench_format.py [--performances 100000] [--repeat 3]
+
+datagen으로 임시 디렉터리에 데이터를 만들고, 형식마다 모든 데이터 파일을
+저장(인코딩 + fsync 포함 쓰기)하고 다시 읽는(파싱) 시간을 잽니다 (중앙값).
+'baseline'은 변경 전 경로 (json.dump(indent=2) / json.load)입니다.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import generate_dataset  # noqa: E402
+from opus_archive import codec  # noqa: E402
+from opus_archive.store import write_json_atomic  # noqa: E402
+
+DATA_FILES = ['users.json', 'performances.json', 'comments.json', 'likes.json', 'categories.json']
+
+
+def baseline_save(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def baseline_load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def codec_load(path):
+    with open(path, 'rb') as f:
+        return codec.decode(f.read())
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터 파일 저장 형식 벤치마크")
+    parser.add_argument('--performances', type=int, default=100000, help="합성 연주 내역 수")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "data"
+        generate_dataset(source, args.performances, seed=args.seed, log=lambda *a: None)
+        datasets = {name: baseline_load(source / name) for name in DATA_FILES if (source / name).exists()}
+
+        formats = [('baseline', baseline_save, baseline_load)] + [
+            (fmt, lambda path, data, fmt=fmt: write_json_atomic(path, data, fmt), codec_load)
+            for fmt in codec.available_formats()]
+        print(f"연주 내역 {args.performances:,}건 | orjson {'있음' if codec.orjson else '없음'}, "
+              f"msgpack {'있음' if codec.msgpack else '없음'}")
+        print(f"\n{'형식':<10}{'전체 크기':>14}{'배율':>7}{'performances':>16}{'저장(ms)':>11}{'읽기(ms)':>11}")
+
+        base_size = None
+        for name, save, load in formats:
+            out = Path(tmp) / name
+            out.mkdir()
+            paths = {file: out / file for file in datasets}
+            save_ms = measure(lambda: [save(paths[file], data) for file, data in datasets.items()], args.repeat)
+            load_ms = measure(lambda: [load(path) for path in paths.values()], args.repeat)
+            for file, path in paths.items():
+                if load(path) != datasets[file]:
+                    raise SystemExit(f"{name}: {file} 내용이 다릅니다")
+            size = sum(path.stat().st_size for path in paths.values())
+            base_size = base_size or size
+            print(f"{name:<10}{size:>14,}{size / base_size:>6.2f}x{paths['performances.json'].stat().st_size:>16,}"
+                  f"{save_ms:>11.1f}{load_ms:>11.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
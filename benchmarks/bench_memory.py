@@ -0,0 +1,100 @@
+"""
+레코드 메모리 벤치마크 - 캐시에 올린 데이터의 메모리 사용량을 dict와 __slots__ 레코드로 비교
+
+    python benchmarks/bench_memory.py [--performances 100000] [--repeat 3]
+
+datagen으로 임시 디렉터리에 데이터를 만들고, 파일마다 파싱 결과를 그대로 둔 경우(dict)와
+records의 레코드로 바꾼 경우(store가 캐시에 올리는 모양)를 tracemalloc으로 잽니다.
+메모리는 파일 하나를 읽은 뒤 남아 있는 양, 시간은 읽기(+변환)와 공개 목록 정렬 키를
+만드는 순회(_sorted_keys와 같은 필드 접근)의 중앙값입니다.
+"""
+
+import argparse
+import gc
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import generate_dataset  # noqa: E402
+from opus_archive import codec, store  # noqa: E402
+from opus_archive.records import Comment, Like, Performance  # noqa: E402
+
+# (파일, 레코드 형식, 정렬에 쓰는 필드)
+DATA_FILES = [('performances.json', Performance, 'date'), ('comments.json', Comment, 'created_at'),
+              ('likes.json', Like, 'created_at')]
+
+
+def load_plain(raw, record_type):
+    return codec.decode(raw)
+
+
+def load_records(raw, record_type):
+    """store가 캐시에 올릴 때와 같은 변환 (register_records)"""
+    path = f"<bench>/{record_type.__name__}"
+    store.register_records(path, record_type.of)
+    return store._to_records(store._key(path), codec.decode(raw))
+
+
+def retained(load, raw, record_type):
+    """load 결과가 붙잡고 있는 메모리 (bytes) 와 그 과정의 최대치"""
+    gc.collect()
+    tracemalloc.start()
+    data = load(raw, record_type)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current, peak
+
+
+def scan(data, field):
+    """정렬 인덱스를 만들 때와 같은 필드 접근"""
+    return sorted((value[field], key) for key, value in data.items() if value.get('is_public', True))
+
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="dict와 __slots__ 레코드의 메모리 사용량 비교")
+    parser.add_argument('--performances', type=int, default=100000, help="합성 연주 내역 수")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "data"
+        generate_dataset(source, args.performances, seed=args.seed, log=lambda *a: None)
+        print(f"연주 내역 {args.performances:,}건 | orjson {'있음' if codec.orjson else '없음'}")
+        print(f"\n{'파일':<20}{'방식':<9}{'레코드':>10}{'메모리(MB)':>12}{'최대(MB)':>10}{'B/건':>8}"
+              f"{'읽기(ms)':>10}{'순회(ms)':>10}")
+
+        for name, record_type, field in DATA_FILES:
+            raw = (source / name).read_bytes()
+            results = {}
+            for label, load in (('dict', load_plain), ('records', load_records)):
+                data, current, peak = retained(load, raw, record_type)
+                load_ms = measure(lambda: load(raw, record_type), args.repeat)
+                scan_ms = measure(lambda: scan(data, field), args.repeat)
+                results[label] = data
+                print(f"{name:<20}{label:<9}{len(data):>10,}{current / 1e6:>12.1f}{peak / 1e6:>10.1f}"
+                      f"{current / max(1, len(data)):>8.0f}{load_ms:>10.1f}{scan_ms:>10.1f}")
+            if results['dict'] != results['records']:
+                raise SystemExit(f"{name}: 레코드 내용이 다릅니다")
+            del results
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+인기순/급상승순 순위 - 재구성/상위 K 조회 시간과 동시 좋아요 토글 뒤 순위의 좋아요 수 확인
+
+    python benchmarks/bench_ranking.py [--backend json] [--performances 5000] [--threads 8] [--toggles 80]
+
+임시 디렉터리에 합성 데이터를 만들고 순위를 한 번 만든 뒤(재구성 시간), 캐시된 상위 50건
+조회 시간을 잽니다. 이어서 --threads개 스레드가 같은 Archive로 공개 공연 --targets개에
+각자 --toggles번씩 무작위 사용자의 좋아요를 토글합니다 (같은 공연을 동시에 토글).
+끝나면 재구성 없이 갱신만 한 순위의 좋아요 수가 백엔드에 저장된 좋아요 수와 같은지,
+인기순 상위 목록이 처음부터 정렬한 결과와 같은지 확인합니다.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import generate_dataset  # noqa: E402
+from opus_archive.backends import create_backend  # noqa: E402
+from opus_archive.ranking import POPULAR, TOP_K, TRENDING, Rankings  # noqa: E402
+from opus_archive.service import Archive  # noqa: E402
+
+
+def measure(fn, repeat):
+    """중앙값 (ms)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def toggle_concurrently(archive, targets, threads, toggles, users, seed):
+    """스레드마다 targets 중 하나에 무작위 사용자의 좋아요를 toggles번 토글"""
+    def worker(n):
+        rng = random.Random(seed + n)
+        for _ in range(toggles):
+            archive.toggle_like(rng.choice(targets), f"user{rng.randrange(users):05d}")
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+
+def naive_popular(backend, k):
+    """처음부터 정렬한 인기순 상위 k건 (비교 기준)"""
+    performances = sorted(backend.get_public_performances(),
+                          key=lambda p: (p.get('like_count', 0), p['date'], p['id']), reverse=True)
+    return [perf['id'] for perf in performances[:k]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="인기순/급상승순 순위 시간과 동시 토글 정합성")
+    parser.add_argument('--backend', default='json', choices=['json', 'jsonlog', 'sqlite'])
+    parser.add_argument('--performances', type=int, default=5000, help="합성 데이터 연주 내역 수")
+    parser.add_argument('--threads', type=int, default=8, help="동시에 토글하는 스레드 수")
+    parser.add_argument('--toggles', type=int, default=80, help="스레드마다 토글 수")
+    parser.add_argument('--targets', type=int, default=3, help="토글할 공개 공연 수")
+    parser.add_argument('--users', type=int, default=20, help="토글하는 사용자 수")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = Path(work_dir) / "data"
+        generate_dataset(data_dir, args.performances, seed=args.seed, log=lambda *a: None)
+        if args.backend == 'sqlite':
+            from opus_archive.backends import default_sqlite_path
+            from opus_archive.migrate import migrate
+            migrate(data_dir, default_sqlite_path(data_dir), log=lambda *a: None)
+        backend = create_backend(data_dir, args.backend)
+        archive = Archive(backend)
+
+        build_ms = measure(lambda: Rankings.build(backend), max(1, args.repeat // 4))
+        archive.get_ranked_performances(POPULAR)
+        top_ms = {order: measure(lambda: archive.get_ranked_performances(order), args.repeat)
+                  for order in (POPULAR, TRENDING)}
+
+        rankings = archive._ranking
+        targets = [perf['id'] for perf in backend.get_public_performances()[:args.targets]]
+        toggle_concurrently(archive, targets, args.threads, args.toggles, args.users, args.seed)
+
+        stored = backend.get_like_counts(targets)
+        ranked = {perf_id: rankings._entries[perf_id].likes for perf_id in targets}
+        drift = {perf_id: ranked[perf_id] - stored[perf_id] for perf_id in targets if ranked[perf_id] != stored[perf_id]}
+        rebuilt = archive._ranking is not rankings
+        same_top = [perf['id'] for perf in archive.get_ranked_performances(POPULAR)] == naive_popular(backend, TOP_K)
+
+    print(f"{args.backend} 백엔드, 연주 내역 {args.performances:,}건")
+    print(f"  순위 재구성 {build_ms:.1f}ms, 상위 {TOP_K}건 조회: 인기순 {top_ms[POPULAR]:.2f}ms, "
+          f"급상승순 {top_ms[TRENDING]:.2f}ms")
+    print(f"  스레드 {args.threads}개 x 토글 {args.toggles}번 (공연 {len(targets)}개)")
+    for perf_id in targets:
+        print(f"    {perf_id}: 순위 {ranked[perf_id]}, 저장 {stored[perf_id]}")
+    print(f"  어긋난 공연 {len(drift)}개, 토글 중 재구성 {'있음' if rebuilt else '없음'}, "
+          f"인기순 상위 {TOP_K}건 {'일치' if same_top else '불일치'}")
+    return 1 if drift or rebuilt or not same_top else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
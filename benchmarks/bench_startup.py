@@ -0,0 +1,104 @@
+"""
+시작/리런 오버헤드 벤치마크 - 데이터 계층 임포트 시간과 페이지 리런 시간
+
+    python benchmarks/bench_startup.py [--repeat 20] [--page 새 연주 기록]
+    python benchmarks/bench_startup.py --modules opus_archive.service,streamlit
+
+- import : 모듈마다 새 인터프리터에서 임포트에 걸린 시간 (중앙값)과 그때 함께 로드된
+           모듈 수, streamlit/numpy가 딸려 들어왔는지
+- rerun  : 작은 데이터로 AppTest를 띄워 한 페이지를 반복 실행한 시간 (첫 실행 제외)
+           - 리런마다 app.py 스크립트 전체를 다시 실행하는 비용
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+DEFAULT_MODULES = 'opus_archive.service,streamlit'
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{'ms': elapsed, 'modules': len(sys.modules),
+                  'streamlit': 'streamlit' in sys.modules, 'numpy': 'numpy' in sys.modules}}))
+"""
+
+
+def measure_import(module, repeat):
+    """새 인터프리터에서 module 임포트 -> (중앙값 ms, 마지막 실행 정보)"""
+    times = []
+    info = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _IMPORT_PROBE.format(module=module)], cwd=REPO,
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        info = json.loads(out.stdout)
+        times.append(info['ms'])
+    return statistics.median(times), info
+
+
+def measure_rerun(page, repeat):
+    """page를 AppTest로 repeat번 다시 실행 -> 중앙값 ms"""
+    from datagen import generate_dataset
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        generate_dataset(Path(tmp) / "data", 200, seed=42, log=lambda *a: None)
+        at = AppTest.from_file(str(REPO / "app.py"), default_timeout=120)
+        at.session_state.logged_in = True
+        at.session_state.current_user = 'user00000'
+        at.session_state.current_page = page
+        at.session_state.comment_submitted = False
+        at.session_state.editing_perf_id = None
+        at.session_state.active_auth_tab = 0
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            at.run()
+            times.append((time.perf_counter() - start) * 1000)
+        os.chdir(REPO)
+    return statistics.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터 계층 임포트 시간과 페이지 리런 오버헤드")
+    parser.add_argument('--modules', default=DEFAULT_MODULES, help="쉼표로 구분한 측정할 모듈")
+    parser.add_argument('--page', default="새 연주 기록", help="리런을 측정할 페이지")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--no-rerun', action='store_true', help="리런 측정 생략")
+    args = parser.parse_args(argv)
+
+    print(f"{'모듈':<28}{'임포트(ms)':>12}{'모듈 수':>9}{'streamlit':>11}{'numpy':>7}")
+    for module in [m.strip() for m in args.modules.split(',') if m.strip()]:
+        ms, info = measure_import(module, max(3, args.repeat // 4))
+        if ms is None:
+            print(f"{module:<28}  임포트 실패: {info}")
+            continue
+        print(f"{module:<28}{ms:>12.1f}{info['modules']:>9}{'예' if info['streamlit'] else '-':>11}"
+              f"{'예' if info['numpy'] else '-':>7}")
+
+    if not args.no_rerun:
+        ms = measure_rerun(args.page, args.repeat)
+        print(f"\n'{args.page}' 페이지 리런 중앙값: {ms:.1f} ms ({args.repeat}회)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
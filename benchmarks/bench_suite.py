@@ -0,0 +1,213 @@
+"""
+데이터 계층 벤치마크 - 규모별로 합성 데이터를 만들어 app.py가 쓰는 함수를 측정
+
+    python benchmarks/bench_suite.py [--scales 1k,10k,100k] [--backend json,sharded] [--repeat 5]
+    python benchmarks/bench_suite.py --scales 1m --output after.json --compare before.json
+
+규모마다 datagen으로 임시 디렉터리에 데이터를 만들고 (sqlite는 migrate로 옮기고,
+sharded는 reshard로 사용자별 샤드로 나눈 JSON 백엔드),
+별도 프로세스에서 측정해서 앞 규모의 캐시나 메모리가 다음 측정에 섞이지 않게 합니다.
+1m은 JSON 백엔드 기준 메모리가 3~4GB 필요합니다.
+
+측정 항목 (중앙값, ms):
+- load                     : 첫 공개 목록 조회 (파일 읽기/파싱 포함)
+- get_user_performances    : 기록이 가장 많은 축의 사용자 한 명
+- get_public_performances
+- filter_performances      : 공개 목록 + 장소/악기/기간 필터 (service.Archive.filter_performances와 같은 경로)
+- toggle_like / add_comment / delete_performance
+- render_public_page       : AppTest로 '공개 아카이브' 페이지 전체 실행 (--no-render로 생략)
+
+결과는 JSON으로 저장하고 (--output, 기본값 benchmarks/results/), --compare로 이전
+결과 파일과 항목별 배율을 비교합니다.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import generate_dataset  # noqa: E402
+from opus_archive import search  # noqa: E402
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1m': 1000000}
+DEFAULT_SCALES = '1k,10k,100k'
+
+FILTER_QUERY = {'venue': '콘서트홀', 'instrument': '첼로'}
+FILTER_DATES = ('2020-01-01', '2020-12-31')
+
+
+def measure(fn, repeat):
+    """fn(i)를 repeat번 -> 시간 목록 (ms)"""
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def summarize(times):
+    return {
+        'median_ms': round(statistics.median(times), 3),
+        'min_ms': round(min(times), 3),
+        'max_ms': round(max(times), 3),
+        'runs': len(times),
+    }
+
+
+def _busiest_user(backend):
+    counts = {}
+    for perf in backend.get_public_performances():
+        counts[perf['user_id']] = counts.get(perf['user_id'], 0) + 1
+    return max(counts, key=counts.get)
+
+
+def _render_public_page(work_dir, repeat):
+    """'공개 아카이브' 페이지를 AppTest로 실행 (첫 실행은 워밍업으로 제외)"""
+    from streamlit.testing.v1 import AppTest
+
+    os.chdir(work_dir)
+    at = AppTest.from_file(str(REPO / "app.py"), default_timeout=600)
+    at.session_state.logged_in = True
+    at.session_state.current_user = 'user00000'
+    at.session_state.current_page = "공개 아카이브"
+    at.session_state.comment_submitted = False
+    at.session_state.editing_perf_id = None
+    at.session_state.active_auth_tab = 0
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return measure(lambda i: at.run(), repeat)
+
+
+def run_scale(scale, kind, repeat, seed, render):
+    """한 규모 측정 (자식 프로세스에서 실행) -> [결과 dict]"""
+    from opus_archive.backends import create_backend, default_sqlite_path
+
+    # sharded는 JSON 백엔드 + 사용자별 샤드 레이아웃
+    backend_kind = 'json' if kind == 'sharded' else kind
+    os.environ['OPUS_STORAGE_BACKEND'] = backend_kind
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        start = time.perf_counter()
+        counts = generate_dataset(data_dir, SCALES[scale], seed=seed)
+        generate_s = time.perf_counter() - start
+        if kind == 'sqlite':
+            from opus_archive.migrate import migrate
+            os.environ['OPUS_SQLITE_PATH'] = str(data_dir / "archive.db")
+            migrate(data_dir, default_sqlite_path(data_dir), log=lambda *args: None)
+        elif kind == 'sharded':
+            from opus_archive.reshard import to_sharded
+            to_sharded(data_dir, log=lambda *args: None)
+
+        backend = create_backend(data_dir, backend_kind)
+        results = {}
+        results['load'] = measure(lambda i: backend.get_public_performances(), 1)
+        user_id = _busiest_user(backend)
+        public_ids = [p['id'] for p in backend.get_public_performances()[:repeat * 2]]
+
+        results['get_user_performances'] = measure(lambda i: backend.get_user_performances(user_id), repeat)
+        results['get_public_performances'] = measure(lambda i: backend.get_public_performances(), repeat)
+        results['filter_performances'] = measure(
+            lambda i: search.filter_records(backend.get_public_performances(), FILTER_QUERY, *FILTER_DATES), repeat)
+        if render:
+            results['render_public_page'] = _render_public_page(tmp, repeat)
+
+        now = datetime.now().isoformat()
+        results['toggle_like'] = measure(lambda i: backend.toggle_like(public_ids[i], 'bench_user', now), repeat)
+        results['add_comment'] = measure(lambda i: backend.add_comment({
+            'id': f"bench_comment_{i}", 'performance_id': public_ids[i], 'user_id': 'bench_user',
+            'content': '벤치마크 댓글', 'created_at': now}), repeat)
+        results['delete_performance'] = measure(lambda i: backend.delete_performance(public_ids[-1 - i]), repeat)
+
+    return [{'scale': scale, 'backend': kind, 'op': op, **counts, 'generate_s': round(generate_s, 2), **summarize(times)}
+            for op, times in results.items()]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    """이전 결과와 같은 (scale, backend, op)끼리 중앙값 배율 출력 (>1이면 느려짐)"""
+    before = {(r['scale'], r['backend'], r['op']): r['median_ms'] for r in previous['results']}
+    print(f"\n{'규모':<6}{'백엔드':<9}{'항목':<26}{'이전(ms)':>11}{'현재(ms)':>11}{'배율':>8}")
+    for r in results:
+        old = before.get((r['scale'], r['backend'], r['op']))
+        if old is None:
+            continue
+        ratio = r['median_ms'] / old if old else float('inf')
+        flag = '  ⚠️' if ratio > 1.2 else ''
+        print(f"{r['scale']:<6}{r['backend']:<9}{r['op']:<26}{old:>11.2f}{r['median_ms']:>11.2f}{ratio:>7.2f}x{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터 계층 규모별 벤치마크")
+    parser.add_argument('--scales', default=DEFAULT_SCALES, help=f"쉼표로 구분 ({', '.join(SCALES)})")
+    parser.add_argument('--backend', default='json', help="json, jsonlog, sqlite, sharded (쉼표로 여러 개)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-render', action='store_true', help="페이지 렌더링 측정 생략")
+    parser.add_argument('--output', help="결과 JSON 경로 (기본값: benchmarks/results/bench_<시각>.json)")
+    parser.add_argument('--compare', help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    scales = [s.strip().lower() for s in args.scales.split(',') if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"알 수 없는 규모: {', '.join(unknown)}")
+    kinds = [k.strip() for k in args.backend.split(',') if k.strip()]
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for kind in kinds:
+        for scale in scales:
+            print(f"[{kind} {scale}] 측정 중...", file=sys.stderr)
+            with context.Pool(1) as pool:
+                rows = pool.apply(run_scale, (scale, kind, args.repeat, args.seed, not args.no_render))
+            for r in rows:
+                print(f"  {r['op']:<26}{r['median_ms']:>11.2f} ms", file=sys.stderr)
+            results += rows
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    output = Path(args.output) if args.output else (
+        REPO / "benchmarks" / "results" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
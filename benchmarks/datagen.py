@@ -0,0 +1,246 @@
+"""
+합성 데이터 생성기 - 사용자, 연주 내역, 댓글, 좋아요를 JSON 백엔드 형식으로
+
+    python benchmarks/datagen.py --out data_bench --performances 100000 [--seed 42]
+
+같은 seed면 항상 같은 데이터가 나옵니다. 실제 아카이브처럼 분포를 치우치게 만듭니다.
+- 장소/곡목/지휘자: 자주 쓰이는 값이 훨씬 많이 나옴 (가중치, 지프 분포)
+- 사용자 활동량과 공연 인기도: 파레토 분포 (소수의 사용자/공연에 기록과 좋아요가 몰림)
+- 날짜: 최근 연도일수록 많음
+
+SQLite로 측정하려면 만든 디렉터리를 opus_archive.migrate로 옮기면 됩니다.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# (값, 가중치)
+VENUES = [
+    ('예술의전당 콘서트홀', 30), ('롯데콘서트홀', 20), ('세종문화회관', 15), ('LG아트센터', 8),
+    ('예술의전당 IBK챔버홀', 8), ('부천아트센터', 5), ('아트센터인천', 4), ('대전예술의전당', 4),
+    ('부산문화회관', 4), ('통영국제음악당', 3), ('광주문화예술회관', 2), ('금호아트홀', 3),
+]
+INSTRUMENT_PARTS = [
+    ('바이올린', ['1st Violin', '2nd Violin', 'Solo'], 40),
+    ('비올라', ['Viola'], 12),
+    ('첼로', ['Cello', 'Solo'], 14),
+    ('콘트라베이스', ['Bass'], 7),
+    ('플루트', ['1st', '2nd', 'Piccolo'], 5),
+    ('오보에', ['1st', '2nd'], 4),
+    ('클라리넷', ['1st', '2nd'], 5),
+    ('바순', ['1st', '2nd'], 3),
+    ('호른', ['1st', '2nd', '3rd', '4th'], 5),
+    ('트럼펫', ['1st', '2nd'], 3),
+    ('팀파니', ['Timpani'], 2),
+]
+PIECES = [
+    ('차이코프스키', ['교향곡 4번', '교향곡 5번', '교향곡 6번 "비창"', '바이올린 협주곡', '피아노 협주곡 1번', '호두까기 인형 모음곡'], 14),
+    ('베토벤', ['교향곡 3번 "영웅"', '교향곡 5번 "운명"', '교향곡 7번', '교향곡 9번 "합창"', '피아노 협주곡 5번 "황제"', '에그몬트 서곡'], 16),
+    ('브람스', ['교향곡 1번', '교향곡 2번', '교향곡 4번', '바이올린 협주곡', '대학축전 서곡', '헝가리 무곡 5번'], 10),
+    ('모차르트', ['교향곡 40번', '교향곡 41번 "주피터"', '피가로의 결혼 서곡', '피아노 협주곡 21번', '레퀴엠'], 9),
+    ('말러', ['교향곡 1번 "거인"', '교향곡 2번 "부활"', '교향곡 5번'], 6),
+    ('드보르작', ['교향곡 8번', '교향곡 9번 "신세계로부터"', '첼로 협주곡'], 7),
+    ('라흐마니노프', ['피아노 협주곡 2번', '피아노 협주곡 3번', '교향곡 2번'], 6),
+    ('시벨리우스', ['교향곡 2번', '바이올린 협주곡', '핀란디아'], 4),
+    ('쇼스타코비치', ['교향곡 5번', '축전 서곡', '재즈 모음곡 2번 왈츠'], 4),
+    ('멘델스존', ['바이올린 협주곡', '교향곡 4번 "이탈리아"', '핑갈의 동굴 서곡'], 5),
+    ('림스키코르사코프', ['셰에라자드', '스페인 기상곡'], 3),
+    ('라벨', ['볼레로', '라 발스', '어미 거위 모음곡'], 3),
+    ('윤이상', ['예악', '무악'], 1),
+]
+CITIES = [('서울', 30), ('부산', 8), ('대구', 5), ('인천', 5), ('대전', 4), ('광주', 4), ('수원', 4), ('성남', 3), ('고양', 2), ('창원', 2)]
+ENSEMBLE_KINDS = [('필하모닉 오케스트라', 5), ('심포니 오케스트라', 5), ('시립교향악단', 3), ('챔버 오케스트라', 2),
+                  ('청소년 오케스트라', 2), ('아마추어 오케스트라', 3), ('윈드 오케스트라', 1)]
+SURNAMES = [('김', 21), ('이', 15), ('박', 8), ('최', 5), ('정', 5), ('강', 2), ('조', 2), ('윤', 2), ('장', 2), ('임', 2),
+            ('한', 1), ('오', 1), ('서', 1), ('신', 1), ('권', 1), ('황', 1), ('안', 1), ('송', 1), ('홍', 1)]
+GIVEN = '민서준지현우영수진성호은정하윤재원승희동혁태경미소연주아'
+COMMENTS = ['멋진 연주였습니다!', '현장에서 들었는데 감동이었어요', '다음 공연도 기대합니다', '곡 선정이 좋네요',
+            '영상 잘 봤습니다', '저도 이 곡 연주해 보고 싶어요', '수고 많으셨습니다 👏', '앙코르가 최고였어요']
+
+START_DATE = date(2000, 1, 1)
+END_DATE = date(2025, 12, 31)
+
+
+def _weighted(rng, items):
+    """[(값, 가중치)] -> 값 하나"""
+    values, weights = zip(*items)
+    return rng.choices(values, weights)[0]
+
+
+def _zipf_weights(count, exponent=1.1):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def _cumulative(weights):
+    total = 0
+    result = []
+    for w in weights:
+        total += w
+        result.append(total)
+    return result
+
+
+def _recent_date(rng):
+    """최근일수록 많이 나오는 날짜"""
+    days = (END_DATE - START_DATE).days
+    back = min(days, int(rng.expovariate(1 / (days / 4))))
+    return (END_DATE - timedelta(days=back)).isoformat()
+
+
+def scale_counts(performances):
+    """연주 내역 수에 맞춘 기본 규모 (사용자, 댓글, 좋아요)"""
+    return {
+        'users': max(10, performances // 20),
+        'comments': performances // 2,
+        'likes': performances * 2,
+    }
+
+
+class _JsonObjectWriter:
+    """큰 JSON 객체를 항목 하나씩 파일에 쓰기 (전체를 dict로 만들지 않음)"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('{')
+        self.first = True
+
+    def write(self, key, value):
+        self.file.write(('' if self.first else ',') + json.dumps(key, ensure_ascii=False) + ':'
+                        + json.dumps(value, ensure_ascii=False))
+        self.first = False
+
+    def close(self):
+        self.file.write('}')
+        self.file.close()
+
+
+def generate_dataset(out_dir, performances, users=None, comments=None, likes=None, seed=42, log=None):
+    """out_dir에 users/performances/comments/likes/categories.json 생성 -> 만든 개수 dict
+
+    공연 ID는 perf_0 ... perf_{n-1}, 사용자는 user00000 ... 입니다.
+    like_count/comment_count는 생성한 좋아요/댓글과 맞춰서 기록합니다.
+    """
+    defaults = scale_counts(performances)
+    users = defaults['users'] if users is None else users
+    comments = defaults['comments'] if comments is None else comments
+    likes = defaults['likes'] if likes is None else likes
+    likes = min(likes, performances * users)
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+
+    user_ids = [f"user{i:05d}" for i in range(users)]
+    user_cum = _cumulative([rng.paretovariate(1.2) for _ in range(users)])
+    perf_cum = _cumulative([rng.paretovariate(1.1) for _ in range(performances)])
+    perf_index = range(performances)
+
+    # ---------- 사용자 ----------
+    writer = _JsonObjectWriter(out_dir / "users.json")
+    for user_id in user_ids:
+        writer.write(user_id, {'email': f"{user_id}@example.com", 'password': 'pw', 'created_at': '2024-01-01T00:00:00'})
+    writer.close()
+
+    # ---------- 좋아요 (인기 공연에 몰림, 공연+사용자 쌍은 한 번만) ----------
+    like_counts = [0] * performances
+    seen = set()
+    writer = _JsonObjectWriter(out_dir / "likes.json")
+    while len(seen) < likes:
+        batch = likes - len(seen)
+        for perf_i, user_id in zip(rng.choices(perf_index, cum_weights=perf_cum, k=batch),
+                                   rng.choices(user_ids, cum_weights=user_cum, k=batch)):
+            if (perf_i, user_id) in seen:
+                continue
+            seen.add((perf_i, user_id))
+            like_counts[perf_i] += 1
+            writer.write(f"perf_{perf_i}_{user_id}", {'performance_id': f"perf_{perf_i}", 'user_id': user_id,
+                                                        'created_at': '2024-01-01T00:00:00'})
+    writer.close()
+    del seen
+    log(f"좋아요 {likes:,}건")
+
+    # ---------- 댓글 ----------
+    comment_counts = [0] * performances
+    writer = _JsonObjectWriter(out_dir / "comments.json")
+    for i, (perf_i, user_id) in enumerate(zip(rng.choices(perf_index, cum_weights=perf_cum, k=comments),
+                                              rng.choices(user_ids, cum_weights=user_cum, k=comments))):
+        comment_counts[perf_i] += 1
+        comment_id = f"comment_{i}"
+        writer.write(comment_id, {'id': comment_id, 'performance_id': f"perf_{perf_i}", 'user_id': user_id,
+                                  'content': rng.choice(COMMENTS), 'created_at': f"2024-01-01T00:00:{i % 60:02d}"})
+    writer.close()
+    log(f"댓글 {comments:,}건")
+
+    # ---------- 연주 내역 ----------
+    conductors = [_weighted(rng, SURNAMES) + rng.choice(GIVEN) + rng.choice(GIVEN) for _ in range(max(20, users // 5))]
+    conductor_cum = _cumulative(_zipf_weights(len(conductors)))
+    ensembles = [f"{_weighted(rng, CITIES)} {_weighted(rng, ENSEMBLE_KINDS)}" + (f" {n}" if n else '')
+                 for n in range(max(20, users // 10))]
+    ensemble_cum = _cumulative(_zipf_weights(len(ensembles)))
+    pieces = [(f"{composer} {work}", weight) for composer, works, weight in PIECES for work in works]
+    piece_names, piece_weights = zip(*pieces)
+    owners = rng.choices(user_ids, cum_weights=user_cum, k=performances)
+
+    writer = _JsonObjectWriter(out_dir / "performances.json")
+    for i in perf_index:
+        perf_id = f"perf_{i}"
+        instrument, parts, _ = rng.choices(INSTRUMENT_PARTS, [w for _, _, w in INSTRUMENT_PARTS])[0]
+        is_guest = rng.random() < 0.25
+        writer.write(perf_id, {
+            'id': perf_id,
+            'user_id': owners[i],
+            'date': _recent_date(rng),
+            'venue': _weighted(rng, VENUES),
+            'pieces': list(dict.fromkeys(rng.choices(piece_names, piece_weights, k=rng.randint(1, 4)))),
+            'instrument': instrument,
+            'sub_part': rng.choice(parts),
+            'is_guest': is_guest,
+            'guest_fee': rng.randrange(5, 50) * 10000 if is_guest else '',
+            'conductor': rng.choices(conductors, cum_weights=conductor_cum)[0],
+            'ensemble_name': rng.choices(ensembles, cum_weights=ensemble_cum)[0],
+            'is_public': rng.random() < 0.8,
+            'youtube_url': '',
+            'poster_url': '',
+            'created_at': '2024-01-01T00:00:00',
+            'like_count': like_counts[i],
+            'comment_count': comment_counts[i]
+        })
+    writer.close()
+    log(f"연주 내역 {performances:,}건")
+
+    categories = {
+        'venues': [venue for venue, _ in VENUES],
+        'instruments': [instrument for instrument, _, _ in INSTRUMENT_PARTS],
+        'sub_parts': sorted({part for _, parts, _ in INSTRUMENT_PARTS for part in parts}),
+    }
+    with open(out_dir / "categories.json", 'w', encoding='utf-8') as f:
+        json.dump(categories, f, ensure_ascii=False, indent=2)
+    return {'users': users, 'performances': performances, 'comments': comments, 'likes': likes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 데이터를 JSON 백엔드 형식으로 만듭니다.")
+    parser.add_argument('--out', required=True, help="만들 데이터 디렉터리")
+    parser.add_argument('--performances', type=int, default=10000)
+    parser.add_argument('--users', type=int, help="기본값: 연주 내역 / 20")
+    parser.add_argument('--comments', type=int, help="기본값: 연주 내역 / 2")
+    parser.add_argument('--likes', type=int, help="기본값: 연주 내역 x 2")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = generate_dataset(args.out, args.performances, args.users, args.comments, args.likes, args.seed,
+                              log=lambda message: print(message, file=sys.stderr))
+    print(f"{args.out}: " + ', '.join(f"{k} {v:,}" for k, v in counts.items())
+          + f" ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
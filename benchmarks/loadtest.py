@@ -0,0 +1,427 @@
+"""
+다중 세션 부하 테스트 - AppTest로 실제 app.py를 여러 로그인 사용자가 동시에 사용
+
+    python benchmarks/loadtest.py [--users 8] [--actions 30] [--writers 2] [--backend json]
+
+datagen으로 만든 데이터 위에서 가상 사용자마다 AppTest 세션을 하나씩 열고 무작위
+동작을 반복합니다. AppTest는 프로세스 전역 Runtime을 쓰므로 한 프로세스에서 여러
+세션을 동시에 돌릴 수 없어서, 가상 사용자마다 프로세스 하나가 같은 데이터 디렉터리를
+나눠 씁니다 (서버 여러 대 - 프로세스 간 파일 잠금 검증). --writers를 주면 프로세스마다
+그 수만큼 스레드가 앱과 같은 백엔드 인스턴스(get_backend)로 좋아요/댓글을 계속 써서
+한 서버 안의 동시 쓰기(그룹 커밋)도 함께 부하를 줍니다.
+
+사용자(와 쓰기 스레드)마다 다른 계정을 쓰므로 각자의 좋아요/댓글/수정의 최종 결과를
+정확히 예상할 수 있고, 끝나면 저장된 데이터와 비교해서 유실된 쓰기(lost update)를 셉니다.
+
+동작 (가중치):
+- browse  : 사이드바에서 '공개 아카이브'로 이동 (다음 페이지가 있으면 넘김)
+- like    : 공개 아카이브 카드의 좋아요 버튼
+- comment : 공개 아카이브 카드에 댓글 작성
+- search  : '검색/필터'에서 통합 검색 (작곡가 이름)
+- create  : '새 연주 기록'의 performance_form 저장
+- edit    : '내 연주 내역'에서 ✏️ -> edit_performance_form 저장 (지휘자 변경)
+
+보고: 동작별/리런 지연 시간 p50/p90/p99, 처리량 (리런/초, 동작/초), 예외 수, 유실된 쓰기 수.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import PIECES, generate_dataset  # noqa: E402
+
+ACTIONS = {'browse': 4, 'like': 3, 'comment': 2, 'search': 2, 'create': 1, 'edit': 1}
+
+PAGE_BUTTONS = {
+    "공개 아카이브": "🌍 공개 아카이브",
+    "검색/필터": "🔍 검색/필터",
+    "새 연주 기록": "✏️ 새 연주 기록",
+    "내 연주 내역": "📚 내 연주 내역",
+}
+
+WIDGET_TYPES = ('button', 'text_input', 'text_area', 'checkbox', 'selectbox', 'radio', 'date_input', 'number_input')
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class VirtualUser:
+    """AppTest 세션 하나 - 동작을 실행하고 예상 결과를 기록"""
+
+    def __init__(self, vu_id, user_id, seed):
+        from streamlit.testing.v1 import AppTest
+
+        self.vu_id = vu_id
+        self.user_id = user_id
+        self.rng = random.Random(seed)
+        self.at = AppTest.from_file(str(REPO / "app.py"), default_timeout=600)
+        state = self.at.session_state
+        state.logged_in = True
+        state.current_user = user_id
+        state.current_page = "공개 아카이브"
+        state.comment_submitted = False
+        state.editing_perf_id = None
+        state.active_auth_tab = 0
+
+        self.reruns = []            # 리런 한 번의 시간 (ms)
+        self.actions = {}           # 동작 -> [시간 ms]
+        self.errors = []
+        # 예상 결과
+        self.like_toggles = {}      # 공연 ID -> 토글 횟수
+        self.comments = []          # (공연 ID, 내용)
+        self.created = []           # 새 연주 기록의 지휘자 이름 (고유)
+        self.edits = {}             # 공연 ID -> 마지막으로 저장한 지휘자
+        self.counter = 0
+
+    # ---------- AppTest 헬퍼 ----------
+
+    def run(self, element=None):
+        """리런 한 번 (element가 있으면 그 위젯 조작 후) - 예외가 있으면 기록"""
+        start = time.perf_counter()
+        (element.run() if element is not None else self.at.run())
+        self.reruns.append((time.perf_counter() - start) * 1000)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+        if self.stale_tree():
+            # 위젯 값 없이 한 번 더 실행해서 마지막 화면만으로 트리를 다시 만듦 (측정 제외)
+            self.at._run(None)
+
+    def stale_tree(self):
+        """앱이 st.rerun()을 부르면 AppTest는 중단된 첫 실행의 메시지까지 합쳐서 트리를
+        만듭니다. 그 위젯들은 상태가 이미 지워져서 다음 조작 때 값을 보내다 KeyError가
+        나거나 엉뚱한 콜백이 불리므로, 상태에 없는 위젯이 남아 있는지 확인합니다."""
+        state = self.at.session_state
+        return any(widget.id not in state for kind in WIDGET_TYPES for widget in self.at.get(kind))
+
+    def button(self, key=None, label=None):
+        for b in self.at.button:
+            if (key is not None and b.key == key) or (label is not None and b.label == label):
+                return b
+        return None
+
+    def goto(self, page):
+        """사이드바로 이동 (이미 그 페이지면 새로 고침 - 다른 사용자의 변경이 보이도록)"""
+        if self.at.session_state.current_page == page:
+            self.run()
+        else:
+            self.run(self.button(label=PAGE_BUTTONS[page]).click())
+
+    def card_ids(self, prefix):
+        return [b.key[len(prefix):] for b in self.at.button if b.key and b.key.startswith(prefix)]
+
+    def unique(self, kind):
+        self.counter += 1
+        return f"LT-{kind}-{self.vu_id}-{self.counter}"
+
+    # ---------- 동작 ----------
+
+    def browse(self):
+        self.goto("공개 아카이브")
+        next_button = self.button(key="public_perfs_next")
+        if next_button is not None and not next_button.disabled and self.rng.random() < 0.5:
+            self.run(next_button.click())
+
+    def like(self):
+        self.goto("공개 아카이브")
+        perf_ids = self.card_ids('like_')
+        if not perf_ids:
+            return
+        perf_id = self.rng.choice(perf_ids)
+        self.run(self.button(key=f"like_{perf_id}").click())
+        self.like_toggles[perf_id] = self.like_toggles.get(perf_id, 0) + 1
+
+    def comment(self):
+        self.goto("공개 아카이브")
+        perf_ids = self.card_ids('submit_comment_')
+        if not perf_ids:
+            return
+        perf_id = self.rng.choice(perf_ids)
+        content = self.unique('comment')
+        self.at.text_input(key=f"comment_{perf_id}").input(content)
+        self.run(self.button(key=f"submit_comment_{perf_id}").click())
+        self.comments.append((perf_id, content))
+
+    def search(self):
+        self.goto("검색/필터")
+        composer = self.rng.choice(PIECES)[0]
+        self.at.text_input(key="search_query").input(composer)
+        self.run(self.button(label="🔍 검색").click())
+
+    def create(self):
+        self.goto("새 연주 기록")
+        conductor = self.unique('create')
+        self.at.text_input(key="perf_conductor").input(conductor)
+        self.at.text_input(key="perf_ensemble").input("부하 테스트 필하모닉")
+        next(c for c in self.at.checkbox if c.label == "1부 있음").check()
+        self.run()
+        self.at.text_area(key="part1").input("베토벤 교향곡 7번")
+        self.run(self.at.button(key="FormSubmitter:performance_form-💾 저장").click())
+        self.created.append(conductor)
+
+    def edit(self):
+        self.goto("내 연주 내역")
+        perf_ids = self.card_ids('edit_')
+        if not perf_ids:
+            return
+        perf_id = self.rng.choice(perf_ids)
+        self.run(self.button(key=f"edit_{perf_id}").click())
+        conductor = self.unique('edit')
+        self.at.text_input(key="edit_perf_conductor").input(conductor)
+        self.run(self.at.button(key="FormSubmitter:edit_performance_form-💾 저장").click())
+        self.edits[perf_id] = conductor
+
+    def loop(self, count):
+        names, weights = zip(*ACTIONS.items())
+        self.run()
+        for _ in range(count):
+            action = self.rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                getattr(self, action)()
+            except Exception as e:
+                self.errors.append(f"{action}: {type(e).__name__}: {e}")
+                # 세션 상태가 꼬였을 수 있으니 공개 아카이브에서 다시 시작
+                self.at.session_state.current_page = "공개 아카이브"
+                self.at.session_state.editing_perf_id = None
+                continue
+            self.actions.setdefault(action, []).append((time.perf_counter() - start) * 1000)
+
+    def result(self):
+        return {
+            'user_id': self.user_id, 'reruns': self.reruns, 'actions': self.actions, 'errors': self.errors,
+            'like_toggles': self.like_toggles, 'comments': self.comments,
+            'created': self.created, 'edits': self.edits,
+        }
+
+
+class Writer:
+    """앱과 같은 백엔드 인스턴스로 좋아요/댓글을 직접 쓰는 스레드 (한 서버 안의 동시 쓰기)"""
+
+    def __init__(self, user_id, perf_ids, seed):
+        self.user_id = user_id
+        self.perf_ids = perf_ids
+        self.rng = random.Random(seed)
+        self.like_toggles = {}
+        self.comments = []
+        self.errors = []
+        self.stop = threading.Event()
+
+    def loop(self, backend):
+        from datetime import datetime
+
+        count = 0
+        while not self.stop.is_set():
+            perf_id = self.rng.choice(self.perf_ids)
+            try:
+                if self.rng.random() < 0.6:
+                    backend.toggle_like(perf_id, self.user_id, datetime.now().isoformat())
+                    self.like_toggles[perf_id] = self.like_toggles.get(perf_id, 0) + 1
+                else:
+                    count += 1
+                    content = f"LT-writer-{self.user_id}-{count}"
+                    backend.add_comment({'id': f"comment_{self.user_id}_{count}", 'performance_id': perf_id,
+                                         'user_id': self.user_id, 'content': content,
+                                         'created_at': datetime.now().isoformat()})
+                    self.comments.append((perf_id, content))
+            except Exception as e:
+                self.errors.append(f"writer: {type(e).__name__}: {e}")
+            time.sleep(0.01)
+
+    def result(self):
+        return {'user_id': self.user_id, 'reruns': [], 'actions': {}, 'errors': self.errors,
+                'like_toggles': self.like_toggles, 'comments': self.comments, 'created': [], 'edits': {}}
+
+
+def writer_ids(vu_index, writers):
+    return [f"lt_writer_{vu_index}_{k}" for k in range(writers)]
+
+
+def run_worker(work_dir, backend_kind, vu_index, user_id, actions, writers, seed):
+    """프로세스 하나 - 가상 사용자 하나 (+ 쓰기 스레드) -> 결과 목록"""
+    os.chdir(work_dir)
+    os.environ['OPUS_STORAGE_BACKEND'] = backend_kind
+    from opus_archive.backends import get_backend
+
+    backend = get_backend("data")
+    perf_ids = [p['id'] for p in backend.get_public_performances_page(50)[0]]
+    background = [Writer(writer_id, perf_ids, seed + k) for k, writer_id in enumerate(writer_ids(vu_index, writers))]
+    threads = [threading.Thread(target=w.loop, args=(backend,)) for w in background]
+    for t in threads:
+        t.start()
+
+    vu = VirtualUser(vu_index, user_id, seed)
+    try:
+        vu.loop(actions)
+    finally:
+        for w in background:
+            w.stop.set()
+        for t in threads:
+            t.join()
+    return [vu.result()] + [w.result() for w in background]
+
+
+# ==================== 검증 ====================
+
+def snapshot(backend, user_ids):
+    """검증 기준 상태 - 가상 사용자의 좋아요, 공연별 개수, 사용자별 연주 내역"""
+    records = {perf['id']: perf for perf in backend.iter_performances()}
+    likes = {user_id: backend.get_liked_set(user_id, list(records)) for user_id in user_ids}
+    return records, likes
+
+
+def verify(backend, before, results):
+    """예상 결과와 저장된 데이터 비교 -> (유실된 쓰기 수, 설명 목록)"""
+    records_before, likes_before = before
+    user_ids = [r['user_id'] for r in results]
+    records_after, likes_after = snapshot(backend, user_ids)
+    problems = []
+
+    # 좋아요: 토글 횟수가 홀수면 상태가 뒤집혀 있어야 함, 개수는 증감의 합
+    like_delta = {}
+    for r in results:
+        for perf_id, toggles in r['like_toggles'].items():
+            was = perf_id in likes_before[r['user_id']]
+            expected = was != (toggles % 2 == 1)
+            if (perf_id in likes_after[r['user_id']]) != expected:
+                problems.append(f"좋아요 상태 유실: {perf_id} / {r['user_id']}")
+            if expected != was:
+                like_delta[perf_id] = like_delta.get(perf_id, 0) + (1 if expected else -1)
+
+    comment_delta = {}
+    comment_ids = [perf_id for r in results for perf_id, _ in r['comments']]
+    grouped = backend.get_comments_grouped(list(set(comment_ids)))
+    for r in results:
+        for perf_id, content in r['comments']:
+            comment_delta[perf_id] = comment_delta.get(perf_id, 0) + 1
+            if not any(c['content'] == content for c in grouped[perf_id]):
+                problems.append(f"댓글 유실: {perf_id} '{content}'")
+
+    like_counts = backend.get_like_counts(list(like_delta))
+    for perf_id in set(like_delta) | set(comment_delta):
+        before_perf, after_perf = records_before[perf_id], records_after.get(perf_id)
+        if after_perf is None:
+            problems.append(f"연주 내역 사라짐: {perf_id}")
+            continue
+        expected_likes = before_perf.get('like_count', 0) + like_delta.get(perf_id, 0)
+        if after_perf.get('like_count', 0) != expected_likes:
+            problems.append(f"like_count 불일치: {perf_id} {after_perf.get('like_count')} != {expected_likes}")
+        if perf_id in like_counts and like_counts[perf_id] != expected_likes:
+            problems.append(f"좋아요 수 불일치: {perf_id} {like_counts[perf_id]} != {expected_likes}")
+        expected_comments = before_perf.get('comment_count', 0) + comment_delta.get(perf_id, 0)
+        if after_perf.get('comment_count', 0) != expected_comments:
+            problems.append(f"comment_count 불일치: {perf_id} {after_perf.get('comment_count')} != {expected_comments}")
+
+    conductors = {(p['user_id'], p['conductor']) for p in records_after.values()}
+    for r in results:
+        for conductor in r['created']:
+            if (r['user_id'], conductor) not in conductors:
+                problems.append(f"새 연주 기록 유실: {r['user_id']} {conductor}")
+        for perf_id, conductor in r['edits'].items():
+            after_perf = records_after.get(perf_id)
+            if after_perf is None or after_perf['conductor'] != conductor:
+                problems.append(f"수정 유실: {perf_id} {conductor}")
+    return len(problems), problems
+
+
+# ==================== 실행 ====================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AppTest 기반 다중 세션 부하 테스트")
+    parser.add_argument('--users', type=int, default=8, help="가상 사용자 수 (사용자마다 프로세스 하나)")
+    parser.add_argument('--writers', type=int, default=0, help="프로세스마다 백엔드에 직접 쓰는 스레드 수")
+    parser.add_argument('--actions', type=int, default=30, help="가상 사용자당 동작 수")
+    parser.add_argument('--performances', type=int, default=5000, help="합성 데이터 연주 내역 수")
+    parser.add_argument('--backend', default='json', choices=['json', 'jsonlog', 'sqlite'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = Path(work_dir) / "data"
+        generate_dataset(data_dir, args.performances, seed=args.seed)
+        os.environ['OPUS_STORAGE_BACKEND'] = args.backend
+        if args.backend == 'sqlite':
+            from opus_archive.migrate import migrate
+            os.environ['OPUS_SQLITE_PATH'] = str(data_dir / "archive.db")
+            migrate(data_dir, data_dir / "archive.db", log=lambda *a: None)
+
+        from opus_archive.backends import create_backend
+        backend = create_backend(data_dir)
+        # 연주 내역이 많은 사용자부터 (수정할 기록이 있도록)
+        owned = {}
+        for perf in backend.iter_performances():
+            owned[perf['user_id']] = owned.get(perf['user_id'], 0) + 1
+        user_ids = sorted(owned, key=lambda u: -owned[u])[:args.users]
+        all_ids = user_ids + [w for i in range(len(user_ids)) for w in writer_ids(i, args.writers)]
+        before = snapshot(backend, all_ids)
+
+        context = multiprocessing.get_context('spawn')
+        print(f"가상 사용자 {len(user_ids)}명 x 동작 {args.actions}개, 쓰기 스레드 {args.writers}개/프로세스, "
+              f"{args.backend} 백엔드, 연주 내역 {args.performances:,}건", file=sys.stderr)
+        start = time.perf_counter()
+        with context.Pool(len(user_ids)) as pool:
+            jobs = [pool.apply_async(run_worker, (work_dir, args.backend, i, user_id, args.actions, args.writers,
+                                                  args.seed + 1000 * i))
+                    for i, user_id in enumerate(user_ids)]
+            results = [r for job in jobs for r in job.get()]
+        elapsed = time.perf_counter() - start
+
+        verify_backend = create_backend(data_dir)
+        lost, problems = verify(verify_backend, before, results)
+
+    reruns = [ms for r in results for ms in r['reruns']]
+    by_action = {}
+    for r in results:
+        for action, times in r['actions'].items():
+            by_action.setdefault(action, []).extend(times)
+    errors = [e for r in results for e in r['errors']]
+
+    def stats(values):
+        return {'count': len(values), 'p50_ms': percentile(values, 0.5), 'p90_ms': percentile(values, 0.9),
+                'p99_ms': percentile(values, 0.99), 'mean_ms': statistics.fmean(values) if values else None}
+
+    report = {
+        'config': vars(args),
+        'elapsed_s': round(elapsed, 2),
+        'throughput': {'reruns_per_s': round(len(reruns) / elapsed, 2),
+                       'actions_per_s': round(sum(len(t) for t in by_action.values()) / elapsed, 2)},
+        'reruns': stats(reruns),
+        'actions': {action: stats(times) for action, times in sorted(by_action.items())},
+        'errors': errors,
+        'lost_updates': lost,
+        'problems': problems[:100],
+    }
+
+    print(f"\n{'항목':<10}{'횟수':>7}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}")
+    for name, s in [('rerun', report['reruns'])] + list(report['actions'].items()):
+        if s['count']:
+            print(f"{name:<10}{s['count']:>7}{s['p50_ms']:>10.1f}{s['p90_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+    print(f"\n경과 {elapsed:.1f}s | 리런 {report['throughput']['reruns_per_s']}/s | "
+          f"동작 {report['throughput']['actions_per_s']}/s | 예외 {len(errors)}건 | 유실된 쓰기 {lost}건")
+    for message in errors[:10] + problems[:10]:
+        print(f"  - {message}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if lost or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+My Opus Archive - 데이터 계층 패키지 (Streamlit 비의존)
+"""
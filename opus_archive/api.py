@@ -0,0 +1,459 @@
+"""
+로컬 HTTP/JSON API - 공개 아카이브 읽기와 좋아요/댓글 쓰기 (표준 라이브러리 http.server)
+
+모바일 앱이나 제휴 사이트가 Streamlit 화면을 거치지 않고 같은 데이터 함수
+(service.Archive)를 쓰게 합니다. 같은 프로세스에서 띄우면 get_archive가 같은 Archive를
+돌려주므로 화면과 저장소 캐시/검색 색인을 그대로 공유하고, 따로 띄워도 같은 데이터
+디렉터리를 보므로 저장소의 프로세스 간 일관성(store/eventlog/SQLite)이 그대로 적용됩니다.
+
+    python -m opus_archive.api --data-dir data --port 8502 --workers 8
+    OPUS_API_PORT=8502 streamlit run app.py      # 앱 프로세스 안에서 함께 띄우기
+
+엔드포인트 (응답은 모두 JSON):
+    GET  /api/performances                    공개 연주 내역 (최신순)
+         ?limit=20&cursor=...                 페이지 (limit 최대 100, 다음 페이지는 next_cursor)
+         &venue=&conductor=&ensemble=&instrument=&date_from=&date_to=   필터 (filter_performances)
+         ?order=popular|trending&limit=50     인기순/급상승순 상위 (limit 최대 ranking.TOP_K, 페이지 없음)
+    GET  /api/performances/<id>               연주 내역 한 건
+    GET  /api/performances/<id>/comments      댓글 목록 (작성 시간순)
+    POST /api/performances/<id>/comments      댓글 작성 {"content": "..."} -> 201 {"id": ...}
+    POST /api/performances/<id>/like          좋아요 토글 -> {"liked": ..., "like_count": ...}
+
+쓰기는 HTTP Basic 인증(앱과 같은 사용자명/비밀번호)이 필요합니다. 비공개 연주 내역은
+작성자 본인에게만 보입니다 (나머지에게는 404).
+GET 응답에는 ETag가 붙고 If-None-Match가 맞으면 304를 돌려줍니다. ETag는 백엔드의
+data_version(연주 내역/댓글/좋아요가 바뀌면 달라지는 값)으로 만들기 때문에 304일 때는
+목록을 만들지 않습니다. data_version이 없는 백엔드는 응답 본문의 해시를 씁니다.
+필터 결과는 data_version이 같은 동안 서버가 기억하므로 필터 목록의 다음 페이지는
+공개 목록 전체를 다시 거르지 않습니다.
+
+요청은 정해진 개수의 작업 스레드(ThreadPoolExecutor)가 처리합니다. HTTP/1.1
+keep-alive 연결은 열려 있는 동안 작업 스레드 하나를 차지하므로, 작업 스레드를 기다리는
+연결이 있으면 응답 뒤 연결을 닫아(Connection: close) 차례를 넘기고, 요청 없이 기다리는
+연결은 IDLE_TIMEOUT초 뒤에 닫습니다.
+"""
+
+import argparse
+import base64
+import binascii
+import bisect
+import hashlib
+import json
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from . import codec
+from .ranking import ORDERS, TOP_K
+from .service import FILTER_FIELDS, get_archive
+
+DEFAULT_PORT = 8502
+DEFAULT_WORKERS = 8
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_BODY_BYTES = 64 * 1024
+IDLE_TIMEOUT = 5               # 초 - keep-alive 연결이 요청 없이 기다리는 최대 시간
+FILTER_CACHE_SIZE = 32         # data_version 하나 동안 기억하는 필터 결과 수
+FILTER_PARAMS = tuple(FILTER_FIELDS) + ('date_from', 'date_to')
+
+# 서버를 다시 띄우면 data_version이 처음부터 다시 세어지므로 ETag에 프로세스 표시를 섞음
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class ApiError(Exception):
+    """HTTP 오류 응답 (status, 메시지)"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+# ==================== 커서 / 페이지 ====================
+
+def encode_cursor(cursor):
+    """(date, id) 커서 -> URL에 그대로 쓸 수 있는 문자열"""
+    if cursor is None:
+        return None
+    raw = json.dumps(list(cursor), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(text):
+    """encode_cursor의 반대 (형식이 틀리면 ApiError 400)"""
+    if not text:
+        return None
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(text + '=' * (-len(text) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        cursor = None
+    if not (isinstance(cursor, list) and len(cursor) == 2 and all(isinstance(v, str) for v in cursor)):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "cursor 값이 올바르지 않습니다.")
+    return tuple(cursor)
+
+
+def page_records(records, limit, cursor=None):
+    """(date, id) 역순 목록에서 cursor 다음 limit개 -> (목록, 다음 페이지 커서)
+
+    백엔드의 *_page와 같은 키셋 방식이라 필터 결과에도 같은 커서를 씁니다.
+    """
+    start = 0
+    if cursor is not None:
+        # 역순이므로 "cursor보다 작은가"는 앞쪽이 모두 False, 뒤쪽이 모두 True - 처음 True인 자리를 이분 탐색
+        start = bisect.bisect_left(records, True, key=lambda p: (p['date'], p['id']) < cursor)
+    items = records[start:start + limit]
+    if start + limit < len(records):
+        return items, (items[-1]['date'], items[-1]['id'])
+    return items, None
+
+
+# ==================== 요청 처리 ====================
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """/api/... 요청 하나 (server.archive로 데이터 함수 호출)"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'OpusArchiveAPI/1.0'
+    timeout = IDLE_TIMEOUT
+    # 헤더와 본문을 따로 보내므로 Nagle이 켜져 있으면 keep-alive 응답마다 지연된 ACK(~40ms)를 기다림
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    @property
+    def archive(self):
+        return self.server.archive
+
+    # ---------- 라우팅 ----------
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        try:
+            if parts[:2] != ['api', 'performances'] or len(parts) > 4:
+                raise ApiError(HTTPStatus.NOT_FOUND, "없는 경로입니다.")
+            route = (method, len(parts), parts[3] if len(parts) == 4 else None)
+            if route == ('GET', 2, None):
+                self._get(lambda version: self.list_performances(parse_qs(url.query), version))
+            elif route == ('GET', 3, None):
+                self._get(lambda version: self.performance_detail(parts[2]))
+            elif route == ('GET', 4, 'comments'):
+                self._get(lambda version: self.list_comments(parts[2]))
+            elif route == ('POST', 4, 'comments'):
+                self._send(HTTPStatus.CREATED, self.post_comment(parts[2], self._read_json()))
+            elif route == ('POST', 4, 'like'):
+                self._send(HTTPStatus.OK, self.post_like(parts[2]))
+            elif (len(parts), route[2]) in ((2, None), (3, None), (4, 'comments'), (4, 'like')):
+                raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "지원하지 않는 메서드입니다.")
+            else:
+                raise ApiError(HTTPStatus.NOT_FOUND, "없는 경로입니다.")
+        except ApiError as e:
+            self._send(e.status, {'error': e.message}, e.headers)
+        except Exception as e:
+            self.log_error("요청 처리 실패: %r", e)
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': "서버 오류가 발생했습니다."})
+
+    # ---------- 엔드포인트 ----------
+
+    def list_performances(self, query, version):
+        """공개 연주 내역 한 페이지 (필터가 있으면 filter_performances 결과에서, order가 있으면 순위 상위)"""
+        order = _param(query, 'order')
+        cursor = decode_cursor(_param(query, 'cursor'))
+        filters = {key: _param(query, key) for key in FILTER_PARAMS if _param(query, key)}
+        if order is not None:
+            if order not in ORDERS:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"order는 {', '.join(ORDERS)} 중 하나여야 합니다.")
+            if filters or cursor is not None:
+                raise ApiError(HTTPStatus.BAD_REQUEST, "order는 필터/cursor와 함께 쓸 수 없습니다.")
+            items = self.archive.get_ranked_performances(order, _int_param(query, 'limit', TOP_K, 1, TOP_K))
+            return {'items': items, 'next_cursor': None, 'total': len(items)}
+        limit = _int_param(query, 'limit', DEFAULT_LIMIT, 1, MAX_LIMIT)
+        if filters:
+            records = self.server.filtered_performances(version, filters)
+            items, next_cursor = page_records(records, limit, cursor)
+            total = len(records)
+        else:
+            items, next_cursor = self.archive.get_public_performances_page(limit, cursor)
+            total = self.archive.count_public_performances()
+        return {'items': items, 'next_cursor': encode_cursor(next_cursor), 'total': total}
+
+    def performance_detail(self, perf_id):
+        return self._visible_performance(perf_id, self._optional_user())
+
+    def list_comments(self, perf_id):
+        self._visible_performance(perf_id, self._optional_user())
+        return {'items': self.archive.get_comments(perf_id)}
+
+    def post_comment(self, perf_id, body):
+        user_id = self._require_user()
+        self._visible_performance(perf_id, user_id)
+        content = body.get('content')
+        if not isinstance(content, str) or not content.strip():
+            raise ApiError(HTTPStatus.BAD_REQUEST, "댓글을 입력해주세요.")
+        return {'id': self.archive.add_comment(perf_id, user_id, content)}
+
+    def post_like(self, perf_id):
+        self._read_body(required=False)      # 본문은 쓰지 않음
+        user_id = self._require_user()
+        self._visible_performance(perf_id, user_id)
+        liked, message = self.archive.toggle_like(perf_id, user_id)
+        return {'liked': liked, 'message': message, 'like_count': self.archive.get_like_count(perf_id)}
+
+    # ---------- 인증 / 권한 ----------
+
+    def _credentials(self):
+        """Authorization: Basic 헤더 -> (사용자명, 비밀번호) 또는 None"""
+        header = self.headers.get('Authorization', '')
+        scheme, _, value = header.partition(' ')
+        if scheme.lower() != 'basic' or not value:
+            return None
+        try:
+            username, sep, password = base64.b64decode(value.strip()).decode('utf-8').partition(':')
+        except (binascii.Error, UnicodeDecodeError):
+            return None
+        return (username, password) if sep else None
+
+    def _optional_user(self):
+        """로그인 정보가 있으면 확인한 사용자명 (없으면 None, 틀리면 401)"""
+        if self.headers.get('Authorization') is None:
+            return None
+        return self._require_user()
+
+    def _require_user(self):
+        credentials = self._credentials()
+        if credentials is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "로그인이 필요합니다.",
+                           {'WWW-Authenticate': 'Basic realm="opus-archive"'})
+        ok, message = self.archive.login_user(*credentials)
+        if not ok:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, message, {'WWW-Authenticate': 'Basic realm="opus-archive"'})
+        return credentials[0]
+
+    def _visible_performance(self, perf_id, user_id):
+        """공개이거나 본인 것인 연주 내역 (아니면 404 - 비공개 공연이 있는지도 알리지 않음)"""
+        perf = self.archive.get_performance(perf_id)
+        if perf is None or not (perf.get('is_public') or perf['user_id'] == user_id):
+            raise ApiError(HTTPStatus.NOT_FOUND, "연주 내역이 없습니다.")
+        return perf
+
+    # ---------- 요청/응답 ----------
+
+    def _read_body(self, required=True):
+        """요청 본문 (Content-Length만큼) - 읽지 않은 본문은 keep-alive 연결의 다음 요청으로 읽히므로
+        쓰지 않는 본문도 읽어 버리고, 길이를 믿을 수 없으면 응답 뒤 연결을 닫음"""
+        length = self.headers.get('Content-Length')
+        if length is None:
+            if required or self.headers.get('Transfer-Encoding'):
+                self.close_connection = True
+                raise ApiError(HTTPStatus.LENGTH_REQUIRED, "Content-Length가 필요합니다.")
+            return b''
+        if not length.isdigit():
+            self.close_connection = True
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Content-Length가 올바르지 않습니다.")
+        if int(length) > MAX_BODY_BYTES:
+            self.close_connection = True
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "요청 본문이 너무 큽니다.")
+        return self.rfile.read(int(length))
+
+    def _read_json(self):
+        raw = self._read_body()
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "JSON 본문이 올바르지 않습니다.")
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "JSON 객체를 보내야 합니다.")
+        return body
+
+    def _get(self, build):
+        """GET 응답 - data_version으로 만든 ETag가 If-None-Match와 같으면 본문 없이 304
+
+        build(version)은 응답 객체를 만드는 함수입니다.
+        """
+        # 버전을 먼저 읽어야 그 사이에 쓰기가 있어도 ETag가 본문보다 새것이 되지 않음
+        version = self.archive.data_version()
+        etag = None
+        if version is not None:
+            digest = hashlib.blake2b(f"{version!r} {self.path} {self.headers.get('Authorization')}".encode('utf-8'),
+                                     digest_size=12).hexdigest()
+            etag = f'"{_BOOT_ID}-{digest}"'
+            if _etag_matches(self.headers.get('If-None-Match'), etag):
+                self._send(HTTPStatus.NOT_MODIFIED, None, {'ETag': etag})
+                return
+        body = codec.encode(build(version), 'compact')
+        if etag is None:
+            etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+            if _etag_matches(self.headers.get('If-None-Match'), etag):
+                self._send(HTTPStatus.NOT_MODIFIED, None, {'ETag': etag})
+                return
+        self._send(HTTPStatus.OK, body, {'ETag': etag, 'Cache-Control': 'no-cache'})
+
+    def _send(self, status, payload, headers=None):
+        body = b'' if payload is None else payload if isinstance(payload, bytes) else codec.encode(payload, 'compact')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.close_connection or self.server.has_waiting():
+            self.send_header('Connection', 'close')
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def _param(query, name):
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _int_param(query, name, default, low, high):
+    value = _param(query, name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or not low <= number <= high:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name}는 {low}~{high} 사이의 정수여야 합니다.")
+    return number
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    # 약한 비교 (W/ 접두사는 무시)
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+# ==================== 서버 ====================
+
+class ApiServer(HTTPServer):
+    """정해진 개수의 작업 스레드로 연결을 처리하는 HTTP 서버
+
+    ThreadingHTTPServer는 연결마다 스레드를 새로 만들지만, 여기서는 ThreadPoolExecutor에
+    연결을 넘기므로 동시에 처리하는 요청 수(= 저장소에 걸리는 부하)가 workers로 제한되고
+    나머지 연결은 큐에서 기다립니다.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, archive, workers=DEFAULT_WORKERS, verbose=False):
+        super().__init__(address, ApiHandler)
+        self.archive = archive
+        self.workers = workers
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='opus-api')
+        self._waiting = 0           # 받았지만 아직 작업 스레드를 못 잡은 연결 수
+        self._waiting_lock = threading.Lock()
+
+        self._filter_cache = {}     # (data_version, 필터) -> 필터 결과 (넣은 순서 = 오래된 순서)
+        self._filter_lock = threading.Lock()
+
+    def has_waiting(self):
+        return self._waiting > 0
+
+    def filtered_performances(self, version, filters):
+        """공개 연주 내역 중 filters에 맞는 것 - data_version이 같은 동안 결과를 재사용"""
+        if version is None:
+            return self.archive.filter_performances(self.archive.get_public_performances(), filters)
+        key = (version, tuple(sorted(filters.items())))
+        with self._filter_lock:
+            records = self._filter_cache.get(key)
+        if records is None:
+            records = self.archive.filter_performances(self.archive.get_public_performances(), filters)
+            with self._filter_lock:
+                # 버전이 바뀌었으면 이전 결과는 버리고, 넘치면 가장 오래된 것부터
+                self._filter_cache = {k: v for k, v in self._filter_cache.items() if k[0] == version}
+                while len(self._filter_cache) >= FILTER_CACHE_SIZE:
+                    del self._filter_cache[next(iter(self._filter_cache))]
+                self._filter_cache[key] = records
+        return records
+
+    def process_request(self, request, client_address):
+        with self._waiting_lock:
+            self._waiting += 1
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        with self._waiting_lock:
+            self._waiting -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def create_server(archive, host='127.0.0.1', port=DEFAULT_PORT, workers=DEFAULT_WORKERS, verbose=False):
+    """서버 생성 (port=0이면 빈 포트 - server.server_address로 확인)"""
+    return ApiServer((host, port), archive, workers, verbose)
+
+
+_background_lock = threading.Lock()
+_background = {}
+
+
+def start_background(archive, host='127.0.0.1', port=DEFAULT_PORT, workers=DEFAULT_WORKERS):
+    """이 프로세스에서 서버를 데몬 스레드로 띄움 (같은 주소로 다시 부르면 이미 띄운 서버)
+
+    Streamlit 앱처럼 스크립트가 계속 다시 실행되는 곳에서 부르는 용도입니다.
+    """
+    with _background_lock:
+        server = _background.get((host, port))
+        if server is None:
+            server = _background[(host, port)] = create_server(archive, host, port, workers)
+            threading.Thread(target=server.serve_forever, name='opus-api', daemon=True).start()
+        return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="공개 아카이브 읽기와 좋아요/댓글 쓰기용 로컬 JSON API 서버")
+    parser.add_argument('--data-dir', default='data', help="데이터 디렉터리 (기본값: data)")
+    parser.add_argument('--backend', help="저장소 백엔드 (기본값: OPUS_STORAGE_BACKEND 또는 json)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="요청을 처리할 작업 스레드 수")
+    parser.add_argument('--verbose', action='store_true', help="요청 로그 출력")
+    args = parser.parse_args(argv)
+
+    if not Path(args.data_dir).is_dir():
+        parser.error(f"데이터 디렉터리가 없습니다: {args.data_dir}")
+    server = create_server(get_archive(args.data_dir, args.backend), args.host, args.port, args.workers, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"http://{host}:{port}/api/performances (작업 스레드 {args.workers}개)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+저장소 백엔드 선택
+
+OPUS_STORAGE_BACKEND 환경 변수로 고릅니다 (기본값 json).
+- json    : DATA_DIR의 JSON 파일
+- jsonlog : JSON 파일 + 좋아요/댓글은 추가 전용 로그 (eventlog 참고)
+- sqlite  : OPUS_SQLITE_PATH (기본값 DATA_DIR/archive.db)
+
+JSON 데이터를 SQLite로 옮기려면: python -m opus_archive.migrate --data-dir data
+json/jsonlog의 연주 내역을 사용자별 샤드로 나누려면: python -m opus_archive.reshard --data-dir data
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from .base import StorageBackend
+from .json_backend import JsonBackend
+from .jsonlog_backend import JsonLogBackend
+from .sqlite_backend import SqliteBackend
+
+BACKEND_ENV = "OPUS_STORAGE_BACKEND"
+SQLITE_PATH_ENV = "OPUS_SQLITE_PATH"
+
+_lock = threading.Lock()
+_backends = {}
+
+
+def default_sqlite_path(data_dir):
+    """SQLite 데이터베이스 경로"""
+    return Path(os.environ.get(SQLITE_PATH_ENV) or Path(data_dir) / "archive.db")
+
+
+def create_backend(data_dir, kind=None):
+    """백엔드 인스턴스 생성 (캐시하지 않음)"""
+    kind = (kind or os.environ.get(BACKEND_ENV) or 'json').lower()
+    data_dir = Path(data_dir)
+    if kind == 'json':
+        return JsonBackend(data_dir)
+    if kind == 'jsonlog':
+        return JsonLogBackend(data_dir)
+    if kind == 'sqlite':
+        return SqliteBackend(default_sqlite_path(data_dir))
+    raise ValueError(f"알 수 없는 저장소 백엔드: {kind} (json, jsonlog, sqlite)")
+
+
+def get_backend(data_dir, kind=None):
+    """프로세스 공용 백엔드 (같은 설정이면 같은 인스턴스)"""
+    kind = (kind or os.environ.get(BACKEND_ENV) or 'json').lower()
+    key = (kind, os.path.abspath(data_dir))
+    with _lock:
+        if key not in _backends:
+            backend = create_backend(data_dir, kind)
+            # 개수 필드가 없는 이전 데이터는 처음 한 번 채움
+            backend.ensure_counts()
+            _backends[key] = backend
+        return _backends[key]
+
+
+__all__ = ['StorageBackend', 'JsonBackend', 'JsonLogBackend', 'SqliteBackend', 'create_backend', 'get_backend', 'default_sqlite_path']
@@ -0,0 +1,189 @@
+"""
+저장소 백엔드 인터페이스
+
+데이터 함수(service.Archive)는 레코드(dict)를 만들고 메시지를 정하는 일만 하고,
+실제 저장/조회는 이 인터페이스를 구현한 백엔드에 맡깁니다.
+반환되는 레코드는 캐시와 공유될 수 있으므로 읽기 전용으로 다룹니다.
+
+연주 내역 레코드에는 like_count/comment_count가 같이 저장되어 있어서 (좋아요/댓글
+쓰기 때 함께 갱신) 목록과 정렬은 좋아요/댓글 저장소를 보지 않고 개수를 쓸 수 있습니다.
+"""
+
+
+class StorageBackend:
+    """저장소 백엔드 기본 클래스"""
+
+    name = 'base'
+
+    # ---------- 사용자 ----------
+
+    def get_user(self, username):
+        """사용자 레코드 조회 (없으면 None)"""
+        raise NotImplementedError
+
+    def email_exists(self, email):
+        """이메일 사용 여부"""
+        raise NotImplementedError
+
+    def add_user(self, username, record):
+        """사용자 추가 (이미 있으면 False)"""
+        raise NotImplementedError
+
+    # ---------- 연주 내역 ----------
+
+    def add_performance(self, record):
+        """연주 내역 추가 (record['id']가 키)"""
+        self.add_performances([record])
+
+    def add_performances(self, records):
+        """연주 내역 여러 건을 한 번의 쓰기로 추가 (가져오기 배치용)"""
+        raise NotImplementedError
+
+    def get_performance(self, perf_id):
+        """연주 내역 한 건 조회 (없으면 None)"""
+        raise NotImplementedError
+
+    def update_performance(self, perf_id, fields):
+        """연주 내역 필드 갱신 (없으면 False)"""
+        raise NotImplementedError
+
+    def update_performances(self, updates):
+        """여러 연주 내역 필드를 한 번에 갱신 ({공연 ID: 필드}) -> 갱신한 개수 (없는 ID는 건너뜀)"""
+        return sum(1 for perf_id, fields in updates.items() if self.update_performance(perf_id, fields))
+
+    def delete_performance(self, perf_id):
+        """연주 내역 삭제 - 댓글/좋아요까지 함께 삭제 (없으면 False)"""
+        return self.delete_performances([perf_id]) == 1
+
+    def delete_performances(self, perf_ids):
+        """여러 연주 내역을 한 번에 삭제 (댓글/좋아요 포함) -> 삭제한 개수
+
+        각 저장소를 한 번씩만 쓰고, 댓글/좋아요는 공연별 역색인으로 해당 항목만 찾습니다.
+        """
+        raise NotImplementedError
+
+    def get_user_performances(self, user_id):
+        """사용자의 연주 내역 ((date, id) 역순)"""
+        raise NotImplementedError
+
+    def get_public_performances(self):
+        """공개 연주 내역 ((date, id) 역순)"""
+        raise NotImplementedError
+
+    def get_user_performances_page(self, user_id, limit, cursor=None):
+        """사용자의 연주 내역 한 페이지 -> (목록, 다음 커서)
+
+        정렬은 (date, id) 역순이고, cursor는 이전 페이지가 돌려준 (date, id)입니다.
+        다음 페이지가 없으면 다음 커서는 None입니다.
+        """
+        raise NotImplementedError
+
+    def get_public_performances_page(self, limit, cursor=None):
+        """공개 연주 내역 한 페이지 -> (목록, 다음 커서)"""
+        raise NotImplementedError
+
+    def count_user_performances(self, user_id):
+        """사용자의 연주 내역 수"""
+        raise NotImplementedError
+
+    def count_public_performances(self):
+        """공개 연주 내역 수"""
+        raise NotImplementedError
+
+    def search_performances(self, query, field_queries=None, user_id=None, date_from=None, date_to=None):
+        """검색 색인으로 찾기 - 관련도 순
+
+        query는 모든 필드에서, field_queries({필드: 검색어})는 해당 필드에서만 찾습니다.
+        user_id가 있으면 그 사용자의 연주 내역에서, 없으면 공개 연주 내역에서 찾고,
+        date_from/date_to(ISO 날짜 문자열, 양 끝 포함)로 기간을 제한합니다.
+        검색어가 하나도 없으면 기간 안의 전체를 (date, id) 역순으로 돌려줍니다.
+        """
+        raise NotImplementedError
+
+    def iter_performances(self):
+        """전체 연주 내역 순회"""
+        raise NotImplementedError
+
+    # ---------- 댓글 ----------
+
+    def add_comment(self, record):
+        """댓글 추가 (record['id']가 키)"""
+        raise NotImplementedError
+
+    def delete_comment(self, comment_id):
+        """댓글 삭제 (없으면 False)"""
+        raise NotImplementedError
+
+    def get_comments_grouped(self, perf_ids):
+        """{perf_id: [댓글, ...]} - 작성 시간순"""
+        raise NotImplementedError
+
+    # ---------- 좋아요 ----------
+
+    def toggle_like(self, performance_id, user_id, created_at):
+        """좋아요 토글 (좋아요 상태가 되면 True)"""
+        raise NotImplementedError
+
+    def get_like_counts(self, perf_ids):
+        """{perf_id: 좋아요 개수}"""
+        raise NotImplementedError
+
+    def get_liked_set(self, user_id, perf_ids):
+        """perf_ids 중 user_id가 좋아요한 공연 ID 집합"""
+        raise NotImplementedError
+
+    # ---------- 좋아요/댓글 수 ----------
+
+    def recount(self):
+        """연주 내역의 like_count/comment_count를 좋아요/댓글에서 다시 계산 -> 고친 레코드 수"""
+        raise NotImplementedError
+
+    def ensure_counts(self):
+        """개수 필드가 없는 연주 내역이 있으면 recount (이전 데이터 업그레이드용)"""
+        raise NotImplementedError
+
+    def iter_engagements(self, since=None):
+        """좋아요/댓글 순회 -> ('like'|'comment', 공연 ID, created_at) - 급상승 순위(ranking)를 만들 때
+
+        since(ISO 시각 문자열)를 주면 그 이후 것만 (created_at이 없는 것은 제외)
+        """
+        raise NotImplementedError
+
+    # ---------- 통계 ----------
+
+    def get_performance_stats(self, user_id=None):
+        """연주 통계 (stats.PerformanceColumns.summarize 참고) - user_id가 없으면 공개 연주 내역 전체
+
+        통계용 열 데이터(stats.PerformanceColumns)를 백엔드가 들고 있다가 바뀐 레코드만
+        갱신하므로 호출할 때마다 전체를 훑지 않습니다.
+        """
+        raise NotImplementedError
+
+    # ---------- 변경 감지 ----------
+
+    def data_version(self):
+        """연주 내역/댓글/좋아요가 바뀌면 달라지는 값 (같은 프로세스 안에서만 비교, None이면 모름)
+
+        HTTP API가 ETag를 만들 때 씁니다. 값이 같으면 내용도 같다고 볼 수 있어야 하고,
+        내용이 같은데 값이 바뀌는 것은 괜찮습니다 (클라이언트가 한 번 더 받을 뿐).
+        """
+        return None
+
+    # ---------- 카테고리 ----------
+
+    def load_categories(self):
+        """카테고리 dict (저장된 적이 없으면 None)"""
+        raise NotImplementedError
+
+    def save_categories(self, categories):
+        """카테고리 전체 저장"""
+        raise NotImplementedError
+
+    def update_categories(self, mutate):
+        """카테고리 읽고-고쳐-쓰기를 한 번에 -> mutate의 반환값
+
+        mutate(categories)는 최신 카테고리(저장된 적이 없으면 기본값)의 사본을 받아 제자리에서
+        고칩니다. 그사이 다른 세션/프로세스의 카테고리 쓰기가 끼어들지 않으므로 동시에
+        추가해도 서로의 값을 지우지 않습니다. 바뀐 것이 없으면 저장하지 않습니다.
+        """
+        raise NotImplementedError
@@ -0,0 +1,376 @@
+"""
+JSON 파일 백엔드 (기본값) - DATA_DIR의 *.json 파일 5개를 사용
+
+연주 내역은 performances.json 한 파일이거나 사용자별 샤드 파일입니다
+(performance_layout 참고 - 레이아웃은 시작할 때 데이터 디렉터리를 보고 정함).
+모든 쓰기는 store.update_json을 거치므로 여러 세션/프로세스가 동시에 수정해도
+서로의 변경을 덮어쓰지 않고, 동시에 들어온 수정은 한 번의 저장으로 묶입니다.
+다른 프로세스가 쓴 파일은 데이터 디렉터리의 변경 로그(changefeed)로 알게 됩니다.
+"""
+
+import bisect
+import threading
+
+from .. import search
+from ..records import DEFAULT_CATEGORIES, Comment, Like
+from ..store import (data_version, derived, iter_json_items, load_json, register_records, save_json,
+                     update_json, watch)
+from .base import StorageBackend
+from .performance_layout import open_layout
+
+
+def _group_comments(comments):
+    """댓글을 공연별로 묶기 (한 번 순회, 작성 시간순)"""
+    grouped = {}
+    for comment in comments.values():
+        grouped.setdefault(comment['performance_id'], []).append(comment)
+    for perf_comments in grouped.values():
+        perf_comments.sort(key=lambda x: x['created_at'])
+    return grouped
+
+
+def _group_likes(likes):
+    """좋아요를 공연별 사용자 집합으로 묶기 (한 번 순회)"""
+    grouped = {}
+    for like in likes.values():
+        grouped.setdefault(like['performance_id'], set()).add(like['user_id'])
+    return grouped
+
+
+def _keys_by_performance(records):
+    """역색인 {공연 ID: [키, ...]} - 댓글/좋아요 삭제 시 전체를 훑지 않기 위함"""
+    index = {}
+    for key, value in records.items():
+        index.setdefault(value['performance_id'], []).append(key)
+    return index
+
+
+def _count_by_performance(file_path):
+    """likes.json/comments.json을 스트리밍으로 한 번 읽어 공연별 개수 세기"""
+    counts = {}
+    if file_path.exists():
+        for _, value in iter_json_items(file_path):
+            perf_id = value['performance_id']
+            counts[perf_id] = counts.get(perf_id, 0) + 1
+    return counts
+
+
+def _date_range(keys, date_from, date_to):
+    """(date, id) 오름차순 keys에서 기간에 해당하는 구간 [lo, hi) - ISO 날짜는 문자열 순서가 곧 날짜 순서"""
+    lo = 0 if date_from is None else bisect.bisect_left(keys, (date_from,))
+    hi = len(keys) if date_to is None else bisect.bisect_left(keys, (date_to + '\0',))
+    return lo, max(lo, hi)
+
+
+def _page(keys, lookup, limit, cursor):
+    """오름차순 keys에서 cursor보다 작은 것 중 마지막 limit개를 역순으로"""
+    end = len(keys) if cursor is None else bisect.bisect_left(keys, tuple(cursor))
+    start = max(0, end - limit)
+    items = _resolve(lookup, reversed(keys[start:end]))
+    return items, (keys[start] if start > 0 else None)
+
+
+def _resolve(lookup, keys):
+    """정렬 키 -> 레코드 (샤드 레이아웃에서 쓰기 도중이라 아직 없는 레코드는 건너뜀)"""
+    items = []
+    for _, perf_id in keys:
+        record = lookup(perf_id)
+        if record is not None:
+            items.append(record)
+    return items
+
+
+class JsonBackend(StorageBackend):
+    """JSON 파일 백엔드
+
+    좋아요/댓글 저장과 연주 내역의 like_count/comment_count 갱신은 서로 다른 파일이라
+    그 사이에 프로세스가 멈추면 개수가 어긋날 수 있습니다. 이때는 다른 프로세스가 쓰지
+    않는 동안 recount 도구(python -m opus_archive.recount)로 맞춥니다 - 쓰기와 동시에
+    다시 세면 읽은 뒤 들어온 증감을 덮어쓰므로 시작할 때 자동으로 하지 않습니다.
+    """
+
+    name = 'json'
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        # 같은 데이터 디렉터리를 쓰는 다른 프로세스와 쓰기 알림을 주고받음 (changefeed)
+        watch(data_dir)
+        self.users_file = data_dir / "users.json"
+        self.performances = open_layout(data_dir)
+        self.comments_file = data_dir / "comments.json"
+        self.likes_file = data_dir / "likes.json"
+        self.categories_file = data_dir / "categories.json"
+        register_records(self.comments_file, Comment.of)
+        register_records(self.likes_file, Like.of)
+        self._search_index = search.SearchIndex()
+        self._search_lock = threading.Lock()
+        self._stats_columns = None       # 처음 통계를 볼 때 만듦 (stats/NumPy 임포트도 그때)
+        self._stats_lock = threading.Lock()
+
+    # ---------- 사용자 ----------
+
+    def get_user(self, username):
+        return load_json(self.users_file).get(username)
+
+    def email_exists(self, email):
+        return any(user['email'] == email for user in load_json(self.users_file).values())
+
+    def add_user(self, username, record):
+        def mutate(users):
+            if username in users:
+                return False
+            users[username] = record
+            return True
+        return update_json(self.users_file, mutate)
+
+    # ---------- 연주 내역 ----------
+
+    def add_performances(self, records):
+        self.performances.add(records)
+        self._sync_indexes()
+
+    def get_performance(self, perf_id):
+        perf = self.performances.get(perf_id)
+        return self._with_counts([perf])[0] if perf is not None else None
+
+    def update_performance(self, perf_id, fields):
+        updated = self.performances.update(perf_id, fields)
+        if updated:
+            self._sync_indexes()
+        return updated
+
+    def update_performances(self, updates):
+        updated = self.performances.update_many(updates)
+        if updated:
+            self._sync_indexes()
+        return updated
+
+    def _remove_performance_records(self, perf_ids):
+        """연주 내역 레코드만 삭제 -> 실제로 삭제한 ID 목록"""
+        removed = self.performances.remove(perf_ids)
+        if removed:
+            self._sync_indexes()
+        return removed
+
+    def _remove_children(self, file_path, perf_ids):
+        """역색인으로 해당 공연의 항목만 찾아 삭제 (없으면 파일을 쓰지 않음)"""
+        def mutate(records):
+            # 잠금 안에서 보는 캐시 버전이 records와 같으므로 역색인도 그대로 맞음
+            index = derived(file_path, 'keys_by_performance', _keys_by_performance)
+            for perf_id in perf_ids:
+                for key in index.get(perf_id, ()):
+                    if key in records:
+                        del records[key]
+        update_json(file_path, mutate)
+
+    def delete_performances(self, perf_ids):
+        removed = self._remove_performance_records(list(dict.fromkeys(perf_ids)))
+        if removed:
+            # 댓글과 좋아요도 함께 삭제
+            self._remove_children(self.comments_file, removed)
+            self._remove_children(self.likes_file, removed)
+        return len(removed)
+
+    def _adjust_count(self, perf_id, field, delta):
+        """연주 내역 레코드의 like_count/comment_count 증감 (공연이 없으면 무시)"""
+        self.performances.adjust_count(perf_id, field, delta)
+
+    def _store_counts(self, like_counts, comment_counts):
+        """공연별 개수를 레코드에 반영 (값이 다른 것만 교체) -> 고친 레코드 수"""
+        return self.performances.store_counts(like_counts, comment_counts)
+
+    def recount(self):
+        return self._store_counts(_count_by_performance(self.likes_file),
+                                  _count_by_performance(self.comments_file))
+
+    def iter_engagements(self, since=None):
+        for kind, file_path in (('like', self.likes_file), ('comment', self.comments_file)):
+            for record in load_json(file_path).values():
+                created_at = record['created_at']
+                if created_at and (since is None or created_at >= since):
+                    yield kind, record['performance_id'], created_at
+
+    def ensure_counts(self):
+        performances = self.performances.load_all()
+        if any('like_count' not in p or 'comment_count' not in p for p in performances.values()):
+            return self.recount()
+        return 0
+
+    def get_user_performances(self, user_id):
+        keys, lookup = self.performances.ordered(user_id)
+        return self._with_counts(_resolve(lookup, reversed(keys)))
+
+    def get_public_performances(self):
+        keys, lookup = self.performances.ordered()
+        return self._with_counts(_resolve(lookup, reversed(keys)))
+
+    def get_user_performances_page(self, user_id, limit, cursor=None):
+        items, next_cursor = _page(*self.performances.ordered(user_id), limit, cursor)
+        return self._with_counts(items), next_cursor
+
+    def get_public_performances_page(self, limit, cursor=None):
+        items, next_cursor = _page(*self.performances.ordered(), limit, cursor)
+        return self._with_counts(items), next_cursor
+
+    def count_user_performances(self, user_id):
+        return len(self.performances.ordered(user_id)[0])
+
+    def count_public_performances(self):
+        return len(self.performances.ordered()[0])
+
+    def _sync_indexes(self):
+        """연주 내역을 쓴 뒤 이미 만든 검색 색인/통계 열 데이터를 바뀐 레코드만큼 갱신"""
+        self._sync_search_index(build=False)
+        self._sync_stats_columns(build=False)
+
+    def _sync_search_index(self, build=True):
+        """검색 색인을 현재 파일 버전에 맞춤 (바뀐 레코드만 다시 색인)
+
+        처음 만드는 것은 첫 검색 때 (build=False인 쓰기 경로에서는 이미 만든 색인만 갱신).
+        """
+        with self._search_lock:
+            if not build and self._search_index.version is None:
+                return self._search_index
+            # 버전을 먼저 읽어야 그 사이에 쓰기가 있어도 다음 번에 다시 맞춤
+            version = self.performances.version()
+            if self._search_index.version != version:
+                self._search_index.sync(self.performances.load_all())
+                self._search_index.version = version
+            return self._search_index
+
+    def search_performances(self, query, field_queries=None, user_id=None, date_from=None, date_to=None):
+        terms, field_terms = search.parse_query(query, field_queries)
+        keys, lookup = self.performances.ordered(user_id)
+        lo, hi = _date_range(keys, date_from, date_to)
+        if not terms and not field_terms:
+            # 기간만 있는 조회는 정렬 인덱스 구간을 그대로 반환
+            return self._with_counts(_resolve(lookup, reversed(keys[lo:hi])))
+
+        match = search.compile_query(terms, field_terms, date_from, date_to)
+        index = self._sync_search_index()
+        with self._search_lock:
+            # 기간 구간과 posting 중 더 좁은 쪽에서 후보를 만들고 나머지 조건은 match로 확인
+            if hi - lo <= index.estimate(terms, field_terms):
+                items = []
+                for _, perf_id in keys[lo:hi]:
+                    record = lookup(perf_id)
+                    if record is None:
+                        continue
+                    doc = index.docs.get(perf_id)
+                    texts = doc[1] if doc is not None and doc[0] is record else search.normalized_texts(record)
+                    items.append((record, texts))
+            else:
+                items = [index.docs[perf_id] for perf_id in index.candidates(terms, field_terms)]
+                if user_id:
+                    items = [doc for doc in items if doc[0]['user_id'] == user_id]
+                else:
+                    items = [doc for doc in items if doc[0]['is_public']]
+        return self._with_counts(search.rank(items, match))
+
+    def iter_performances(self):
+        return iter(self._with_counts(list(self.performances.load_all().values())))
+
+    def _with_counts(self, records):
+        """반환 직전 훅 - JSON 백엔드는 레코드에 저장된 개수를 그대로 사용"""
+        return records
+
+    # ---------- 통계 ----------
+
+    def _sync_stats_columns(self, build=True):
+        """통계 열 데이터를 현재 파일 버전에 맞춤 (_sync_search_index와 같은 방식)"""
+        with self._stats_lock:
+            if self._stats_columns is None:
+                if not build:
+                    return None
+                from .. import stats      # NumPy를 통계를 처음 볼 때 로드
+                self._stats_columns = stats.PerformanceColumns()
+            version = self.performances.version()
+            if self._stats_columns.version != version:
+                self._stats_columns.sync_records(self.performances.load_all())
+                self._stats_columns.version = version
+            return self._stats_columns
+
+    def get_performance_stats(self, user_id=None):
+        columns = self._sync_stats_columns()
+        with self._stats_lock:
+            return columns.summarize(columns.select(user_id=user_id, public_only=user_id is None))
+
+    # ---------- 댓글 ----------
+
+    def add_comment(self, record):
+        def mutate(comments):
+            is_new = record['id'] not in comments
+            comments[record['id']] = record
+            return is_new
+        if update_json(self.comments_file, mutate):
+            self._adjust_count(record['performance_id'], 'comment_count', 1)
+
+    def delete_comment(self, comment_id):
+        def mutate(comments):
+            comment = comments.get(comment_id)
+            if comment is None:
+                return None
+            del comments[comment_id]
+            return comment['performance_id']
+        perf_id = update_json(self.comments_file, mutate)
+        if perf_id is None:
+            return False
+        self._adjust_count(perf_id, 'comment_count', -1)
+        return True
+
+    def get_comments_grouped(self, perf_ids):
+        grouped = derived(self.comments_file, 'by_performance', _group_comments)
+        return {perf_id: grouped.get(perf_id, []) for perf_id in perf_ids}
+
+    # ---------- 좋아요 ----------
+
+    def toggle_like(self, performance_id, user_id, created_at):
+        like_key = f"{performance_id}_{user_id}"
+
+        def mutate(likes):
+            if like_key in likes:
+                del likes[like_key]
+                return False
+            likes[like_key] = {
+                'performance_id': performance_id,
+                'user_id': user_id,
+                'created_at': created_at
+            }
+            return True
+        liked = update_json(self.likes_file, mutate)
+        self._adjust_count(performance_id, 'like_count', 1 if liked else -1)
+        return liked
+
+    def get_like_counts(self, perf_ids):
+        grouped = derived(self.likes_file, 'by_performance', _group_likes)
+        return {perf_id: len(grouped.get(perf_id, ())) for perf_id in perf_ids}
+
+    def get_liked_set(self, user_id, perf_ids):
+        grouped = derived(self.likes_file, 'by_performance', _group_likes)
+        return {perf_id for perf_id in perf_ids if user_id in grouped.get(perf_id, ())}
+
+    # ---------- 변경 감지 ----------
+
+    def data_version(self):
+        return (self.performances.version(), data_version(self.comments_file), data_version(self.likes_file))
+
+    # ---------- 카테고리 ----------
+
+    def load_categories(self):
+        if not self.categories_file.exists():
+            return None
+        return load_json(self.categories_file)
+
+    def save_categories(self, categories):
+        save_json(self.categories_file, categories)
+
+    def update_categories(self, mutate):
+        def apply(data):
+            # 캐시의 목록은 다른 읽기와 공유하므로 사본을 고치고 바뀐 키만 바꿔 끼움
+            categories = {key: list(values) for key, values in (data or DEFAULT_CATEGORIES).items()}
+            result = mutate(categories)
+            for key, values in categories.items():
+                if data.get(key) != values:
+                    data[key] = values
+            return result
+        return update_json(self.categories_file, apply)
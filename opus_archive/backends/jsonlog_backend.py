@@ -0,0 +1,129 @@
+"""
+JSON + 이벤트 로그 백엔드
+
+사용자/연주 내역/카테고리는 JSON 백엔드와 같고, 쓰기가 가장 잦은 좋아요와
+댓글만 추가 전용 로그(eventlog)에 기록합니다. 스냅샷 파일은 JSON 백엔드와
+같은 likes.json/comments.json이라 언제든 json 백엔드로 되돌릴 수 있습니다.
+
+좋아요 한 번마다 performances.json을 다시 쓰지 않도록 like_count/comment_count는
+로그의 메모리 상태(공연별 집합/목록)에서 바로 읽어 반환하는 레코드에 붙입니다.
+performances.json의 개수는 recount 때 맞춰집니다.
+"""
+
+from ..eventlog import COMPACT_INTERVAL, COMPACT_MIN_BYTES, CommentLog, Compactor, LikeLog
+from .json_backend import JsonBackend
+
+
+class JsonLogBackend(JsonBackend):
+    """좋아요/댓글을 이벤트 로그로 저장하는 JSON 백엔드"""
+
+    name = 'jsonlog'
+
+    def __init__(self, data_dir, compact_interval=COMPACT_INTERVAL, compact_min_bytes=COMPACT_MIN_BYTES):
+        super().__init__(data_dir)
+        self.likes_log = LikeLog(self.likes_file)
+        self.comments_log = CommentLog(self.comments_file)
+        self.compactor = Compactor([self.likes_log, self.comments_log], compact_interval, compact_min_bytes)
+        self.compactor.start()
+
+    def delete_performances(self, perf_ids):
+        removed = self._remove_performance_records(list(dict.fromkeys(perf_ids)))
+        if not removed:
+            return 0
+
+        # 댓글과 좋아요는 해당 공연 것만 삭제 이벤트로 기록 (로그마다 한 번의 추가)
+        with self.comments_log.transaction() as log:
+            events = [{'op': 'delete', 'id': c['id']}
+                      for perf_id in removed for c in log.by_performance.get(perf_id, [])]
+            if events:
+                log.append(events)
+        with self.likes_log.transaction() as log:
+            events = [{'op': 'unlike', 'performance_id': perf_id, 'user_id': user_id}
+                      for perf_id in removed for user_id in log.by_performance.get(perf_id, ())]
+            if events:
+                log.append(events)
+        return len(removed)
+
+    def _with_counts(self, records):
+        likes, comments = self.likes_log, self.comments_log
+        likes.catch_up()
+        comments.catch_up()
+        with likes._lock, comments._lock:
+            return [{**perf,
+                     'like_count': len(likes.by_performance.get(perf['id'], ())),
+                     'comment_count': len(comments.by_performance.get(perf['id'], ()))}
+                    for perf in records]
+
+    def recount(self):
+        # 로그를 재생한 메모리 상태가 곧 좋아요/댓글 전체
+        likes, comments = self.likes_log, self.comments_log
+        likes.catch_up()
+        comments.catch_up()
+        with likes._lock, comments._lock:
+            like_counts = {perf_id: len(users) for perf_id, users in likes.by_performance.items()}
+            comment_counts = {perf_id: len(items) for perf_id, items in comments.by_performance.items()}
+        return self._store_counts(like_counts, comment_counts)
+
+    def ensure_counts(self):
+        # 개수는 항상 로그에서 계산하므로 미리 채울 필요 없음
+        return 0
+
+    def iter_engagements(self, since=None):
+        # 로그 상태의 사본으로 - 순회하는 동안 다른 스레드가 로그를 적용해도 안전
+        for kind, log in (('like', self.likes_log), ('comment', self.comments_log)):
+            log.catch_up()
+            with log._lock:
+                items = [(record['performance_id'], record['created_at']) for record in log.records.values()]
+            for perf_id, created_at in items:
+                if created_at and (since is None or created_at >= since):
+                    yield kind, perf_id, created_at
+
+    # ---------- 변경 감지 ----------
+
+    def data_version(self):
+        # 좋아요/댓글은 스냅샷 파일이 아니라 로그 상태가 기준
+        return (self.performances.version(), self.comments_log.version(), self.likes_log.version())
+
+    # ---------- 댓글 ----------
+
+    def add_comment(self, record):
+        with self.comments_log.transaction() as log:
+            log.append([{'op': 'comment', 'record': record}])
+
+    def delete_comment(self, comment_id):
+        with self.comments_log.transaction() as log:
+            if comment_id not in log.records:
+                return False
+            log.append([{'op': 'delete', 'id': comment_id}])
+        return True
+
+    def get_comments_grouped(self, perf_ids):
+        log = self.comments_log
+        log.catch_up()
+        with log._lock:
+            return {perf_id: list(log.by_performance.get(perf_id, ())) for perf_id in perf_ids}
+
+    # ---------- 좋아요 ----------
+
+    def toggle_like(self, performance_id, user_id, created_at):
+        with self.likes_log.transaction() as log:
+            liked = user_id in log.by_performance.get(performance_id, ())
+            log.append([{
+                'op': 'unlike' if liked else 'like',
+                'performance_id': performance_id,
+                'user_id': user_id,
+                'created_at': created_at
+            }])
+        return not liked
+
+    def get_like_counts(self, perf_ids):
+        log = self.likes_log
+        log.catch_up()
+        with log._lock:
+            return {perf_id: len(log.by_performance.get(perf_id, ())) for perf_id in perf_ids}
+
+    def get_liked_set(self, user_id, perf_ids):
+        log = self.likes_log
+        log.catch_up()
+        with log._lock:
+            return {perf_id for perf_id in perf_ids if user_id in log.by_performance.get(perf_id, ())}
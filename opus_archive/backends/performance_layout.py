@@ -0,0 +1,402 @@
+"""
+JSON 백엔드의 연주 내역 저장 방식 (레이아웃)
+
+- single  : performances.json 한 파일 (기본값)
+- sharded : performances/users/<사용자>.json 사용자별 샤드 + performances/index.json
+
+샤드 레이아웃에서는 '내 연주 내역' 조회/수정과 좋아요/댓글 수 갱신이 그 사용자의
+샤드 파일 하나만 읽고 씁니다. index.json은 {perf_id: [date, user_id, is_public]}만
+담은 작은 색인으로, 공개/사용자별 목록의 정렬/페이지 나누기와 공연 ID로 샤드를 찾는
+데 씁니다. 목록 한 페이지는 색인 + 그 페이지에 나오는 사용자들의 샤드만 읽습니다.
+
+어떤 레코드가 있는지는 색인이 기준입니다. 쓰기 순서는 추가 때 샤드 -> 색인, 삭제 때
+색인 -> 샤드라서 중간에 멈춰도 색인이 없는 레코드를 가리키지 않고, 샤드에만 남은
+레코드는 어느 조회에도 나오지 않습니다 (reshard --repair로 정리).
+레이아웃은 performances/index.json 유무로 판단하고, 바꾸는 것은 reshard 도구로 합니다.
+
+    python -m opus_archive.reshard --data-dir data
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+from ..records import Performance
+from ..store import data_version, data_versions, derived, load_json, register_records, update_json
+
+SHARD_DIR = "performances"
+INDEX_FILE = "index.json"
+USERS_DIR = "users"
+
+_UNSAFE = re.compile(r'[^0-9A-Za-z_-]')
+
+
+def shard_name(user_id):
+    """사용자 ID -> 샤드 파일 이름
+
+    사용자 ID는 아무 문자나 쓸 수 있고 대소문자를 구분하지 않는 파일 시스템도 있어서
+    읽기 쉬운 앞부분에 해시를 붙입니다.
+    """
+    digest = hashlib.sha1(user_id.encode('utf-8')).hexdigest()[:10]
+    return f"{_UNSAFE.sub('_', user_id)[:40]}-{digest}.json"
+
+
+def index_path(data_dir):
+    return Path(data_dir) / SHARD_DIR / INDEX_FILE
+
+
+def is_sharded(data_dir):
+    """샤드 레이아웃 여부 (색인 파일이 있으면 샤드)"""
+    return index_path(data_dir).exists()
+
+
+def open_layout(data_dir):
+    """데이터 디렉터리의 레이아웃 객체"""
+    if is_sharded(data_dir):
+        return ShardedLayout(data_dir)
+    return SingleFileLayout(data_dir)
+
+
+def index_entry(record):
+    return [record['date'], record['user_id'], record['is_public']]
+
+
+def _sorted_keys(performances):
+    """(date, id) 오름차순 정렬 키 - 공개/사용자별"""
+    public = []
+    by_user = {}
+    for key in sorted((p['date'], p['id']) for p in performances.values()):
+        perf = performances[key[1]]
+        if perf['is_public']:
+            public.append(key)
+        by_user.setdefault(perf['user_id'], []).append(key)
+    return public, by_user
+
+
+def _same_order(old, performances):
+    """정렬 인덱스에 쓰이는 필드(date, is_public, user_id)와 ID 목록이 그대로인지
+
+    좋아요/댓글 수만 바뀐 경우 다시 정렬하지 않기 위한 확인 (바뀌지 않은 레코드는
+    같은 객체라 대부분 포인터 비교로 끝남)
+    """
+    if len(old) != len(performances):
+        return False
+    for perf_id, perf in performances.items():
+        prev = old.get(perf_id)
+        if prev is perf:
+            continue
+        if (prev is None or prev['date'] != perf['date'] or prev['is_public'] != perf['is_public']
+                or prev['user_id'] != perf['user_id']):
+            return False
+    return True
+
+
+def _replace(records, perf_id, fields):
+    """캐시된 레코드는 다른 세션과 공유되므로 제자리 수정 대신 새 dict로 교체"""
+    records[perf_id] = {**records[perf_id], **fields}
+
+
+def _counts_mutator(like_counts, comment_counts):
+    """공연별 개수를 레코드에 반영하는 mutate (값이 다른 것만 교체) -> 고친 레코드 수"""
+    def mutate(performances):
+        fixed = 0
+        for perf_id, perf in list(performances.items()):
+            counts = {'like_count': like_counts.get(perf_id, 0),
+                      'comment_count': comment_counts.get(perf_id, 0)}
+            if any(perf.get(field) != value for field, value in counts.items()):
+                performances[perf_id] = {**perf, **counts}
+                fixed += 1
+        return fixed
+    return mutate
+
+
+class SingleFileLayout:
+    """performances.json 한 파일"""
+
+    name = 'single'
+
+    def __init__(self, data_dir):
+        self.performances_file = Path(data_dir) / "performances.json"
+        self._last_order = None
+        register_records(self.performances_file, Performance.of)
+
+    # ---------- 쓰기 ----------
+
+    def add(self, records):
+        def mutate(performances):
+            for record in records:
+                performances[record['id']] = record
+        update_json(self.performances_file, mutate)
+
+    def update(self, perf_id, fields):
+        def mutate(performances):
+            if perf_id not in performances:
+                return False
+            _replace(performances, perf_id, fields)
+            return True
+        return update_json(self.performances_file, mutate)
+
+    def update_many(self, updates):
+        def mutate(performances):
+            updated = 0
+            for perf_id, fields in updates.items():
+                if perf_id in performances:
+                    _replace(performances, perf_id, fields)
+                    updated += 1
+            return updated
+        return update_json(self.performances_file, mutate)
+
+    def remove(self, perf_ids):
+        def mutate(performances):
+            removed = [perf_id for perf_id in perf_ids if perf_id in performances]
+            for perf_id in removed:
+                del performances[perf_id]
+            return removed
+        return update_json(self.performances_file, mutate)
+
+    def adjust_count(self, perf_id, field, delta):
+        def mutate(performances):
+            perf = performances.get(perf_id)
+            if perf is not None:
+                performances[perf_id] = {**perf, field: max(0, perf.get(field, 0) + delta)}
+        update_json(self.performances_file, mutate)
+
+    def store_counts(self, like_counts, comment_counts):
+        return update_json(self.performances_file, _counts_mutator(like_counts, comment_counts))
+
+    # ---------- 읽기 ----------
+
+    def get(self, perf_id):
+        return load_json(self.performances_file).get(perf_id)
+
+    def load_all(self):
+        return load_json(self.performances_file)
+
+    def version(self):
+        return data_version(self.performances_file)
+
+    def _order(self):
+        def build(performances):
+            previous = self._last_order
+            if previous is not None and _same_order(previous['records'], performances):
+                order = {**previous, 'records': performances}
+            else:
+                public, by_user = _sorted_keys(performances)
+                order = {'records': performances, 'public': public, 'by_user': by_user}
+            self._last_order = order
+            return order
+        return derived(self.performances_file, 'order_index', build)
+
+    def ordered(self, user_id=None):
+        """(date, id) 오름차순 키 목록과 ID -> 레코드 조회 함수 (user_id가 없으면 공개 목록)"""
+        order = self._order()
+        keys = order['by_user'].get(user_id, []) if user_id else order['public']
+        return keys, order['records'].get
+
+
+class ShardedLayout:
+    """사용자별 샤드 파일 + 작은 공개/소유자 색인"""
+
+    name = 'sharded'
+
+    def __init__(self, data_dir):
+        self.root = Path(data_dir) / SHARD_DIR
+        self.index_file = self.root / INDEX_FILE
+        self.users_dir = self.root / USERS_DIR
+        self.users_dir.mkdir(parents=True, exist_ok=True)
+        self._shard_files = {}      # 사용자 -> 샤드 경로 (레코드 변환 등록은 처음 쓸 때 한 번)
+
+    def shard_file(self, user_id):
+        path = self._shard_files.get(user_id)
+        if path is None:
+            path = self.users_dir / shard_name(user_id)
+            register_records(path, Performance.of)
+            self._shard_files[user_id] = path
+        return path
+
+    def _owner(self, perf_id):
+        entry = load_json(self.index_file).get(perf_id)
+        return entry[1] if entry is not None else None
+
+    def _owners(self, perf_ids):
+        """{사용자: [공연 ID, ...]} - 색인에 없는 ID는 제외"""
+        index = load_json(self.index_file)
+        grouped = {}
+        for perf_id in perf_ids:
+            entry = index.get(perf_id)
+            if entry is not None:
+                grouped.setdefault(entry[1], []).append(perf_id)
+        return grouped
+
+    def _update_index(self, entries=None, removed=()):
+        def mutate(index):
+            for perf_id in removed:
+                if perf_id in index:
+                    del index[perf_id]
+            for perf_id, entry in (entries or {}).items():
+                if index.get(perf_id) != entry:
+                    index[perf_id] = entry
+        update_json(self.index_file, mutate)
+
+    # ---------- 쓰기 ----------
+
+    def add(self, records):
+        index = load_json(self.index_file)
+        by_user = {}
+        stale = {}
+        for record in records:
+            by_user.setdefault(record['user_id'], []).append(record)
+            entry = index.get(record['id'])
+            if entry is not None and entry[1] != record['user_id']:
+                # 소유자가 바뀐 레코드는 새 샤드에 쓴 뒤 이전 샤드에서 뺌
+                stale.setdefault(entry[1], []).append(record['id'])
+        for user_id, user_records in by_user.items():
+            def mutate(performances, user_records=user_records):
+                for record in user_records:
+                    performances[record['id']] = record
+            update_json(self.shard_file(user_id), mutate)
+        self._update_index(entries={record['id']: index_entry(record) for record in records})
+        for user_id, perf_ids in stale.items():
+            self._remove_from_shard(user_id, perf_ids)
+
+    def update(self, perf_id, fields):
+        user_id = self._owner(perf_id)
+        if user_id is None:
+            return False
+        if fields.get('user_id', user_id) != user_id:
+            # 소유자가 바뀌면 새 샤드로 옮김
+            record = load_json(self.shard_file(user_id)).get(perf_id)
+            if record is None:
+                return False
+            self.add([{**record, **fields}])
+            return True
+
+        def mutate(performances):
+            if perf_id not in performances:
+                return None
+            _replace(performances, perf_id, fields)
+            return performances[perf_id]
+        record = update_json(self.shard_file(user_id), mutate)
+        if record is None:
+            return False
+        # 정렬/공개 여부에 쓰이는 필드가 바뀐 경우에만 색인을 씀
+        if load_json(self.index_file).get(perf_id) != index_entry(record):
+            self._update_index(entries={perf_id: index_entry(record)})
+        return True
+
+    def update_many(self, updates):
+        # 소유자를 바꾸는 수정은 샤드를 옮겨야 하므로 한 건씩
+        updated = sum(1 for perf_id, fields in updates.items() if 'user_id' in fields and self.update(perf_id, fields))
+        grouped = self._owners([perf_id for perf_id, fields in updates.items() if 'user_id' not in fields])
+        entries = {}
+        for user_id, perf_ids in grouped.items():
+            def mutate(performances, perf_ids=perf_ids):
+                records = {}
+                for perf_id in perf_ids:
+                    if perf_id in performances:
+                        _replace(performances, perf_id, updates[perf_id])
+                        records[perf_id] = performances[perf_id]
+                return records
+            records = update_json(self.shard_file(user_id), mutate)
+            entries.update((perf_id, index_entry(record)) for perf_id, record in records.items())
+            updated += len(records)
+        # 정렬/공개 여부에 쓰이는 필드가 바뀐 것만 색인에 씀
+        index = load_json(self.index_file)
+        changed = {perf_id: entry for perf_id, entry in entries.items() if index.get(perf_id) != entry}
+        if changed:
+            self._update_index(entries=changed)
+        return updated
+
+    def _remove_from_shard(self, user_id, perf_ids):
+        def mutate(performances):
+            for perf_id in perf_ids:
+                if perf_id in performances:
+                    del performances[perf_id]
+        update_json(self.shard_file(user_id), mutate)
+
+    def remove(self, perf_ids):
+        grouped = self._owners(perf_ids)
+        removed = [perf_id for ids in grouped.values() for perf_id in ids]
+        if not removed:
+            return []
+        self._update_index(removed=removed)
+        for user_id, ids in grouped.items():
+            self._remove_from_shard(user_id, ids)
+        return removed
+
+    def adjust_count(self, perf_id, field, delta):
+        user_id = self._owner(perf_id)
+        if user_id is None:
+            return
+
+        def mutate(performances):
+            perf = performances.get(perf_id)
+            if perf is not None:
+                performances[perf_id] = {**perf, field: max(0, perf.get(field, 0) + delta)}
+        update_json(self.shard_file(user_id), mutate)
+
+    def store_counts(self, like_counts, comment_counts):
+        mutate = _counts_mutator(like_counts, comment_counts)
+        return sum(update_json(self.shard_file(user_id), mutate) for user_id in self.user_ids())
+
+    # ---------- 읽기 ----------
+
+    def user_ids(self):
+        return sorted({entry[1] for entry in load_json(self.index_file).values()})
+
+    def get(self, perf_id):
+        user_id = self._owner(perf_id)
+        if user_id is None:
+            return None
+        return load_json(self.shard_file(user_id)).get(perf_id)
+
+    def load_all(self):
+        """전체 연주 내역 {perf_id: 레코드} (검색 색인/전체 순회용 - 모든 샤드를 읽음)"""
+        index = load_json(self.index_file)
+        records = {}
+        for user_id in self.user_ids():
+            shard = load_json(self.shard_file(user_id))
+            records.update((perf_id, perf) for perf_id, perf in shard.items() if perf_id in index)
+        return records
+
+    def version(self):
+        # 샤드 경로 목록은 색인이 바뀔 때만 다시 만듦 (평소에는 버전만 읽음)
+        files = derived(self.index_file, 'version_files', lambda index: [self.index_file] + [
+            self.shard_file(user_id) for user_id in sorted({entry[1] for entry in index.values()})])
+        return data_versions(files)
+
+    def _order(self):
+        def build(index):
+            public = []
+            by_user = {}
+            for key in sorted((entry[0], perf_id) for perf_id, entry in index.items()):
+                entry = index[key[1]]
+                if entry[2]:
+                    public.append(key)
+                by_user.setdefault(entry[1], []).append(key)
+            return {'public': public, 'by_user': by_user}
+        return derived(self.index_file, 'order_keys', build)
+
+    def ordered(self, user_id=None):
+        """(date, id) 오름차순 키 목록과 ID -> 레코드 조회 함수 (user_id가 없으면 공개 목록)
+
+        사용자별 목록도 색인에서 만들므로 색인에 없는 샤드 레코드는 나오지 않습니다 (load_all/get과 같음).
+        """
+        order = self._order()
+        if user_id:
+            return order['by_user'].get(user_id, []), load_json(self.shard_file(user_id)).get
+
+        index = load_json(self.index_file)
+        keys = order['public']
+        shards = {}
+
+        def lookup(perf_id):
+            # 호출 하나 안에서는 샤드를 한 번씩만 조회 (페이지에 나온 사용자 것만 읽음)
+            entry = index.get(perf_id)
+            if entry is None:
+                return None
+            user_id = entry[1]
+            if user_id not in shards:
+                shards[user_id] = load_json(self.shard_file(user_id))
+            return shards[user_id].get(perf_id)
+        return keys, lookup
@@ -0,0 +1,546 @@
+"""
+SQLite 백엔드 (표준 라이브러리 sqlite3, WAL 모드)
+
+- 연결은 스레드마다 하나씩 사용합니다 (Streamlit 세션은 각자 스레드에서 실행).
+- WAL 모드라 읽기는 쓰기를 기다리지 않고, 변경은 해당 행만 갱신합니다.
+"""
+
+import json
+import sqlite3
+import threading
+
+from .. import search
+from ..records import DEFAULT_CATEGORIES
+from .base import StorageBackend
+
+PERFORMANCE_COLUMNS = (
+    'id', 'user_id', 'date', 'venue', 'pieces', 'instrument', 'sub_part',
+    'is_guest', 'guest_fee', 'conductor', 'ensemble_name', 'is_public',
+    'youtube_url', 'poster_url', 'created_at', 'updated_at', 'like_count', 'comment_count'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username   TEXT PRIMARY KEY,
+    email      TEXT NOT NULL,
+    password   TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+
+CREATE TABLE IF NOT EXISTS performances (
+    id            TEXT PRIMARY KEY,
+    user_id       TEXT NOT NULL,
+    date          TEXT NOT NULL,
+    venue         TEXT,
+    pieces        TEXT,
+    instrument    TEXT,
+    sub_part      TEXT,
+    is_guest      INTEGER,
+    guest_fee,
+    conductor     TEXT,
+    ensemble_name TEXT,
+    is_public     INTEGER NOT NULL,
+    youtube_url   TEXT,
+    poster_url    TEXT,
+    created_at    TEXT,
+    updated_at    TEXT,
+    like_count    INTEGER NOT NULL DEFAULT 0,
+    comment_count INTEGER NOT NULL DEFAULT 0
+);
+DROP INDEX IF EXISTS idx_performances_user_date;
+DROP INDEX IF EXISTS idx_performances_public_date;
+CREATE INDEX IF NOT EXISTS idx_performances_user_date_id ON performances(user_id, date, id);
+CREATE INDEX IF NOT EXISTS idx_performances_public_date_id ON performances(is_public, date, id);
+
+CREATE TABLE IF NOT EXISTS comments (
+    id             TEXT PRIMARY KEY,
+    performance_id TEXT NOT NULL,
+    user_id        TEXT NOT NULL,
+    content        TEXT,
+    created_at     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_comments_perf_created ON comments(performance_id, created_at);
+
+CREATE TABLE IF NOT EXISTS likes (
+    performance_id TEXT NOT NULL,
+    user_id        TEXT NOT NULL,
+    created_at     TEXT,
+    PRIMARY KEY (performance_id, user_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS categories (
+    category_type TEXT NOT NULL,
+    position      INTEGER NOT NULL,
+    value         TEXT NOT NULL,
+    PRIMARY KEY (category_type, value)
+);
+
+-- 검색 역색인: 바이그램 토큰 -> 공연 ID (mask는 토큰이 나온 필드 비트, search.FIELD_BITS)
+CREATE TABLE IF NOT EXISTS search_terms (
+    token          TEXT NOT NULL,
+    performance_id TEXT NOT NULL,
+    mask           INTEGER NOT NULL,
+    PRIMARY KEY (token, performance_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_search_terms_perf ON search_terms(performance_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# IN (...) 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회
+_IN_CHUNK = 500
+
+# 토큰화 규칙이 바뀌면 올려서 검색 색인을 다시 만들게 함
+SEARCH_INDEX_VERSION = '1'
+
+
+def performance_to_row(record):
+    """연주 내역 dict -> performances 행 튜플"""
+    values = []
+    for col in PERFORMANCE_COLUMNS:
+        value = record.get(col)
+        if col == 'pieces':
+            value = json.dumps(value or [], ensure_ascii=False)
+        elif col in ('is_guest', 'is_public'):
+            value = int(bool(value))
+        elif col == 'guest_fee' and value is None:
+            value = ''
+        elif col in ('like_count', 'comment_count'):
+            value = value or 0
+        values.append(value)
+    return tuple(values)
+
+
+def _row_to_performance(row):
+    """performances 행 -> 연주 내역 dict (JSON 백엔드와 같은 모양)"""
+    record = dict(zip(PERFORMANCE_COLUMNS, row))
+    record['pieces'] = json.loads(record['pieces']) if record['pieces'] else []
+    record['is_guest'] = bool(record['is_guest'])
+    record['is_public'] = bool(record['is_public'])
+    if record['updated_at'] is None:
+        del record['updated_at']
+    return record
+
+
+def _row_to_comment(row):
+    return {
+        'id': row[0],
+        'performance_id': row[1],
+        'user_id': row[2],
+        'content': row[3],
+        'created_at': row[4]
+    }
+
+
+def _index_performance(conn, record):
+    """공연 하나의 검색 토큰 다시 쓰기 (호출한 쪽 트랜잭션 안에서)"""
+    conn.execute("DELETE FROM search_terms WHERE performance_id = ?", (record['id'],))
+    conn.executemany(
+        "INSERT INTO search_terms (token, performance_id, mask) VALUES (?, ?, ?)",
+        [(token, record['id'], mask) for token, mask in search.record_tokens(record).items()]
+    )
+
+
+def _chunks(items, size=_IN_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _read_categories(conn):
+    """카테고리 dict (저장된 적이 없으면 None)"""
+    rows = conn.execute("SELECT category_type, value FROM categories ORDER BY category_type, position").fetchall()
+    if not rows and conn.execute("SELECT 1 FROM meta WHERE key = 'categories_saved'").fetchone() is None:
+        return None
+    categories = {'venues': [], 'instruments': [], 'sub_parts': []}
+    for category_type, value in rows:
+        categories.setdefault(category_type, []).append(value)
+    return categories
+
+
+def _write_categories(conn, categories):
+    """카테고리 전체 다시 쓰기 (호출한 쪽 트랜잭션 안에서)"""
+    conn.execute("DELETE FROM categories")
+    conn.executemany(
+        "INSERT OR IGNORE INTO categories (category_type, position, value) VALUES (?, ?, ?)",
+        [(category_type, i, value)
+         for category_type, values in categories.items()
+         for i, value in enumerate(values)]
+    )
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('categories_saved', '1')")
+
+
+class SqliteBackend(StorageBackend):
+    """SQLite 백엔드"""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._stats_columns = None       # 처음 통계를 볼 때 만듦 (stats/NumPy 임포트도 그때)
+        self._stats_lock = threading.Lock()
+        self._stats_conn = None
+        self._version_conn = None        # data_version 전용 (쓰지 않는 연결이라 모든 커밋이 보임)
+        self._version_lock = threading.Lock()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(performances)")}
+        missing = [col for col in ('like_count', 'comment_count') if col not in columns]
+        if missing:
+            # 개수 컬럼이 생기기 전에 만든 DB - 컬럼 추가 후 한 번 다시 계산
+            with conn:
+                for col in missing:
+                    conn.execute(f"ALTER TABLE performances ADD COLUMN {col} INTEGER NOT NULL DEFAULT 0")
+            self.recount()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'search_index'").fetchone()
+        if row is None or row[0] != SEARCH_INDEX_VERSION:
+            self.rebuild_search_index()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=OFF")
+            self._local.conn = conn
+        return conn
+
+    @property
+    def conn(self):
+        """현재 스레드의 연결"""
+        return self._connect()
+
+    # ---------- 사용자 ----------
+
+    def get_user(self, username):
+        row = self.conn.execute(
+            "SELECT email, password, created_at FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'email': row[0], 'password': row[1], 'created_at': row[2]}
+
+    def email_exists(self, email):
+        row = self.conn.execute("SELECT 1 FROM users WHERE email = ? LIMIT 1", (email,)).fetchone()
+        return row is not None
+
+    def add_user(self, username, record):
+        with self.conn as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO users (username, email, password, created_at) VALUES (?, ?, ?, ?)",
+                (username, record['email'], record['password'], record.get('created_at'))
+            )
+        return cur.rowcount == 1
+
+    # ---------- 연주 내역 ----------
+
+    def add_performances(self, records):
+        placeholders = ", ".join("?" for _ in PERFORMANCE_COLUMNS)
+        with self.conn as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO performances ({', '.join(PERFORMANCE_COLUMNS)}) VALUES ({placeholders})",
+                [performance_to_row(record) for record in records]
+            )
+            for record in records:
+                _index_performance(conn, record)
+
+    def get_performance(self, perf_id):
+        row = self.conn.execute(
+            f"SELECT {', '.join(PERFORMANCE_COLUMNS)} FROM performances WHERE id = ?", (perf_id,)
+        ).fetchone()
+        return _row_to_performance(row) if row else None
+
+    def update_performance(self, perf_id, fields):
+        return self.update_performances({perf_id: fields}) == 1
+
+    def update_performances(self, updates):
+        updated = 0
+        assignments = ", ".join(f"{col} = ?" for col in PERFORMANCE_COLUMNS[1:])
+        with self.conn as conn:
+            # 읽고-고쳐-쓰기 사이에 다른 쓰기가 끼어들지 않도록 쓰기 잠금부터 획득 (전체를 한 트랜잭션으로)
+            conn.execute("BEGIN IMMEDIATE")
+            for perf_id, fields in updates.items():
+                row = conn.execute(
+                    f"SELECT {', '.join(PERFORMANCE_COLUMNS)} FROM performances WHERE id = ?", (perf_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                record = {**_row_to_performance(row), **fields}
+                values = performance_to_row(record)
+                conn.execute(f"UPDATE performances SET {assignments} WHERE id = ?", values[1:] + (perf_id,))
+                _index_performance(conn, record)
+                updated += 1
+        return updated
+
+    def delete_performances(self, perf_ids):
+        deleted = 0
+        with self.conn as conn:
+            # 전체를 한 트랜잭션으로 - 댓글/좋아요/검색 토큰은 performance_id 인덱스로 해당 행만
+            for chunk in _chunks(dict.fromkeys(perf_ids)):
+                placeholders = ', '.join('?' for _ in chunk)
+                cur = conn.execute(f"DELETE FROM performances WHERE id IN ({placeholders})", chunk)
+                deleted += cur.rowcount
+                for table in ('comments', 'likes', 'search_terms'):
+                    conn.execute(f"DELETE FROM {table} WHERE performance_id IN ({placeholders})", chunk)
+        return deleted
+
+    def _performance_page(self, where, params, limit=None, cursor=None):
+        """(date, id) 역순 키셋 페이지 - 인덱스 (…, date, id)를 그대로 거꾸로 읽음"""
+        sql = f"SELECT {', '.join(PERFORMANCE_COLUMNS)} FROM performances WHERE {where}"
+        params = list(params)
+        if cursor is not None:
+            sql += " AND (date, id) < (?, ?)"
+            params.extend(cursor)
+        sql += " ORDER BY date DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit + 1)   # 한 건 더 읽어서 다음 페이지 유무 확인
+        items = [_row_to_performance(row) for row in self.conn.execute(sql, params)]
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            return items, (items[-1]['date'], items[-1]['id'])
+        return items, None
+
+    def get_user_performances(self, user_id):
+        return self._performance_page("user_id = ?", (user_id,))[0]
+
+    def get_public_performances(self):
+        return self._performance_page("is_public = 1", ())[0]
+
+    def get_user_performances_page(self, user_id, limit, cursor=None):
+        return self._performance_page("user_id = ?", (user_id,), limit, cursor)
+
+    def get_public_performances_page(self, limit, cursor=None):
+        return self._performance_page("is_public = 1", (), limit, cursor)
+
+    def count_user_performances(self, user_id):
+        return self.conn.execute("SELECT COUNT(*) FROM performances WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def count_public_performances(self):
+        return self.conn.execute("SELECT COUNT(*) FROM performances WHERE is_public = 1").fetchone()[0]
+
+    def rebuild_search_index(self):
+        """검색 색인 전체 다시 만들기 (마이그레이션 직후, 토큰화 규칙 변경 시)"""
+        with self.conn as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM search_terms")
+            rows = conn.execute(f"SELECT {', '.join(PERFORMANCE_COLUMNS)} FROM performances").fetchall()
+            for row in rows:
+                _index_performance(conn, _row_to_performance(row))
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('search_index', ?)", (SEARCH_INDEX_VERSION,)
+            )
+
+    def _word_ids(self, word, mask):
+        """단어의 모든 토큰을 mask 필드에 가진 공연 ID 집합"""
+        if len(word) < 2:
+            # 한 글자 검색어는 그 글자가 들어간 토큰 전체 (토큰 목록을 훑음)
+            rows = self.conn.execute(
+                "SELECT DISTINCT performance_id FROM search_terms WHERE instr(token, ?) > 0 AND mask & ?",
+                (word, mask)
+            )
+            return {row[0] for row in rows}
+        tokens = sorted(search.word_tokens(word))
+        rows = self.conn.execute(
+            "SELECT performance_id FROM search_terms "
+            f"WHERE token IN ({', '.join('?' for _ in tokens)}) AND mask & ? "
+            "GROUP BY performance_id HAVING COUNT(*) = ?",
+            [*tokens, mask, len(tokens)]
+        )
+        return {row[0] for row in rows}
+
+    def search_performances(self, query, field_queries=None, user_id=None, date_from=None, date_to=None):
+        terms, field_terms = search.parse_query(query, field_queries)
+        where, params = ("user_id = ?", [user_id]) if user_id else ("is_public = 1", [])
+        if date_from is not None:
+            where += " AND date >= ?"
+            params.append(date_from)
+        if date_to is not None:
+            where += " AND date <= ?"
+            params.append(date_to)
+        if not terms and not field_terms:
+            return self._performance_page(where, params)[0]
+
+        ids = None
+        for word, mask in search.conditions(terms, field_terms):
+            word_ids = self._word_ids(word, mask)
+            ids = word_ids if ids is None else ids & word_ids
+            if not ids:
+                return []
+        records = []
+        for chunk in _chunks(ids):
+            rows = self.conn.execute(
+                f"SELECT {', '.join(PERFORMANCE_COLUMNS)} FROM performances "
+                f"WHERE {where} AND id IN ({', '.join('?' for _ in chunk)})", [*params, *chunk]
+            )
+            records.extend(_row_to_performance(row) for row in rows)
+        match = search.compile_query(terms, field_terms)
+        return search.rank(((record, search.normalized_texts(record)) for record in records), match)
+
+    def iter_performances(self):
+        rows = self.conn.execute(f"SELECT {', '.join(PERFORMANCE_COLUMNS)} FROM performances")
+        return (_row_to_performance(row) for row in rows)
+
+    # ---------- 통계 ----------
+
+    def _sync_stats_columns(self):
+        """통계 열 데이터를 DB에 맞춤 (값이 바뀐 행만 배열에 다시 씀)
+
+        통계 전용 연결은 쓰지 않으므로 PRAGMA data_version이 다른 연결(다른 스레드/
+        프로세스)의 커밋을 모두 알려 줍니다. 바뀐 것이 없으면 DB를 읽지 않습니다.
+        """
+        from .. import stats      # NumPy를 통계를 처음 볼 때 로드
+
+        with self._stats_lock:
+            if self._stats_columns is None:
+                self._stats_columns = stats.PerformanceColumns()
+                self._stats_conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn = self._stats_conn
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._stats_columns.version != version:
+                self._stats_columns.sync_rows(
+                    conn.execute(f"SELECT id, {', '.join(stats.SOURCE_FIELDS)} FROM performances"))
+                self._stats_columns.version = version
+            return self._stats_columns
+
+    def get_performance_stats(self, user_id=None):
+        columns = self._sync_stats_columns()
+        with self._stats_lock:
+            return columns.summarize(columns.select(user_id=user_id, public_only=user_id is None))
+
+    # ---------- 변경 감지 ----------
+
+    def data_version(self):
+        """PRAGMA data_version - 이 연결 밖(다른 스레드/프로세스)의 커밋마다 바뀜"""
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # ---------- 댓글 ----------
+
+    def add_comment(self, record):
+        with self.conn as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            exists = conn.execute("SELECT 1 FROM comments WHERE id = ?", (record['id'],)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO comments (id, performance_id, user_id, content, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (record['id'], record['performance_id'], record['user_id'],
+                 record['content'], record['created_at'])
+            )
+            if exists is None:
+                conn.execute("UPDATE performances SET comment_count = comment_count + 1 WHERE id = ?",
+                             (record['performance_id'],))
+
+    def delete_comment(self, comment_id):
+        with self.conn as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT performance_id FROM comments WHERE id = ?", (comment_id,)).fetchone()
+            if row is None:
+                return False
+            conn.execute("DELETE FROM comments WHERE id = ?", (comment_id,))
+            conn.execute("UPDATE performances SET comment_count = MAX(comment_count - 1, 0) WHERE id = ?", row)
+        return True
+
+    def get_comments_grouped(self, perf_ids):
+        grouped = {perf_id: [] for perf_id in perf_ids}
+        for chunk in _chunks(grouped):
+            rows = self.conn.execute(
+                "SELECT id, performance_id, user_id, content, created_at FROM comments "
+                f"WHERE performance_id IN ({', '.join('?' for _ in chunk)}) "
+                "ORDER BY performance_id, created_at", chunk
+            )
+            for row in rows:
+                grouped[row[1]].append(_row_to_comment(row))
+        return grouped
+
+    # ---------- 좋아요 ----------
+
+    def toggle_like(self, performance_id, user_id, created_at):
+        with self.conn as conn:
+            cur = conn.execute(
+                "DELETE FROM likes WHERE performance_id = ? AND user_id = ?", (performance_id, user_id)
+            )
+            if cur.rowcount:
+                conn.execute("UPDATE performances SET like_count = MAX(like_count - 1, 0) WHERE id = ?",
+                             (performance_id,))
+                return False
+            conn.execute(
+                "INSERT INTO likes (performance_id, user_id, created_at) VALUES (?, ?, ?)",
+                (performance_id, user_id, created_at)
+            )
+            conn.execute("UPDATE performances SET like_count = like_count + 1 WHERE id = ?", (performance_id,))
+        return True
+
+    def get_like_counts(self, perf_ids):
+        counts = {perf_id: 0 for perf_id in perf_ids}
+        for chunk in _chunks(counts):
+            rows = self.conn.execute(
+                "SELECT performance_id, COUNT(*) FROM likes "
+                f"WHERE performance_id IN ({', '.join('?' for _ in chunk)}) GROUP BY performance_id", chunk
+            )
+            counts.update(rows)
+        return counts
+
+    def get_liked_set(self, user_id, perf_ids):
+        liked = set()
+        for chunk in _chunks(set(perf_ids)):
+            rows = self.conn.execute(
+                "SELECT performance_id FROM likes "
+                f"WHERE user_id = ? AND performance_id IN ({', '.join('?' for _ in chunk)})",
+                [user_id, *chunk]
+            )
+            liked.update(row[0] for row in rows)
+        return liked
+
+    # ---------- 좋아요/댓글 수 ----------
+
+    def recount(self):
+        with self.conn as conn:
+            cur = conn.execute(
+                "UPDATE performances SET "
+                "like_count = (SELECT COUNT(*) FROM likes WHERE likes.performance_id = performances.id), "
+                "comment_count = (SELECT COUNT(*) FROM comments WHERE comments.performance_id = performances.id) "
+                "WHERE like_count != (SELECT COUNT(*) FROM likes WHERE likes.performance_id = performances.id) "
+                "OR comment_count != (SELECT COUNT(*) FROM comments WHERE comments.performance_id = performances.id)"
+            )
+        return cur.rowcount
+
+    def ensure_counts(self):
+        # 컬럼이 없던 DB는 __init__에서 이미 다시 계산함
+        return 0
+
+    def iter_engagements(self, since=None):
+        for kind, table in (('like', 'likes'), ('comment', 'comments')):
+            rows = self.conn.execute(f"SELECT performance_id, created_at FROM {table} "
+                                     "WHERE created_at IS NOT NULL AND created_at >= ?", (since or '',))
+            for perf_id, created_at in rows:
+                yield kind, perf_id, created_at
+
+    # ---------- 카테고리 ----------
+
+    def load_categories(self):
+        return _read_categories(self.conn)
+
+    def save_categories(self, categories):
+        with self.conn as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            _write_categories(conn, categories)
+
+    def update_categories(self, mutate):
+        with self.conn as conn:
+            # 읽기 전에 쓰기 잠금부터 - 읽고 쓰는 사이에 다른 연결의 카테고리 쓰기가 끼어들지 않게
+            conn.execute("BEGIN IMMEDIATE")
+            saved = _read_categories(conn)
+            categories = {key: list(values) for key, values in (saved or DEFAULT_CATEGORIES).items()}
+            result = mutate(categories)
+            if categories != saved:
+                _write_categories(conn, categories)
+        return result
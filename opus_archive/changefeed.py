@@ -0,0 +1,126 @@
+"""
+프로세스 간 변경 알림 - 데이터 디렉터리의 추가 전용 변경 로그 (changes.log)
+
+같은 데이터 디렉터리를 여러 서버 프로세스가 함께 쓸 때, 파일을 쓴 프로세스가 어떤
+파일을 썼는지 한 줄을 추가하고 나머지 프로세스는 로그의 새 줄만 읽어서 그 파일의
+캐시만 버립니다 (store.watch 참고). 외부 서비스 없이 파일 하나로 동작합니다.
+
+    <프로세스 토큰> <데이터 디렉터리 기준 상대 경로>\\n
+
+- 읽는 쪽은 로그 크기만 확인(stat 한 번)하다가 커졌을 때 새 줄만 읽습니다. 변경된
+  파일이 많아도 확인 비용은 로그 파일 하나입니다 (샤드 레이아웃에서 중요).
+- 자기 프로세스가 쓴 줄은 건너뜁니다 (캐시는 쓸 때 이미 갱신됨). pid 대신 임의의
+  토큰을 쓰므로 컨테이너끼리 pid가 겹쳐도 구분됩니다.
+- 로그가 MAX_LOG_BYTES를 넘으면 쓰는 쪽이 빈 로그로 교체합니다. 읽는 쪽은 로그 파일이
+  바뀐 것을 보고 캐시 전체를 한 번 mtime/size/inode로 다시 확인합니다.
+- 파일을 쓰고 나서 로그를 추가하므로 그 사이에 프로세스가 죽으면 알림이 빠질 수
+  있습니다. 변경 로그를 모르는 도구가 파일을 바꾼 경우와 함께, 읽는 쪽이
+  RESCAN_INTERVAL초마다 캐시 전체를 다시 확인하는 것으로 보완합니다.
+"""
+
+import os
+import time
+import uuid
+
+from .locks import file_lock
+
+LOG_NAME = "changes.log"
+MAX_LOG_BYTES = 1 << 20        # 이보다 커지면 빈 로그로 교체
+RESCAN_INTERVAL = 5.0          # 초 - 알림과 관계없이 캐시 전체를 다시 확인하는 주기
+
+# 이 프로세스가 쓴 줄 표시 (fork한 자식도 새 토큰을 쓰도록 모듈 로드 시점이 아니라 pid별로)
+_tokens = {}
+
+
+def process_token():
+    pid = os.getpid()
+    if pid not in _tokens:
+        _tokens[pid] = uuid.uuid4().hex[:12]
+    return _tokens[pid]
+
+
+def _identity(st):
+    return (st.st_dev, st.st_ino) if st is not None else None
+
+
+class ChangeFeed:
+    """데이터 디렉터리 하나의 변경 로그 (쓰기 알림 + 다른 프로세스의 알림 읽기)
+
+    읽기 상태(offset)는 프로세스 안에서 하나이므로 store가 자기 잠금 안에서 poll합니다.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.path = os.path.join(self.root, LOG_NAME)
+        self.lock_path = self.path + '.lock'
+        self._prefix = self.root + os.sep
+        st = self._stat()
+        self._identity = _identity(st)
+        self._offset = st.st_size if st is not None else 0
+        self._last_rescan = 0.0    # 처음 poll은 전체 확인 (watch 전에 캐시에 올린 파일)
+        self.received = 0          # 다른 프로세스에게서 받은 알림 수
+
+    def covers(self, key):
+        """절대 경로 key가 이 데이터 디렉터리 아래인지"""
+        return key.startswith(self._prefix)
+
+    def _stat(self):
+        try:
+            return os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+    # ---------- 쓰기 ----------
+
+    def publish(self, key):
+        """key 파일을 썼다고 알림 (파일을 원자적으로 교체한 뒤에 호출)"""
+        line = f"{process_token()} {os.path.relpath(key, self.root)}\n".encode('utf-8')
+        with file_lock(self.lock_path):
+            st = self._stat()
+            if st is not None and st.st_size + len(line) > MAX_LOG_BYTES:
+                self._rotate()
+            # 한 줄을 O_APPEND로 한 번에 쓰므로 다른 프로세스의 줄과 섞이지 않음
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def _rotate(self):
+        """빈 로그로 교체 (새 inode - 읽는 쪽은 교체를 보고 전체를 다시 확인)"""
+        tmp_path = f"{self.path}.{process_token()}.tmp"
+        open(tmp_path, 'wb').close()
+        os.replace(tmp_path, self.path)
+
+    # ---------- 읽기 ----------
+
+    def poll(self):
+        """마지막 poll 이후 -> (다른 프로세스가 쓴 파일의 절대 경로 집합, 전체를 다시 확인할지)"""
+        now = time.monotonic()
+        recheck = now - self._last_rescan >= RESCAN_INTERVAL
+        if recheck:
+            self._last_rescan = now
+        st = self._stat()
+        identity = _identity(st)
+        if identity != self._identity:
+            # 로그가 새로 생겼거나 교체됨 - 그 사이의 알림은 알 수 없으므로 전체 확인
+            self._identity = identity
+            self._offset = st.st_size if st is not None else 0
+            self._last_rescan = now
+            return set(), True
+        if st is None or st.st_size <= self._offset:
+            return set(), recheck
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(st.st_size - self._offset)
+        end = data.rfind(b'\n') + 1            # 쓰는 중인 마지막 줄은 다음 번에
+        self._offset += end
+        token = process_token()
+        changed = set()
+        for line in data[:end].decode('utf-8', 'replace').splitlines():
+            writer, _, rel_path = line.partition(' ')
+            if writer != token and rel_path:
+                changed.add(os.path.join(self.root, rel_path))
+        self.received += len(changed)
+        return changed, recheck
@@ -0,0 +1,117 @@
+"""
+데이터 파일 형식 - 저장 형식 선택과 읽을 때 자동 감지
+
+OPUS_DATA_FORMAT 환경 변수로 저장 형식을 고릅니다 (기본값 json).
+- json    : 들여쓰기한 JSON (이전과 같은 출력, 사람이 읽기 쉬움)
+- compact : 공백 없는 JSON (orjson이 설치되어 있으면 orjson으로 인코딩)
+- msgpack : MessagePack 바이너리 (msgpack 패키지 필요)
+
+JSON 두 형식은 그대로 JSON이라 다른 도구로도 열 수 있습니다. 바이너리 형식은 파일
+앞에 매직 바이트와 형식 버전을 붙입니다 (BINARY_MAGIC + 버전 1바이트). 읽을 때는 앞
+바이트를 보고 판단하므로 형식을 바꿔도 기존 파일은 그대로 읽히고, 다음 저장부터 새
+형식이 됩니다. 파일 이름은 형식과 관계없이 *.json을 유지합니다. dict가 아닌 Mapping
+(records의 __slots__ 레코드)은 dict로 바꿔서 씁니다.
+orjson이 있으면 형식과 관계없이 JSON 읽기/쓰기에 쓰고 (들여쓰기 출력도 json.dumps와
+같음), 파싱하는 동안은 순환 GC를 멈춥니다 - 레코드 수십만 개를 만드는 동안 GC가 여러 번
+전체를 훑어서 파싱 시간의 절반 가까이를 차지하기 때문입니다.
+
+데이터 디렉터리 전체를 한 번에 바꾸려면:
+
+    python -m opus_archive.convert --data-dir data --format compact
+"""
+
+import gc
+import json
+import os
+from collections.abc import Mapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMAT_ENV = "OPUS_DATA_FORMAT"
+FORMATS = ('json', 'compact', 'msgpack')
+DEFAULT_FORMAT = 'json'
+
+BINARY_MAGIC = b'OPUSMP\x00'
+BINARY_VERSION = 1
+
+
+def available_formats():
+    """이 환경에서 쓸 수 있는 저장 형식"""
+    return [fmt for fmt in FORMATS if fmt != 'msgpack' or msgpack is not None]
+
+
+def check_format(fmt):
+    """형식 이름 확인 (모르는 형식이거나 패키지가 없으면 ValueError)"""
+    if fmt not in FORMATS:
+        raise ValueError(f"알 수 없는 데이터 형식: {fmt} ({', '.join(FORMATS)})")
+    if fmt == 'msgpack' and msgpack is None:
+        raise ValueError("msgpack 형식을 쓰려면 msgpack 패키지가 필요합니다 (pip install msgpack)")
+    return fmt
+
+
+def default_format():
+    """OPUS_DATA_FORMAT (없으면 json)"""
+    return check_format((os.environ.get(FORMAT_ENV) or DEFAULT_FORMAT).lower())
+
+
+def detect(raw):
+    """파일 내용의 형식 - 들여쓰기 여부는 JSON 첫 줄바꿈 위치로 판단"""
+    if raw.startswith(BINARY_MAGIC):
+        return 'msgpack'
+    return 'json' if raw[1:2] == b'\n' else 'compact'
+
+
+def decode(raw):
+    """파일 내용(bytes) -> 객체"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _decode(raw)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _decode(raw):
+    if raw.startswith(BINARY_MAGIC):
+        version = raw[len(BINARY_MAGIC)]
+        if version != BINARY_VERSION:
+            raise ValueError(f"지원하지 않는 바이너리 형식 버전: {version}")
+        if msgpack is None:
+            raise ValueError("msgpack 형식 파일입니다. msgpack 패키지를 설치하세요 (pip install msgpack)")
+        return msgpack.unpackb(raw[len(BINARY_MAGIC) + 1:], raw=False)
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def _plain(obj):
+    """인코더가 모르는 객체 처리 - 레코드 같은 Mapping은 dict로 (to_dict가 있으면 그것으로)"""
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is not None:
+        return to_dict()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"저장할 수 없는 값: {type(obj).__name__}")
+
+
+def encode(data, fmt=None):
+    """객체 -> 파일 내용(bytes) (fmt가 없으면 OPUS_DATA_FORMAT)"""
+    fmt = check_format(fmt) if fmt else default_format()
+    if fmt == 'json':
+        if orjson is not None:
+            return orjson.dumps(data, default=_plain, option=orjson.OPT_INDENT_2)
+        return json.dumps(data, default=_plain, ensure_ascii=False, indent=2).encode('utf-8')
+    if fmt == 'compact':
+        if orjson is not None:
+            return orjson.dumps(data, default=_plain)
+        return json.dumps(data, default=_plain, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return BINARY_MAGIC + bytes([BINARY_VERSION]) + msgpack.packb(data, default=_plain, use_bin_type=True)
@@ -0,0 +1,77 @@
+"""
+데이터 파일 형식 바꾸기 (json / compact / msgpack - codec 참고)
+
+    python -m opus_archive.convert --data-dir data --format compact
+    python -m opus_archive.convert --data-dir data --check     # 파일별 현재 형식과 크기만 보기
+
+데이터 디렉터리의 *.json과 사용자별 샤드(performances/) 파일을 하나씩 읽어 새 형식으로
+저장합니다 (파일 잠금 + 원자적 교체라 앱이 실행 중이어도 안전). 읽기는 형식을 자동으로
+감지하지만, 앱의 다음 저장은 OPUS_DATA_FORMAT 형식이 되므로 앱도 같은 값으로 실행하세요.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from . import codec
+from .backends.performance_layout import SHARD_DIR
+from .store import load_json, save_json, watch
+
+
+def data_files(data_dir):
+    """형식을 바꿀 데이터 파일 목록 (좋아요/댓글 이벤트 로그 *.log.jsonl은 제외)"""
+    data_dir = Path(data_dir)
+    return sorted(data_dir.glob("*.json")) + sorted((data_dir / SHARD_DIR).rglob("*.json"))
+
+
+def file_format(file_path):
+    with open(file_path, 'rb') as f:
+        return codec.detect(f.read(len(codec.BINARY_MAGIC) + 1))
+
+
+def convert(data_dir, fmt, log=print):
+    """모든 데이터 파일을 fmt로 저장 -> (바꾼 파일 수, 이전 전체 크기, 새 전체 크기)"""
+    codec.check_format(fmt)
+    watch(data_dir)     # 실행 중인 앱 프로세스에 바꾼 파일을 알림
+    changed = 0
+    before_total = after_total = 0
+    for file_path in data_files(data_dir):
+        before = file_path.stat().st_size
+        if file_format(file_path) != fmt:
+            save_json(file_path, load_json(file_path), fmt)
+            changed += 1
+        after = file_path.stat().st_size
+        before_total += before
+        after_total += after
+        log(f"{file_path.relative_to(data_dir)}: {before:,} -> {after:,} bytes")
+    return changed, before_total, after_total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터 파일을 다른 저장 형식으로 바꿉니다.")
+    parser.add_argument('--data-dir', default='data', help="데이터 디렉터리 (기본값: data)")
+    parser.add_argument('--format', choices=codec.FORMATS,
+                        help="새 형식 (기본값: OPUS_DATA_FORMAT 또는 json)")
+    parser.add_argument('--check', action='store_true', help="바꾸지 않고 파일별 형식과 크기만 출력")
+    args = parser.parse_args(argv)
+    data_dir = Path(args.data_dir)
+    if not data_dir.is_dir():
+        parser.error(f"데이터 디렉터리가 없습니다: {args.data_dir}")
+
+    if args.check:
+        for file_path in data_files(data_dir):
+            print(f"{file_path.relative_to(data_dir)}: {file_format(file_path)}, {file_path.stat().st_size:,} bytes")
+        return 0
+
+    try:
+        fmt = args.format or codec.default_format()
+        changed, before, after = convert(data_dir, fmt)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{fmt} 형식으로 {changed}개 파일 변환: 전체 {before:,} -> {after:,} bytes")
+    print(f"앱도 같은 형식으로 저장하려면: {codec.FORMAT_ENV}={fmt} streamlit run app.py")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+추가 전용 이벤트 로그 (좋아요/댓글)
+
+좋아요 한 번마다 likes.json 전체를 다시 쓰는 대신, JSONL 로그에 한 줄을 추가하고
+fsync합니다. 메모리에는 "스냅샷 + 로그 재생" 결과를 들고 있으며, 백그라운드
+스레드가 주기적으로 로그를 스냅샷에 합칩니다 (compaction).
+
+파일 구성 (likes 예시):
+    likes.json             스냅샷 - JSON 백엔드와 같은 형식
+    likes.log.jsonl        스냅샷 이후의 이벤트
+    likes.log.jsonl.old    compaction 중인 이전 로그 (끝나면 삭제)
+    likes.log.lock         프로세스 간 잠금 파일 (추가 쓰기)
+    likes.log.compact.lock compaction끼리의 잠금 파일
+
+이벤트는 "키를 값으로 설정/삭제"라서 같은 이벤트를 다시 재생해도 결과가 같습니다.
+그래서 compaction 도중에 죽어도 다음 시작 때 남은 로그를 다시 재생하면 됩니다.
+"""
+
+import bisect
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from . import codec, metrics
+from .locks import file_lock
+from .records import Comment, Like
+from .store import write_json_atomic
+
+COMPACT_INTERVAL = 60          # 초 - 백그라운드 compaction 확인 주기
+COMPACT_MIN_BYTES = 1 << 20    # 로그가 이보다 커지면 compaction
+
+
+def _file_id(path):
+    """스냅샷 교체 감지용 (inode, mtime_ns) - 없으면 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+
+class EventLog:
+    """스냅샷 + 추가 전용 로그로 유지되는 컬렉션 하나 (하위 클래스가 이벤트 적용 정의)
+
+    로그 파일의 첫 줄은 {"op": "header", "log_id": ...}입니다. 로그가 교체되면
+    (compaction) log_id가 달라지므로 다른 프로세스도 다시 로드해야 함을 알 수 있습니다.
+    """
+
+    def __init__(self, snapshot_path):
+        self.snapshot_path = snapshot_path
+        self.log_path = snapshot_path.with_name(snapshot_path.stem + '.log.jsonl')
+        self.old_log_path = self.log_path.with_name(self.log_path.name + '.old')
+        self.lock_path = snapshot_path.with_name(snapshot_path.stem + '.log.lock')
+        self.compact_lock_path = snapshot_path.with_name(snapshot_path.stem + '.log.compact.lock')
+        self._lock = threading.RLock()
+        self._offset = 0
+        self._identity = None
+        self.records = {}
+        self._load()
+
+    # ---------- 하위 클래스 훅 ----------
+
+    def _reset(self, records):
+        """스냅샷으로 상태 초기화"""
+        self.records = records
+
+    def _apply(self, event):
+        """이벤트 하나를 메모리 상태에 적용"""
+        raise NotImplementedError
+
+    # ---------- 로드 / 따라잡기 ----------
+
+    def _read_log(self, path, offset=0, expected_id=None):
+        """로그를 offset부터 재생 -> (log_id, 새 offset)
+
+        expected_id가 주어졌는데 헤더가 다르면 재생하지 않고 (log_id, None)을 돌려줍니다.
+        """
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None, 0
+        with f:
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                return None, 0                 # 헤더를 쓰는 중
+            log_id = json.loads(header).get('log_id')
+            if expected_id is not None and log_id != expected_id:
+                return log_id, None
+            offset = max(offset, len(header))
+            f.seek(offset)
+            data = f.read()
+        metrics.add_bytes(read=len(header) + len(data))
+        end = data.rfind(b'\n') + 1            # 쓰는 중인 마지막 줄은 다음 번에
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        return log_id, offset + end
+
+    def _load(self):
+        """스냅샷을 읽고 남은 로그를 재생"""
+        with self._lock, file_lock(self.lock_path):
+            snapshot_id = _file_id(self.snapshot_path)
+            if snapshot_id is not None:
+                with open(self.snapshot_path, 'rb') as f:
+                    records = codec.decode(f.read())
+            else:
+                records = {}
+            self._reset(records)
+            self._read_log(self.old_log_path)
+            log_id, self._offset = self._read_log(self.log_path)
+            self._identity = (snapshot_id, log_id)
+
+    def catch_up(self):
+        """다른 프로세스가 추가한 이벤트 반영 (스냅샷/로그가 교체됐으면 다시 로드)"""
+        with self._lock:
+            snapshot_id, log_id = self._identity
+            if _file_id(self.snapshot_path) != snapshot_id:
+                self._load()
+                return
+            new_id, offset = self._read_log(self.log_path, self._offset, log_id)
+            if new_id != log_id or offset is None:
+                self._load()
+                return
+            self._offset = offset
+
+    def version(self):
+        """다른 프로세스의 이벤트까지 반영한 뒤의 상태 표시 - 이벤트가 추가되면 달라짐"""
+        with self._lock:
+            self.catch_up()
+            return self._identity, self._offset
+
+    # ---------- 쓰기 ----------
+
+    @contextmanager
+    def transaction(self):
+        """읽고-판단하고-추가하는 동안 잡는 잠금 (스레드 + 프로세스)"""
+        with self._lock, file_lock(self.lock_path):
+            self.catch_up()
+            yield self
+
+    def append(self, events):
+        """이벤트 추가 (transaction 안에서 호출) - 한 번의 write + fsync"""
+        payload = b''.join(
+            json.dumps(event, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+            for event in events
+        )
+        snapshot_id, log_id = self._identity
+        if log_id is None:
+            # 새 로그 파일 - 헤더와 함께 생성
+            log_id = uuid.uuid4().hex
+            header = json.dumps({'op': 'header', 'log_id': log_id}).encode('utf-8') + b'\n'
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            payload = header + payload
+            self._offset = 0
+        else:
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+            metrics.add_bytes(written=len(payload))
+        finally:
+            os.close(fd)
+        for event in events:
+            self._apply(event)
+        self._offset += len(payload)
+        self._identity = (snapshot_id, log_id)
+
+    # ---------- compaction ----------
+
+    def log_size(self):
+        try:
+            return os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+    def compact(self):
+        """로그를 스냅샷에 합치기 (쓰기는 로그 교체 순간에만 잠깐 멈춤)"""
+        # compaction끼리는 별도 잠금으로 한 번에 하나만 (추가 쓰기는 막지 않음)
+        with file_lock(self.compact_lock_path):
+            with self._lock, file_lock(self.lock_path):
+                self.catch_up()
+                if self.old_log_path.exists():
+                    # 이전 compaction이 중간에 끊김 - 메모리에는 이미 재생되어 있으므로 먼저 정리
+                    write_json_atomic(self.snapshot_path, self.records)
+                    os.remove(self.old_log_path)
+                    self._identity = (_file_id(self.snapshot_path), self._identity[1])
+                if self._identity[1] is None:
+                    return False
+                # 현재 로그를 .old로 돌리고 새 이벤트는 새 로그로
+                os.replace(self.log_path, self.old_log_path)
+                records = dict(self.records)
+                self._offset = 0
+                self._identity = (self._identity[0], None)
+
+            write_json_atomic(self.snapshot_path, records)
+
+            with self._lock, file_lock(self.lock_path):
+                os.remove(self.old_log_path)
+                self._identity = (_file_id(self.snapshot_path), self._identity[1])
+        return True
+
+
+class LikeLog(EventLog):
+    """좋아요 로그 - {"op": "like"|"unlike", "performance_id", "user_id", "created_at"}"""
+
+    def _reset(self, records):
+        self.records = {key: Like.of(value) for key, value in records.items()}
+        self.by_performance = {}
+        for like in self.records.values():
+            self.by_performance.setdefault(like['performance_id'], set()).add(like['user_id'])
+
+    def _apply(self, event):
+        perf_id, user_id = event['performance_id'], event['user_id']
+        like_key = f"{perf_id}_{user_id}"
+        if event['op'] == 'like':
+            like = self.records[like_key] = Like({
+                'performance_id': perf_id,
+                'user_id': user_id,
+                'created_at': event.get('created_at')
+            })
+            # 집합에도 intern된 문자열을 넣어 로그 줄마다 생긴 사본을 버림
+            self.by_performance.setdefault(like.performance_id, set()).add(like.user_id)
+        elif event['op'] == 'unlike':
+            self.records.pop(like_key, None)
+            users = self.by_performance.get(perf_id)
+            if users is not None:
+                users.discard(user_id)
+                if not users:
+                    del self.by_performance[perf_id]
+
+
+class CommentLog(EventLog):
+    """댓글 로그 - {"op": "comment", "record": {...}} / {"op": "delete", "id"}"""
+
+    def _reset(self, records):
+        self.records = {key: Comment.of(value) for key, value in records.items()}
+        self.by_performance = {}
+        for comment in self.records.values():
+            self.by_performance.setdefault(comment['performance_id'], []).append(comment)
+        for perf_comments in self.by_performance.values():
+            perf_comments.sort(key=lambda x: x['created_at'])
+
+    def _remove(self, comment_id):
+        comment = self.records.pop(comment_id, None)
+        if comment is not None:
+            perf_comments = self.by_performance.get(comment['performance_id'], [])
+            perf_comments[:] = [c for c in perf_comments if c['id'] != comment_id]
+            if not perf_comments:
+                self.by_performance.pop(comment['performance_id'], None)
+
+    def _apply(self, event):
+        if event['op'] == 'comment':
+            record = Comment.of(event['record'])
+            self._remove(record['id'])   # 재생 시 중복 방지
+            self.records[record['id']] = record
+            perf_comments = self.by_performance.setdefault(record['performance_id'], [])
+            keys = [c['created_at'] for c in perf_comments]
+            perf_comments.insert(bisect.bisect_right(keys, record['created_at']), record)
+        elif event['op'] == 'delete':
+            self._remove(event['id'])
+
+
+class Compactor(threading.Thread):
+    """로그가 COMPACT_MIN_BYTES를 넘으면 주기적으로 compaction하는 데몬 스레드"""
+
+    def __init__(self, logs, interval=COMPACT_INTERVAL, min_bytes=COMPACT_MIN_BYTES):
+        super().__init__(name='opus-log-compactor', daemon=True)
+        self.logs = logs
+        self.interval = interval
+        self.min_bytes = min_bytes
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            for log in self.logs:
+                try:
+                    if log.log_size() >= self.min_bytes:
+                        log.compact()
+                except OSError:
+                    # 다음 주기에 다시 시도 (로그는 그대로 남아 있으므로 데이터 손실 없음)
+                    pass
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,307 @@
+"""
+연주 내역 내보내기 (CSV / JSONL / XLSX)
+
+    python -m opus_archive.exporter --data-dir data --user USERNAME -o my.csv
+    python -m opus_archive.exporter --data-dir data --public -o public.xlsx
+
+레코드는 백엔드의 키셋 페이지(page_size건씩, 최신 날짜 먼저)로 읽고, 파일 내용은
+바이트 조각을 내는 제너레이터로 만듭니다. 전체 목록이나 완성된 파일을 메모리에
+따로 만들지 않으므로 공개 아카이브 전체도 한 페이지 분량의 메모리로 내보냅니다.
+좋아요/댓글 수는 레코드에 저장된 개수(like_count, comment_count)를 씁니다.
+
+CSV 머리글은 가져오기(importer)가 그대로 읽을 수 있는 한글 이름이고, 곡목은 " | "로
+연결합니다. XLSX는 표준 라이브러리 zipfile로 시트 XML을 한 행씩 스트리밍해서 씁니다.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+# (필드, 머리글) - UNIMPLEMENT.md의 내보내기 열 + 좋아요/댓글 수
+EXPORT_COLUMNS = [
+    ('date', '날짜'),
+    ('venue', '장소'),
+    ('instrument', '악기'),
+    ('sub_part', '세부 파트'),
+    ('ensemble_name', '단체명'),
+    ('conductor', '지휘자'),
+    ('is_public', '공개'),
+    ('is_guest', '객원'),
+    ('guest_fee', '페이'),
+    ('pieces', '곡목'),
+    ('like_count', '좋아요'),
+    ('comment_count', '댓글'),
+    ('youtube_url', '유튜브'),
+    ('poster_url', '포스터'),
+]
+
+# JSONL에 싣는 필드 (user_id, created_at 포함)
+JSONL_FIELDS = ['id', 'user_id'] + [field for field, _ in EXPORT_COLUMNS] + ['created_at']
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'jsonl': ('application/x-ndjson', '.jsonl'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+}
+
+PAGE_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+
+
+# ==================== 레코드 순회 ====================
+
+def iter_export_records(backend, user_id=None, page_size=PAGE_SIZE):
+    """내보낼 레코드 제너레이터 - user_id가 없으면 공개 아카이브 (최신 날짜 먼저)"""
+    cursor = None
+    while True:
+        if user_id is None:
+            items, cursor = backend.get_public_performances_page(page_size, cursor)
+        else:
+            items, cursor = backend.get_user_performances_page(user_id, page_size, cursor)
+        yield from items
+        if cursor is None:
+            return
+
+
+def export_row(record):
+    """레코드 -> EXPORT_COLUMNS 순서의 값 목록 (표 형식용)"""
+    row = []
+    for field, _ in EXPORT_COLUMNS:
+        value = record.get(field)
+        if field == 'pieces':
+            value = ' | '.join(value or [])
+        elif field in ('is_public', 'is_guest'):
+            value = '예' if value else '아니오'
+        elif field in ('like_count', 'comment_count'):
+            value = value or 0
+        elif value is None:
+            value = ''
+        row.append(value)
+    return row
+
+
+# ==================== 형식별 바이트 조각 ====================
+
+def iter_csv_chunks(records, chunk_size=CHUNK_SIZE):
+    """CSV (UTF-8 BOM - 엑셀에서 한글이 깨지지 않도록)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+    yield '\ufeff'.encode('utf-8')
+    for record in records:
+        writer.writerow(export_row(record))
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def iter_jsonl_chunks(records, chunk_size=CHUNK_SIZE):
+    """JSONL (한 줄에 레코드 하나)"""
+    lines = []
+    size = 0
+    for record in records:
+        line = json.dumps({field: record.get(field) for field in JSONL_FIELDS}, ensure_ascii=False) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(lines).encode('utf-8')
+            lines.clear()
+            size = 0
+    if lines:
+        yield ''.join(lines).encode('utf-8')
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="연주 내역" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _xlsx_cell(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'<c t="n"><v>{value}</v></c>'
+    text = escape(str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(v) for v in values) + '</row>'
+
+
+class _ChunkSink(io.RawIOBase):
+    """zipfile이 쓰는 바이트를 모아 두었다가 제너레이터가 꺼내 가는 쓰기 전용 스트림"""
+
+    def __init__(self):
+        self.chunks = []
+        self.pending = 0
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.pending += len(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.pending = 0
+        return data
+
+
+def iter_xlsx_chunks(records, chunk_size=CHUNK_SIZE):
+    """XLSX (시트 하나, 인라인 문자열) - zip을 앞으로만 쓰므로 조각 단위로 내보낼 수 있음"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _XLSX_RELS)
+        zf.writestr('xl/workbook.xml', _XLSX_WORKBOOK)
+        zf.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        with zf.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + _xlsx_row([header for _, header in EXPORT_COLUMNS])
+            ).encode('utf-8'))
+            for record in records:
+                sheet.write(_xlsx_row(export_row(record)).encode('utf-8'))
+                if sink.pending >= chunk_size:
+                    yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+
+_CHUNK_WRITERS = {'csv': iter_csv_chunks, 'jsonl': iter_jsonl_chunks, 'xlsx': iter_xlsx_chunks}
+
+
+def iter_export(backend, fmt, user_id=None, page_size=PAGE_SIZE):
+    """내보내기 파일 내용을 바이트 조각으로 (fmt: csv / jsonl / xlsx)"""
+    return _CHUNK_WRITERS[fmt](iter_export_records(backend, user_id, page_size))
+
+
+class ChunkStream(io.RawIOBase):
+    """바이트 조각 제너레이터 -> 읽기 전용 파일 객체 (st.download_button 등에 넘길 때)"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def export_stream(backend, fmt, user_id=None, page_size=PAGE_SIZE):
+    """내보내기 내용을 읽기 전용 파일 객체로"""
+    return ChunkStream(iter_export(backend, fmt, user_id, page_size))
+
+
+def export_to_file(backend, fmt, path, user_id=None, page_size=PAGE_SIZE):
+    """파일로 내보내기 -> 쓴 바이트 수 (임시 파일에 쓴 뒤 이름을 바꿔서 중간 상태가 남지 않음)"""
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    written = 0
+    with open(tmp, 'wb') as f:
+        for chunk in iter_export(backend, fmt, user_id, page_size):
+            f.write(chunk)
+            written += len(chunk)
+    tmp.replace(path)
+    return written
+
+
+def detect_format(filename):
+    """확장자로 형식 판단 (csv / jsonl / xlsx)"""
+    suffix = Path(filename).suffix.lower()
+    for fmt, (_, extension) in EXPORT_FORMATS.items():
+        if suffix == extension:
+            return fmt
+    return 'jsonl' if suffix == '.ndjson' else 'csv'
+
+
+def main(argv=None):
+    from .backends import create_backend
+
+    parser = argparse.ArgumentParser(description="연주 내역을 CSV/JSONL/XLSX 파일로 내보냅니다.")
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument('--user', help="이 사용자의 연주 내역 전체 (비공개 포함)")
+    scope.add_argument('--public', action='store_true', help="공개 아카이브 전체")
+    parser.add_argument('-o', '--output', required=True, help="저장할 파일 (- 이면 표준 출력)")
+    parser.add_argument('--data-dir', default='data', help="데이터 디렉터리 (기본값: data)")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), help="파일 형식 (기본값: 확장자로 판단)")
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help="한 번에 읽을 레코드 수")
+    args = parser.parse_args(argv)
+
+    if not Path(args.data_dir).is_dir():
+        parser.error(f"데이터 디렉터리가 없습니다: {args.data_dir}")
+    backend = create_backend(args.data_dir)
+    if args.user is not None and backend.get_user(args.user) is None:
+        parser.error(f"존재하지 않는 사용자입니다: {args.user}")
+    fmt = args.format or ('csv' if args.output == '-' else detect_format(args.output))
+
+    if args.output == '-':
+        written = 0
+        for chunk in iter_export(backend, fmt, args.user, args.page_size):
+            sys.stdout.buffer.write(chunk)
+            written += len(chunk)
+        sys.stdout.buffer.flush()
+    else:
+        written = export_to_file(backend, fmt, args.output, args.user, args.page_size)
+    print(f"내보냄: {written:,} bytes ({fmt})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
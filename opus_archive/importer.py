@@ -0,0 +1,304 @@
+"""
+연주 내역 일괄 가져오기 (CSV / JSONL)
+
+    python -m opus_archive.importer --data-dir data --user USERNAME history.csv [--dry-run]
+
+파일은 제너레이터로 한 행씩 읽어서 검증하고, batch_size 건마다 백엔드에 한 번에
+추가합니다 (JSON 백엔드라면 배치당 performances.json 한 번 쓰기). 잘못된 행은
+건너뛰고 행 번호와 이유를 모아서 보고합니다.
+
+CSV 머리글은 필드 이름(date, venue, ...) 또는 화면의 한글 이름(날짜, 장소, ...)을
+쓸 수 있고, 곡목은 줄바꿈이나 | 로 구분합니다. JSONL은 한 줄에 객체 하나입니다.
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+from .records import DEFAULT_CATEGORIES, make_performance
+
+# 머리글 이름 -> 필드 (필드 이름 자체도 허용)
+COLUMN_ALIASES = {
+    '날짜': 'date', '연주회 날짜': 'date',
+    '장소': 'venue', '연주 장소': 'venue',
+    '곡목': 'pieces',
+    '악기': 'instrument',
+    '파트': 'sub_part', '세부 파트': 'sub_part',
+    '객원': 'is_guest', '객원 출연': 'is_guest',
+    '페이': 'guest_fee',
+    '지휘자': 'conductor',
+    '단체명': 'ensemble_name', 'ensemble': 'ensemble_name',
+    '공개': 'is_public',
+    '유튜브': 'youtube_url', '유튜브 영상 URL': 'youtube_url',
+    '포스터': 'poster_url', '포스터 이미지 URL': 'poster_url',
+}
+
+# 카테고리 목록으로 검증하는 필드 -> (카테고리 키, 이름)
+CATEGORY_FIELDS = {'venue': ('venues', '장소'), 'instrument': ('instruments', '악기'), 'sub_part': ('sub_parts', '세부 파트')}
+
+REQUIRED_FIELDS = {'date': '날짜', 'conductor': '지휘자', 'ensemble_name': '단체명'}
+
+_TRUE = {'1', 'true', 't', 'y', 'yes', 'o', '예', '네', '공개'}
+_FALSE = {'0', 'false', 'f', 'n', 'no', 'x', '아니오', '아니요', '비공개', ''}
+
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(ValueError):
+    """행 검증 실패"""
+
+
+class ImportReport:
+    """가져오기 결과"""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []            # [(행 번호, 메시지)] - 앞의 MAX_REPORTED_ERRORS개만
+        self.new_categories = {}    # {카테고리 키: [추가된 값, ...]}
+
+    def add_error(self, line_no, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, message))
+
+
+# ==================== 읽기 (제너레이터) ====================
+
+def _normalize_keys(row):
+    result = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip()
+        result[COLUMN_ALIASES.get(key, key)] = value
+    return result
+
+
+def iter_csv_rows(text_stream):
+    """CSV -> (행 번호, dict) - 행 번호는 머리글 다음 줄이 2"""
+    reader = csv.DictReader(text_stream)
+    for row in reader:
+        yield reader.line_num, _normalize_keys(row)
+
+
+def iter_jsonl_rows(text_stream):
+    """JSONL -> (행 번호, dict 또는 RowError)"""
+    for line_no, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, RowError(f"JSON 형식 오류: {e.msg}")
+            continue
+        if not isinstance(row, dict):
+            yield line_no, RowError("한 줄에 JSON 객체 하나가 있어야 합니다")
+            continue
+        yield line_no, _normalize_keys(row)
+
+
+def detect_format(filename):
+    """확장자로 형식 판단 (csv / jsonl)"""
+    suffix = Path(filename).suffix.lower()
+    if suffix in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    return 'csv'
+
+
+def iter_rows(text_stream, fmt):
+    return iter_jsonl_rows(text_stream) if fmt == 'jsonl' else iter_csv_rows(text_stream)
+
+
+# ==================== 검증 ====================
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def _parse_date(value):
+    text = _text(value).replace('.', '-').replace('/', '-')
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        raise RowError(f"날짜 형식이 올바르지 않습니다: {value!r} (YYYY-MM-DD)") from None
+
+
+def _parse_bool(value, label):
+    if isinstance(value, bool):
+        return value
+    text = _text(value).lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise RowError(f"{label} 값은 예/아니오(true/false)여야 합니다: {value!r}")
+
+
+def _parse_pieces(value):
+    if isinstance(value, list):
+        items = [_text(v) for v in value]
+    else:
+        items = _text(value).replace('\r', '').replace('|', '\n').split('\n')
+    return [item.strip() for item in items if item.strip()]
+
+
+def _parse_fee(value):
+    text = _text(value).replace(',', '')
+    if not text:
+        return ''
+    try:
+        fee = int(float(text))
+    except ValueError:
+        raise RowError(f"페이는 숫자여야 합니다: {value!r}") from None
+    if fee < 0:
+        raise RowError(f"페이는 0 이상이어야 합니다: {value!r}")
+    return fee
+
+
+def parse_row(row, categories, add_missing_categories=False, new_categories=None):
+    """행 하나 검증 -> add_performance용 data dict (문제가 있으면 RowError)
+
+    add_missing_categories가 참이면 목록에 없는 장소/악기/파트를 new_categories에 모아
+    허용하고, 아니면 오류로 처리합니다.
+    """
+    missing = [label for field, label in REQUIRED_FIELDS.items() if not _text(row.get(field))]
+    if missing:
+        raise RowError(f"필수 값이 없습니다: {', '.join(missing)}")
+
+    data = {
+        'date': _parse_date(row['date']),
+        'pieces': _parse_pieces(row.get('pieces')),
+        'conductor': _text(row['conductor']),
+        'ensemble_name': _text(row['ensemble_name']),
+        'is_guest': _parse_bool(row.get('is_guest'), '객원 출연'),
+        'guest_fee': _parse_fee(row.get('guest_fee')),
+        'is_public': _parse_bool(row.get('is_public'), '공개'),
+        'youtube_url': _text(row.get('youtube_url')),
+        'poster_url': _text(row.get('poster_url')),
+    }
+    if not data['pieces']:
+        raise RowError("필수 값이 없습니다: 곡목")
+    if not data['is_guest']:
+        data['guest_fee'] = ''
+
+    unknown = []
+    for field, (category, label) in CATEGORY_FIELDS.items():
+        value = _text(row.get(field))
+        if not value:
+            raise RowError(f"필수 값이 없습니다: {label}")
+        if value not in categories.get(category, []):
+            if not add_missing_categories:
+                raise RowError(f"'{value}'은(는) 등록된 {label} 목록에 없습니다 (설정 관리에서 추가)")
+            unknown.append((category, value))
+        data[field] = value
+
+    # 행 전체가 통과한 뒤에만 새 카테고리로 기록
+    if new_categories is not None:
+        for category, value in unknown:
+            if value not in new_categories.setdefault(category, []):
+                new_categories[category].append(value)
+    return data
+
+
+# ==================== 가져오기 ====================
+
+def import_performances(backend, user_id, rows, categories=None, batch_size=500,
+                        add_missing_categories=False, dry_run=False, progress=None):
+    """(행 번호, dict) 스트림을 검증해서 batch_size 건씩 추가 -> ImportReport
+
+    dry_run이면 검증만 하고 저장하지 않습니다. progress(report)는 배치마다 호출됩니다.
+    """
+    if categories is None:
+        categories = backend.load_categories() or DEFAULT_CATEGORIES
+    report = ImportReport()
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        if not dry_run:
+            backend.add_performances(batch)
+        report.imported += len(batch)
+        batch.clear()
+        if progress is not None:
+            progress(report)
+
+    for line_no, row in rows:
+        if isinstance(row, RowError):
+            report.add_error(line_no, str(row))
+            continue
+        try:
+            data = parse_row(row, categories, add_missing_categories, report.new_categories)
+        except RowError as e:
+            report.add_error(line_no, str(e))
+            continue
+        batch.append(make_performance(user_id, data))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    if report.new_categories and not dry_run:
+        # 새 카테고리는 끝에 한 번만 저장 (최신 목록에 합침)
+        def merge(merged):
+            for category, values in report.new_categories.items():
+                merged.setdefault(category, [])
+                merged[category] += [v for v in values if v not in merged[category]]
+        backend.update_categories(merge)
+    return report
+
+
+def import_file(backend, user_id, path_or_stream, fmt=None, **kwargs):
+    """파일 경로 또는 바이너리 스트림에서 가져오기 (UTF-8, BOM 허용)"""
+    if isinstance(path_or_stream, (str, Path)):
+        fmt = fmt or detect_format(path_or_stream)
+        with open(path_or_stream, 'r', encoding='utf-8-sig', newline='') as f:
+            return import_performances(backend, user_id, iter_rows(f, fmt), **kwargs)
+    stream = io.TextIOWrapper(path_or_stream, encoding='utf-8-sig', newline='')
+    try:
+        return import_performances(backend, user_id, iter_rows(stream, fmt or 'csv'), **kwargs)
+    finally:
+        stream.detach()
+
+
+def main(argv=None):
+    from .backends import create_backend
+
+    parser = argparse.ArgumentParser(description="CSV/JSONL 파일에서 연주 내역을 가져옵니다.")
+    parser.add_argument('file', help="가져올 파일 (.csv 또는 .jsonl)")
+    parser.add_argument('--user', required=True, help="연주 내역을 추가할 사용자 이름")
+    parser.add_argument('--data-dir', default='data', help="데이터 디렉터리 (기본값: data)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="파일 형식 (기본값: 확장자로 판단)")
+    parser.add_argument('--batch-size', type=int, default=500, help="한 번에 저장할 행 수")
+    parser.add_argument('--add-categories', action='store_true', help="목록에 없는 장소/악기/파트를 카테고리에 추가")
+    parser.add_argument('--dry-run', action='store_true', help="검증만 하고 저장하지 않음")
+    args = parser.parse_args(argv)
+
+    if not Path(args.data_dir).is_dir():
+        parser.error(f"데이터 디렉터리가 없습니다: {args.data_dir}")
+    backend = create_backend(args.data_dir)
+    if backend.get_user(args.user) is None:
+        parser.error(f"존재하지 않는 사용자입니다: {args.user}")
+
+    report = import_file(
+        backend, args.user, args.file, args.format,
+        batch_size=args.batch_size, add_missing_categories=args.add_categories, dry_run=args.dry_run,
+        progress=lambda r: print(f"... {r.imported}건", file=sys.stderr)
+    )
+    for line_no, message in report.errors:
+        print(f"{line_no}행: {message}")
+    if report.failed > len(report.errors):
+        print(f"... 외 {report.failed - len(report.errors)}건의 오류")
+    for category, values in report.new_categories.items():
+        print(f"새 {category}: {', '.join(values)}")
+    action = "검증 통과" if args.dry_run else "가져옴"
+    print(f"{action}: {report.imported}건, 오류: {report.failed}건")
+    return 1 if report.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
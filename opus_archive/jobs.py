@@ -0,0 +1,223 @@
+"""
+백그라운드 작업 실행기 - 오래 걸리는 데이터 작업을 화면 스레드 밖에서 (진행률/취소/결과 보관)
+
+    from opus_archive.jobs import get_runner
+    runner = get_runner()
+    job_id = runner.submit("연주 내역 삭제", archive.delete_performances, perf_ids, owner=user_id)
+    runner.get(job_id).snapshot()      # {'status': 'running', 'done': 200, 'total': 1000, ...}
+    runner.cancel(job_id)
+
+Streamlit 스크립트 스레드에서 연쇄 삭제나 카테고리 일괄 변경을 바로 실행하면 끝날 때까지
+페이지가 멈춥니다. 실행기는 프로세스에 하나(get_runner)이고, 세션은 작업 ID만
+st.session_state에 들고 있다가 리런(또는 fragment)마다 상태를 읽어 보여 줍니다.
+
+- 스레드 작업 (기본): fn(*args, progress=콜백, **kwargs)로 부릅니다. 작업 함수는 조각마다
+  progress(끝낸 수, 전체 수)를 부르고, 취소를 요청받았으면 그 호출이 JobCancelled를
+  던져서 다음 조각 전에 멈춥니다 (이미 저장한 조각은 그대로).
+- 프로세스 작업 (cpu=True): 파이썬 코드로 CPU를 오래 쓰는 작업용으로 별도 프로세스
+  풀에서 fn(*args, **kwargs)를 부릅니다. fn과 인자는 피클할 수 있어야 하고, 진행률은
+  끝날 때만 알 수 있으며 취소는 시작 전에만 됩니다.
+- 끝난 작업(결과/오류 포함)은 KEEP_FINISHED개, KEEP_SECONDS초까지 보관합니다.
+"""
+
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .records import new_id
+
+JOB_WORKERS = 2                # 스레드 작업 동시 실행 수
+PROCESS_WORKERS = 2            # 프로세스 작업 동시 실행 수 (처음 쓸 때 풀을 만듦)
+KEEP_FINISHED = 200            # 보관할 끝난 작업 수
+KEEP_SECONDS = 3600            # 끝난 작업 보관 시간 (초)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED = frozenset({DONE, FAILED, CANCELLED})
+
+_lock = threading.Lock()
+_runner = None
+
+
+class JobCancelled(Exception):
+    """취소 요청을 받은 작업이 progress 호출에서 멈출 때"""
+
+
+class Job:
+    """작업 하나의 상태 (작업 스레드가 갱신하고 화면은 snapshot으로 읽음)"""
+
+    def __init__(self, name, owner=None):
+        self.id = new_id('job')
+        self.name = name
+        self.owner = owner
+        self.status = QUEUED
+        self.done = 0
+        self.total = None
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def report(self, done, total=None, message=None):
+        """진행률 갱신 (작업 함수의 progress 콜백) - 취소를 요청받았으면 JobCancelled"""
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        if self._cancel.is_set():
+            raise JobCancelled
+
+    def fraction(self):
+        """진행률 0.0~1.0 (전체 수를 모르면 None)"""
+        if self.status == DONE:
+            return 1.0
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    def snapshot(self):
+        """화면 표시용 사본 (result는 그대로 - 읽기 전용으로 다룸)"""
+        return {'id': self.id, 'name': self.name, 'owner': self.owner, 'status': self.status,
+                'done': self.done, 'total': self.total, 'fraction': self.fraction(), 'message': self.message,
+                'result': self.result, 'error': self.error, 'cancel_requested': self.cancel_requested,
+                'created_at': self.created_at, 'started_at': self.started_at, 'finished_at': self.finished_at}
+
+
+class JobRunner:
+    """스레드 풀(+ 선택적으로 프로세스 풀) 위의 작업 목록"""
+
+    def __init__(self, workers=JOB_WORKERS, process_workers=PROCESS_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='opus-job')
+        self._process_workers = process_workers
+        self._process_executor = None
+        self._lock = threading.Lock()
+        self._jobs = {}            # 작업 ID -> Job (제출 순서)
+
+    # ---------- 제출 ----------
+
+    def submit(self, name, fn, *args, owner=None, cpu=False, **kwargs):
+        """작업 제출 -> 작업 ID (owner는 jobs(owner)로 세션/사용자별로 고를 때)"""
+        job = Job(name, owner)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        if cpu:
+            future = self._processes().submit(fn, *args, **kwargs)
+            job._future = future
+            job.started_at = time.time()
+            job.status = RUNNING
+            future.add_done_callback(lambda f: self._finish_process_job(job, f))
+        else:
+            job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _processes(self):
+        with self._lock:
+            if self._process_executor is None:
+                self._process_executor = ProcessPoolExecutor(max_workers=self._process_workers)
+            return self._process_executor
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancel_requested:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, progress=job.report, **kwargs)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.message = traceback.format_exc(limit=5)
+            job.status = FAILED
+        job.finished_at = time.time()
+
+    def _finish_process_job(self, job, future):
+        if future.cancelled():
+            job.status = CANCELLED
+        elif future.exception() is not None:
+            e = future.exception()
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        else:
+            job.result = future.result()
+            job.status = DONE
+        job.finished_at = time.time()
+
+    # ---------- 조회/취소 ----------
+
+    def get(self, job_id):
+        """작업 (없거나 보관 기간이 지났으면 None)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        """작업 목록 (제출 순서, owner를 주면 그 작업만)"""
+        with self._lock:
+            return [job for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def cancel(self, job_id):
+        """취소 요청 -> 요청했는지 (이미 끝난 작업은 False)
+
+        대기 중인 작업은 바로 취소되고, 실행 중인 작업은 다음 progress 호출에서 멈춥니다.
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        return True
+
+    def forget(self, job_id):
+        """끝난 작업을 목록에서 지움 -> 지웠는지"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finished:
+                return False
+            del self._jobs[job_id]
+            return True
+
+    def _prune(self):
+        """오래된 끝난 작업 정리 (_lock 안에서)"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        excess = len(finished) - KEEP_FINISHED
+        for i, job in enumerate(finished):
+            if i < excess or now - job.finished_at > KEEP_SECONDS:
+                del self._jobs[job.id]
+
+    def shutdown(self, wait=True):
+        """남은 작업을 취소하고 풀 종료 (실행 중인 작업은 다음 progress에서 멈춤)"""
+        for job in self.jobs():
+            if not job.finished:
+                self.cancel(job.id)
+        self._executor.shutdown(wait=wait)
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=wait)
+
+
+def get_runner():
+    """프로세스 공용 작업 실행기 (처음 부를 때 만듦)"""
+    global _runner
+    with _lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,73 @@
+"""
+프로세스 간 파일 잠금 (Linux/macOS: fcntl.flock, Windows: msvcrt.locking)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+class _KeyLock:
+    """잠금 파일 하나에 대한 프로세스 내부 잠금 (depth: 재진입 횟수)"""
+
+    __slots__ = ('lock', 'depth')
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.depth = 0
+
+
+def _thread_lock(key):
+    """같은 프로세스 안의 스레드끼리는 먼저 이 잠금으로 줄을 세움"""
+    with _thread_locks_guard:
+        if key not in _thread_locks:
+            _thread_locks[key] = _KeyLock()
+        return _thread_locks[key]
+
+
+@contextmanager
+def file_lock(lock_path):
+    """lock_path 파일로 배타 잠금 (같은 프로세스 안에서는 재진입 가능)"""
+    key = os.path.abspath(os.fspath(lock_path))
+    tlock = _thread_lock(key)
+    with tlock.lock:
+        # 재진입: 이 스레드가 이미 파일 잠금을 잡고 있으면 그대로 진행
+        if tlock.depth:
+            tlock.depth += 1
+            try:
+                yield
+            finally:
+                tlock.depth -= 1
+            return
+
+        with open(key, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.01)
+            tlock.depth = 1
+            try:
+                yield
+            finally:
+                tlock.depth = 0
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,397 @@
+"""
+핫패스 계측 (선택) - JSON 입출력과 데이터 함수의 호출 수, 읽고 쓴 바이트, 지연 시간 분포
+
+    OPUS_METRICS=1 streamlit run app.py                        # 사이드바 디버그 패널
+    OPUS_METRICS=1 OPUS_METRICS_DIR=metrics streamlit run app.py   # + 파일로 내보내기
+    python -m opus_archive.metrics metrics/*.jsonl             # 여러 서버의 p50/p99
+
+OPUS_METRICS가 꺼져 있으면 timed는 함수를 그대로 돌려주므로 비용이 없습니다
+(프로세스 시작 때 정해짐).
+
+계측 구간은 끝날 때마다 (함수, 페이지)별 누적 통계에 더해지고, begin_rerun ~
+end_rerun 사이에 같은 스레드에서 실행된 것은 그 리런의 기록(페이지는 시작할 때의
+페이지)에도 모입니다. 리런 밖(콜백, fragment, 백그라운드 스레드)의 호출은
+page_provider가 알려 주는 페이지로 셉니다.
+
+바이트는 그 시점에 열려 있는 모든 구간에 더해집니다 (지연 시간처럼 포함 기준).
+리런의 '기타' 시간은 전체에서 가장 바깥 구간들을 뺀 값이라 위젯 렌더링 등 데이터
+계층 밖의 시간입니다.
+
+OPUS_METRICS_DIR를 주면
+- reruns-<호스트>-<pid>.jsonl : 리런마다 한 줄 (페이지, 전체/기타 시간, 함수별 호출)
+- metrics-<호스트>-<pid>.prom : Prometheus 텍스트 형식 누적 통계 (EXPORT_INTERVAL초마다 갱신)
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+ENABLED_ENV = "OPUS_METRICS"
+EXPORT_DIR_ENV = "OPUS_METRICS_DIR"
+EXPORT_INTERVAL = 10.0
+
+# 지연 시간 히스토그램 경계 (ms)
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+
+OUTSIDE_PAGE = '-'
+
+_enabled = os.environ.get(ENABLED_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+_lock = threading.Lock()
+_series = {}                 # (함수, 페이지) -> _Series
+_local = threading.local()   # run: 진행 중인 리런, stack: 열린 구간
+_page_provider = None
+_last_export = 0.0
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(flag):
+    """계측 켜기/끄기 (이미 timed로 감싼 함수에만 영향 - 보통 시작 때 환경 변수로)"""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def set_page_provider(provider):
+    """리런 밖 호출의 페이지를 알려 줄 함수 (예: session_state.current_page)"""
+    global _page_provider
+    _page_provider = provider
+
+
+# ==================== 누적 통계 ====================
+
+class Histogram:
+    """고정 경계 히스토그램 (ms)"""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, ms):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+        self.total += ms
+        self.count += 1
+
+    def quantile(self, q):
+        """구간 안에서 선형 보간한 분위수 추정 (Prometheus histogram_quantile과 같은 방식)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            if n and seen + n >= rank:
+                if math.isinf(bound):
+                    return lower
+                return lower + (bound - lower) * (rank - seen) / n
+            seen += n
+            if not math.isinf(bound):
+                lower = bound
+        return lower
+
+
+class _Series:
+    """(함수, 페이지) 하나의 누적 통계"""
+
+    __slots__ = ('calls', 'bytes_read', 'bytes_written', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.latency = Histogram()
+
+
+def _fold(name, page, ms, bytes_read, bytes_written):
+    with _lock:
+        series = _series.get((name, page))
+        if series is None:
+            series = _series[(name, page)] = _Series()
+        series.calls += 1
+        series.bytes_read += bytes_read
+        series.bytes_written += bytes_written
+        series.latency.observe(ms)
+
+
+def snapshot():
+    """누적 통계 [{name, page, calls, bytes_read, bytes_written, p50_ms, p99_ms, total_ms}]"""
+    with _lock:
+        items = list(_series.items())
+    return [{
+        'name': name, 'page': page, 'calls': s.calls,
+        'bytes_read': s.bytes_read, 'bytes_written': s.bytes_written,
+        'p50_ms': s.latency.quantile(0.5), 'p99_ms': s.latency.quantile(0.99), 'total_ms': s.latency.total,
+    } for (name, page), s in sorted(items)]
+
+
+def reset():
+    with _lock:
+        _series.clear()
+
+
+# ==================== 리런과 구간 ====================
+
+class Rerun:
+    """리런 하나의 기록"""
+
+    def __init__(self, page):
+        self.page = page or OUTSIDE_PAGE
+        self.started = time.perf_counter()
+        self.last_event = self.started
+        self.calls = {}          # 함수 -> [호출 수, 시간 ms, 읽은 바이트, 쓴 바이트]
+        self.top_level_ms = 0.0
+        self.total_ms = None
+        self.interrupted = False
+        self.finished = False
+
+    def to_dict(self):
+        return {
+            'page': self.page,
+            'total_ms': round(self.total_ms, 3) if self.total_ms is not None else None,
+            'other_ms': round(self.other_ms, 3) if self.total_ms is not None else None,
+            'interrupted': self.interrupted,
+            'calls': {name: {'calls': c, 'ms': round(ms, 3), 'bytes_read': r, 'bytes_written': w}
+                      for name, (c, ms, r, w) in self.calls.items()},
+        }
+
+    @property
+    def other_ms(self):
+        """데이터 계층 밖에서 쓴 시간 (위젯 렌더링 등)"""
+        return max(0.0, (self.total_ms or 0.0) - self.top_level_ms)
+
+
+class _Span:
+    __slots__ = ('bytes_read', 'bytes_written')
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def begin_rerun(page):
+    """현재 스레드에서 리런 기록 시작 -> Rerun (계측이 꺼져 있으면 None)"""
+    if not _enabled:
+        return None
+    run = Rerun(page)
+    _local.run = run
+    _local.stack = []
+    return run
+
+
+def end_rerun(run, interrupted=False):
+    """리런 기록을 끝내고 누적 통계에 합침 (interrupted면 마지막 계측 시각을 끝으로 봄)
+
+    st.rerun()/st.stop()으로 중간에 끝난 리런은 다음 리런이 시작할 때 interrupted로 닫습니다.
+    """
+    if run is None or run.finished:
+        return run
+    end = run.last_event if interrupted else time.perf_counter()
+    run.total_ms = (end - run.started) * 1000
+    run.interrupted = interrupted
+    run.finished = True
+    if getattr(_local, 'run', None) is run:
+        _local.run = None
+
+    _fold('rerun', run.page, run.total_ms, 0, 0)
+    _fold('rerun_other', run.page, run.other_ms, 0, 0)
+    _export(run)
+    return run
+
+
+def _current_page():
+    if _page_provider is None:
+        return OUTSIDE_PAGE
+    try:
+        return _page_provider() or OUTSIDE_PAGE
+    except Exception:
+        return OUTSIDE_PAGE
+
+
+def _observe(name, ms, span, top_level):
+    run = getattr(_local, 'run', None)
+    if run is None:
+        _fold(name, _current_page(), ms, span.bytes_read, span.bytes_written)
+        return
+    _fold(name, run.page, ms, span.bytes_read, span.bytes_written)
+    entry = run.calls.get(name)
+    if entry is None:
+        entry = run.calls[name] = [0, 0.0, 0, 0]
+    entry[0] += 1
+    entry[1] += ms
+    entry[2] += span.bytes_read
+    entry[3] += span.bytes_written
+    if top_level:
+        run.top_level_ms += ms
+    run.last_event = time.perf_counter()
+
+
+def add_bytes(read=0, written=0):
+    """열려 있는 모든 구간에 읽고 쓴 바이트 추가"""
+    if not _enabled:
+        return
+    for span in _stack():
+        span.bytes_read += read
+        span.bytes_written += written
+
+
+def timed(name=None):
+    """데이터 함수 계측 데코레이터 (계측이 꺼져 있으면 함수를 그대로 돌려줌)"""
+    def decorator(fn):
+        if not _enabled:
+            return fn
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = _stack()
+            span = _Span()
+            stack.append(span)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - start) * 1000
+                stack.pop()
+                _observe(label, ms, span, top_level=not stack)
+        return wrapper
+    return decorator
+
+
+# ==================== 내보내기 ====================
+
+def _export_dir():
+    path = os.environ.get(EXPORT_DIR_ENV)
+    return Path(path) if path else None
+
+
+def _file_suffix():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _prom_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    """누적 통계를 Prometheus 텍스트 형식으로 (지연 시간은 초 단위 histogram)"""
+    with _lock:
+        items = sorted(_series.items())
+        items = [(key, s.calls, s.bytes_read, s.bytes_written, list(s.latency.counts), s.latency.total, s.latency.count)
+                 for key, s in items]
+    lines = [
+        '# HELP opus_calls_total 호출 수', '# TYPE opus_calls_total counter',
+    ]
+    lines += [f'opus_calls_total{{fn="{_prom_label(n)}",page="{_prom_label(p)}"}} {calls}'
+              for (n, p), calls, *_ in items]
+    lines += ['# HELP opus_bytes_read_total JSON 파일에서 읽은 바이트', '# TYPE opus_bytes_read_total counter']
+    lines += [f'opus_bytes_read_total{{fn="{_prom_label(n)}",page="{_prom_label(p)}"}} {read}'
+              for (n, p), _, read, *_ in items]
+    lines += ['# HELP opus_bytes_written_total JSON 파일에 쓴 바이트', '# TYPE opus_bytes_written_total counter']
+    lines += [f'opus_bytes_written_total{{fn="{_prom_label(n)}",page="{_prom_label(p)}"}} {written}'
+              for (n, p), _, _, written, *_ in items]
+    lines += ['# HELP opus_duration_seconds 지연 시간', '# TYPE opus_duration_seconds histogram']
+    for (n, p), _, _, _, counts, total, count in items:
+        labels = f'fn="{_prom_label(n)}",page="{_prom_label(p)}"'
+        cumulative = 0
+        for bound, c in zip(BUCKETS_MS, counts):
+            cumulative += c
+            le = '+Inf' if math.isinf(bound) else repr(bound / 1000)
+            lines.append(f'opus_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f'opus_duration_seconds_sum{{{labels}}} {total / 1000}')
+        lines.append(f'opus_duration_seconds_count{{{labels}}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    """Prometheus 텍스트 파일 쓰기 (임시 파일 + os.replace - node_exporter textfile 수집기용)"""
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(prometheus_text(), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def _export(run):
+    global _last_export
+    export_dir = _export_dir()
+    if export_dir is None:
+        return
+    try:
+        export_dir.mkdir(parents=True, exist_ok=True)
+        line = {'ts': time.time(), 'host': socket.gethostname(), 'pid': os.getpid(), **run.to_dict()}
+        with open(export_dir / f"reruns-{_file_suffix()}.jsonl", 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        now = time.monotonic()
+        if now - _last_export >= EXPORT_INTERVAL:
+            _last_export = now
+            write_prometheus(export_dir / f"metrics-{_file_suffix()}.prom")
+    except OSError:
+        # 계측 때문에 화면이 실패하지 않도록 내보내기 오류는 무시
+        pass
+
+
+# ==================== JSONL 요약 (CLI) ====================
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(paths):
+    """reruns JSONL 여러 개 -> {(함수, 페이지): 리런당 ms 목록} ('rerun', 'rerun_other' 포함)"""
+    samples = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                run = json.loads(line)
+                page = run['page']
+                if run.get('total_ms') is not None:
+                    samples.setdefault(('rerun', page), []).append(run['total_ms'])
+                    samples.setdefault(('rerun_other', page), []).append(run['other_ms'])
+                for name, call in run['calls'].items():
+                    samples.setdefault((name, page), []).append(call['ms'])
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="reruns-*.jsonl을 모아 함수/페이지별 p50/p99를 출력합니다.")
+    parser.add_argument('files', nargs='+', help="OPUS_METRICS_DIR의 reruns-*.jsonl 파일")
+    parser.add_argument('--page', help="이 페이지만")
+    args = parser.parse_args(argv)
+
+    samples = summarize(args.files)
+    print(f"{'페이지':<14}{'함수':<32}{'리런 수':>8}{'p50(ms)':>11}{'p99(ms)':>11}")
+    for (name, page), values in sorted(samples.items(), key=lambda x: (x[0][1], x[0][0])):
+        if args.page and page != args.page:
+            continue
+        print(f"{page:<14}{name:<32}{len(values):>8}{_percentile(values, 0.5):>11.2f}{_percentile(values, 0.99):>11.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+JSON -> SQLite 마이그레이션 (한 번 실행, 중단 후 재실행하면 이어서 진행)
+
+    python -m opus_archive.migrate --data-dir data [--db data/archive.db]
+
+JSON 파일은 iter_json_items로 한 항목씩 읽고, batch_size 단위로 한 트랜잭션에
+넣으면서 진행 위치를 meta 테이블에 같이 기록합니다. 중간에 끊겨도 마지막으로
+커밋된 배치 다음부터 다시 시작하고, 같은 키는 덮어쓰므로 중복되지 않습니다.
+연주 내역이 사용자별 샤드(reshard)라면 샤드 파일을 사용자 순서대로 읽습니다.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from .backends import SqliteBackend, default_sqlite_path
+from .backends.performance_layout import ShardedLayout, is_sharded
+from .backends.sqlite_backend import PERFORMANCE_COLUMNS, performance_to_row
+from .store import iter_json_items, load_json
+
+_PERF_INSERT = (
+    f"INSERT OR REPLACE INTO performances ({', '.join(PERFORMANCE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in PERFORMANCE_COLUMNS)})"
+)
+
+# (컬렉션 이름, JSON 파일, INSERT 문, (key, value) -> 행)
+COLLECTIONS = [
+    ('users', 'users.json',
+     "INSERT OR REPLACE INTO users (username, email, password, created_at) VALUES (?, ?, ?, ?)",
+     lambda k, v: (k, v['email'], v['password'], v.get('created_at'))),
+    ('performances', 'performances.json', _PERF_INSERT,
+     lambda k, v: performance_to_row({**v, 'id': v.get('id', k)})),
+    ('comments', 'comments.json',
+     "INSERT OR REPLACE INTO comments (id, performance_id, user_id, content, created_at) VALUES (?, ?, ?, ?, ?)",
+     lambda k, v: (v.get('id', k), v['performance_id'], v['user_id'], v['content'], v.get('created_at'))),
+    ('likes', 'likes.json',
+     "INSERT OR REPLACE INTO likes (performance_id, user_id, created_at) VALUES (?, ?, ?)",
+     lambda k, v: (v['performance_id'], v['user_id'], v.get('created_at'))),
+]
+
+
+def _get_progress(conn, name):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"migrate:{name}",)).fetchone()
+    return row[0] if row else None
+
+
+def _set_progress(conn, name, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"migrate:{name}", str(value)))
+
+
+def _sharded_items(data_dir):
+    """사용자별 샤드 레이아웃의 (공연 ID, 레코드) - 사용자 순서가 고정이라 이어서 진행 가능"""
+    layout = ShardedLayout(data_dir)
+    for user_id in layout.user_ids():
+        yield from iter_json_items(layout.shard_file(user_id))
+
+
+def migrate_collection(conn, name, json_path, sql, to_row, batch_size=1000, log=print, items=None):
+    """JSON 파일 하나를 배치 단위로 옮기기 (옮긴 항목 수 반환)
+
+    items를 주면 json_path 대신 그 (key, value) 순회를 옮깁니다.
+    """
+    progress = _get_progress(conn, name)
+    if progress == 'done':
+        log(f"[{name}] 이미 완료됨 - 건너뜀")
+        return 0
+    if items is None and not json_path.exists():
+        with conn:
+            _set_progress(conn, name, 'done')
+        log(f"[{name}] {json_path.name} 없음 - 건너뜀")
+        return 0
+
+    skip = int(progress or 0)
+    if skip:
+        log(f"[{name}] {skip}건 이후부터 이어서 진행")
+
+    done = skip
+    batch = []
+    for i, (key, value) in enumerate(iter_json_items(json_path) if items is None else items):
+        if i < skip:
+            continue
+        batch.append(to_row(key, value))
+        if len(batch) >= batch_size:
+            done += len(batch)
+            with conn:
+                conn.executemany(sql, batch)
+                _set_progress(conn, name, done)
+            batch = []
+            log(f"[{name}] {done}건")
+    with conn:
+        if batch:
+            conn.executemany(sql, batch)
+            done += len(batch)
+        _set_progress(conn, name, 'done')
+    log(f"[{name}] 완료: {done}건")
+    return done - skip
+
+
+def migrate(data_dir, db_path, batch_size=1000, restart=False, log=print):
+    """DATA_DIR의 JSON 파일 전체를 SQLite로 옮기기"""
+    data_dir = Path(data_dir)
+    backend = SqliteBackend(db_path)
+    conn = backend.conn
+
+    if restart:
+        with conn:
+            conn.execute("DELETE FROM meta WHERE key LIKE 'migrate:%'")
+
+    total = 0
+    for name, filename, sql, to_row in COLLECTIONS:
+        items = _sharded_items(data_dir) if name == 'performances' and is_sharded(data_dir) else None
+        moved = migrate_collection(conn, name, data_dir / filename, sql, to_row, batch_size, log, items)
+        if name == 'performances' and moved:
+            backend.rebuild_search_index()
+            log("[performances] 검색 색인 생성 완료")
+        total += moved
+    if total:
+        fixed = backend.recount()
+        log(f"[performances] 좋아요/댓글 수 다시 계산: {fixed}건")
+
+    # 카테고리는 작은 단일 객체이므로 한 번에 옮김
+    categories_file = data_dir / "categories.json"
+    if _get_progress(conn, 'categories') != 'done':
+        if categories_file.exists():
+            backend.save_categories(load_json(categories_file))
+        with conn:
+            _set_progress(conn, 'categories', 'done')
+        log("[categories] 완료")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON 데이터 파일을 SQLite 데이터베이스로 옮깁니다.")
+    parser.add_argument('--data-dir', default='data', help="JSON 파일이 있는 디렉터리 (기본값: data)")
+    parser.add_argument('--db', help="SQLite 파일 경로 (기본값: OPUS_SQLITE_PATH 또는 DATA_DIR/archive.db)")
+    parser.add_argument('--batch-size', type=int, default=1000, help="트랜잭션당 항목 수")
+    parser.add_argument('--restart', action='store_true', help="진행 기록을 지우고 처음부터 다시 옮김")
+    args = parser.parse_args(argv)
+
+    db_path = Path(args.db) if args.db else default_sqlite_path(args.data_dir)
+    total = migrate(args.data_dir, db_path, args.batch_size, args.restart)
+    print(f"마이그레이션 완료: {total}건 -> {db_path}")
+    print("SQLite 백엔드로 실행: OPUS_STORAGE_BACKEND=sqlite streamlit run app.py")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
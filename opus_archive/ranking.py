@@ -0,0 +1,178 @@
+"""
+공개 아카이브 인기순/급상승순 순위 - 점수순으로 정렬해 둔 목록을 좋아요/댓글마다 갱신
+
+- 인기순 (POPULAR)   : 좋아요 수
+- 급상승순 (TRENDING) : 최근 좋아요/댓글에 시간 감쇠를 준 합
+                        Σ 가중치 × 2^-(지난 시간 / HALF_LIFE)
+
+같은 점수면 최신 공연이 먼저입니다. 순위마다 (점수, 날짜, ID) 오름차순 목록을 들고
+있어서 점수가 바뀐 공연 하나만 bisect로 빼고 다시 넣고, 상위 K건은 목록 끝에서 잘라
+O(K)로 돌려줍니다.
+
+급상승 점수는 지금 시각으로 줄이는 대신 기준 시각(epoch)에서 늘어나는 가중치
+2^((발생 시각 - epoch) / HALF_LIFE)로 더합니다. 모든 공연의 점수가 같은 비율로
+감쇠하므로 순서는 그대로이고, 그래서 시간이 지나도 전체 점수를 다시 계산할 필요가
+없습니다 (주기적 감쇠 대신). 가중치가 너무 커지기 전에, 그리고 REBUILD_INTERVAL마다
+service가 새 기준 시각으로 다시 만듭니다 (이때 TRENDING_WINDOW보다 오래된 것은 뺌).
+
+좋아요 수는 쓰기 뒤에 저장된 레코드에서 다시 읽어 넣고(put), 급상승 점수만 좋아요/
+댓글 한 건씩 더하고 뺍니다. 좋아요 취소/댓글 삭제는 그 좋아요의 시각을 모르므로 그
+공연의 급상승 점수에서 평균 한 건만큼 뺍니다 (다음 재구성 때 정확해짐).
+"""
+
+import bisect
+import time
+from datetime import datetime
+
+POPULAR, TRENDING = 'popular', 'trending'
+ORDERS = (POPULAR, TRENDING)
+TOP_K = 50                       # 미리 정렬해 두고 바로 돌려주는 최대 건수
+
+HALF_LIFE = 3 * 86400            # 급상승 점수 반감기 (초)
+TRENDING_WINDOW = 30 * 86400     # 재구성 때 급상승 점수에 넣는 기간 (초) - 10번 반감 ≈ 0.1%
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0             # 댓글은 좋아요보다 무겁게
+REBUILD_INTERVAL = 600           # 초 - 이보다 오래된 순위는 다시 만듦 (다른 프로세스 쓰기 누락 보정)
+MAX_EXPONENT = 500               # 가중치 지수가 이보다 커지면 다시 만듦 (float 범위)
+
+
+def _timestamp(created_at):
+    """ISO 시각 문자열 -> 유닉스 시각 (읽을 수 없으면 None)"""
+    try:
+        return datetime.fromisoformat(created_at).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class _SortedScores:
+    """(점수, 날짜, ID) 오름차순 목록 - 공연 하나의 점수 갱신은 bisect로 빼고 넣기"""
+
+    def __init__(self, keys):
+        self._keys = sorted(keys)
+        self._key_of = {key[2]: key for key in self._keys}
+
+    def set(self, perf_id, score, date):
+        self.discard(perf_id)
+        key = (score, date, perf_id)
+        bisect.insort(self._keys, key)
+        self._key_of[perf_id] = key
+
+    def discard(self, perf_id):
+        key = self._key_of.pop(perf_id, None)
+        if key is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+
+    def top(self, k):
+        return [key[2] for key in reversed(self._keys[-k:])] if k > 0 else []
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class _Entry:
+    """공개 공연 하나의 순위 재료"""
+
+    __slots__ = ('date', 'likes', 'heat', 'recent')
+
+    def __init__(self, date, likes):
+        self.date = date
+        self.likes = likes        # 좋아요 수 (인기순 점수)
+        self.heat = 0.0           # 급상승 점수 (epoch 기준 가중치 합)
+        self.recent = 0           # heat에 들어간 좋아요/댓글 수 (취소 시 평균을 빼려고)
+
+
+class Rankings:
+    """공개 연주 내역의 인기순/급상승순 순위 (service.Archive가 프로세스에 하나 들고 갱신)
+
+    version은 만들 때(또는 마지막으로 직접 갱신했을 때)의 backend.data_version()입니다.
+    """
+
+    def __init__(self, performances, engagements=(), version=None, now=None):
+        """performances: 공개 연주 내역 (id, date, like_count), engagements: ('like'|'comment', 공연 ID, created_at)"""
+        self.version = version
+        self.epoch = time.time() if now is None else now
+        self.built_at = time.monotonic()
+        self.needs_rebuild = False
+        self._entries = {perf['id']: _Entry(perf['date'], perf.get('like_count', 0)) for perf in performances}
+        for kind, perf_id, created_at in engagements:
+            entry = self._entries.get(perf_id)
+            t = _timestamp(created_at) if entry is not None else None
+            if t is not None:
+                entry.heat += self._weight(kind, t)
+                entry.recent += 1
+        self._orders = {
+            POPULAR: _SortedScores((e.likes, e.date, perf_id) for perf_id, e in self._entries.items()),
+            TRENDING: _SortedScores((e.heat, e.date, perf_id) for perf_id, e in self._entries.items()),
+        }
+
+    @classmethod
+    def build(cls, backend, version=None, now=None):
+        """백엔드의 공개 연주 내역과 TRENDING_WINDOW 안의 좋아요/댓글로 만듦"""
+        now = time.time() if now is None else now
+        since = datetime.fromtimestamp(now - TRENDING_WINDOW).isoformat()
+        return cls(backend.get_public_performances(), backend.iter_engagements(since), version, now)
+
+    def _weight(self, kind, t):
+        exponent = (t - self.epoch) / HALF_LIFE
+        if exponent > MAX_EXPONENT:
+            self.needs_rebuild = True
+            exponent = MAX_EXPONENT
+        return (COMMENT_WEIGHT if kind == 'comment' else LIKE_WEIGHT) * 2.0 ** exponent
+
+    def expired(self):
+        """다시 만들 때가 됐는지 (REBUILD_INTERVAL이 지났거나 가중치가 너무 커짐)"""
+        return self.needs_rebuild or time.monotonic() - self.built_at > REBUILD_INTERVAL
+
+    # ---------- 조회 ----------
+
+    def top(self, order, k=TOP_K):
+        """상위 k건의 공연 ID (점수 높은 순)"""
+        return self._orders[order].top(k)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ---------- 갱신 ----------
+
+    def _update(self, perf_id, entry):
+        self._orders[POPULAR].set(perf_id, entry.likes, entry.date)
+        self._orders[TRENDING].set(perf_id, entry.heat, entry.date)
+
+    def engage(self, kind, perf_id, delta, now=None):
+        """좋아요(kind='like')/댓글('comment') delta(+1/-1)건을 급상승 점수에 반영 (공개가 아닌 공연은 무시)
+
+        좋아요 수(인기순)는 건드리지 않습니다 - 동시에 토글하면 ±1이 쌓이며 어긋나므로
+        service가 쓰기 뒤에 저장된 레코드를 다시 읽어 put으로 넣습니다.
+        """
+        entry = self._entries.get(perf_id)
+        if entry is None:
+            return
+        if delta > 0:
+            entry.heat += self._weight(kind, time.time() if now is None else now)
+            entry.recent += 1
+        elif entry.recent:
+            # 취소한 것의 시각을 모르므로 평균 한 건만큼
+            entry.heat -= entry.heat / entry.recent
+            entry.recent -= 1
+        self._update(perf_id, entry)
+
+    def put(self, perf):
+        """연주 내역 추가/수정 반영 - 공개면 순위에 넣거나 날짜/좋아요 수를 고치고, 비공개면 뺌"""
+        perf_id = perf['id']
+        if not perf.get('is_public'):
+            self.remove([perf_id])
+            return
+        entry = self._entries.get(perf_id)
+        if entry is None:
+            entry = self._entries[perf_id] = _Entry(perf['date'], perf.get('like_count', 0))
+        else:
+            entry.date = perf['date']
+            entry.likes = perf.get('like_count', entry.likes)
+        self._update(perf_id, entry)
+
+    def remove(self, perf_ids):
+        """연주 내역 삭제(또는 비공개 전환) 반영"""
+        for perf_id in perf_ids:
+            if self._entries.pop(perf_id, None) is not None:
+                for scores in self._orders.values():
+                    scores.discard(perf_id)
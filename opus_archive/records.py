@@ -0,0 +1,222 @@
+"""
+레코드 생성 규칙 - 화면(app.py)과 가져오기(importer)가 같은 모양의 레코드를 만들도록
+
+캐시에 올라가는 연주 내역/댓글/좋아요는 dict 대신 __slots__ 레코드(Performance,
+Comment, Like)로 둡니다. 키마다 dict 항목을 두지 않아 레코드 하나가 훨씬 작고, 공연장/
+악기/파트처럼 같은 값이 수없이 반복되는 문자열은 sys.intern으로 한 객체를 공유합니다.
+읽기 전용 Mapping이라 record['venue'], record.get(...), {**record, ...}, dict(record)는
+dict와 똑같이 동작합니다. 수정은 지금처럼 새 dict로 교체하면 저장될 때 다시 레코드가
+됩니다 (store.register_records 참고).
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime
+
+# 기본 드롭다운 카테고리 (저장된 카테고리가 없을 때)
+DEFAULT_CATEGORIES = {
+    'venues': ['예술의전당 콘서트홀', '세종문화회관', 'LG아트센터', '강남심포니 홀'],
+    'instruments': ['바이올린', '비올라', '첼로', '콘트라베이스', '플루트', '클라리넷', '오보에'],
+    'sub_parts': ['1st Violin', '2nd Violin', 'Viola', 'Cello', 'Bass', 'Solo']
+}
+
+_id_lock = threading.Lock()
+_id_counter = itertools.count()
+
+
+def new_id(prefix):
+    """겹치지 않는 ID - 나노초 시각 + 프로세스 ID + 순번
+
+    같은 시각(타임스탬프 해상도 안)에 여러 건을 만들어도, 여러 프로세스가 동시에
+    만들어도 겹치지 않습니다. 앞부분이 시각이라 문자열 순서가 대략 생성 순서입니다.
+    """
+    with _id_lock:
+        seq = next(_id_counter)
+    return f"{prefix}_{time.time_ns()}_{os.getpid()}_{seq}"
+
+
+def make_performance(user_id, data):
+    """입력값 dict -> 연주 내역 레코드"""
+    return {
+        'id': new_id('perf'),
+        'user_id': user_id,
+        'date': data['date'],
+        'venue': data['venue'],
+        'pieces': data['pieces'],
+        'instrument': data['instrument'],
+        'sub_part': data['sub_part'],
+        'is_guest': data['is_guest'],
+        'guest_fee': data.get('guest_fee', ''),
+        'conductor': data['conductor'],
+        'ensemble_name': data['ensemble_name'],
+        'is_public': data['is_public'],
+        'youtube_url': data.get('youtube_url', ''),
+        'poster_url': data.get('poster_url', ''),
+        'created_at': datetime.now().isoformat(),
+        'like_count': 0,
+        'comment_count': 0
+    }
+
+
+# ==================== 캐시용 레코드 ====================
+
+_MISSING = object()
+
+
+def _make_fill(cls):
+    """cls.FIELDS를 모두 가진 dict로 슬롯을 채우는 함수 만들기 (dataclasses처럼 코드 생성)
+
+    필드마다 반복문을 도는 것보다 몇 배 빠릅니다. 필드가 없으면 KeyError, intern할
+    필드가 문자열이 아니면 TypeError가 나서 __init__의 일반 경로로 넘어갑니다.
+    """
+    lines = ["def _fill(self, data):"]
+    for field in cls.FIELDS:
+        if field in cls.INTERNED:
+            value = f"_intern(data[{field!r}])"
+        elif field in cls.INTERNED_LISTS:
+            value = f"[_intern(v) for v in data[{field!r}]]"
+        else:
+            value = f"data[{field!r}]"
+        lines.append(f"    self.{field} = {value}")
+    lines.append("    self._extra = None")
+    namespace = {'_intern': sys.intern}
+    exec("\n".join(lines), namespace)
+    return namespace['_fill']
+
+
+def _make_as_dict(cls):
+    """모든 필드가 있는 레코드 -> dict 함수 (빈 필드가 있으면 AttributeError)"""
+    items = ", ".join(f"{field!r}: self.{field}" for field in cls.FIELDS)
+    namespace = {}
+    exec(f"def _as_dict(self):\n    return {{{items}}}", namespace)
+    return namespace['_as_dict']
+
+
+class _Record(Mapping):
+    """필드가 정해진 읽기 전용 레코드 (dict와 같은 인터페이스)
+
+    없는 필드는 슬롯을 비워 두어 'like_count' not in record 같은 검사도 dict와 같고,
+    정해지지 않은 키는 _extra dict에 보관해서 저장할 때 그대로 씁니다.
+    """
+
+    __slots__ = ('_extra',)
+    FIELDS = ()
+    INTERNED = frozenset()          # sys.intern으로 공유할 (반복이 많은) 문자열 필드
+    INTERNED_LISTS = frozenset()    # 원소를 intern할 문자열 목록 필드
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+        cls._fill = _make_fill(cls)
+        cls._as_dict = _make_as_dict(cls)
+
+    def __init__(self, data):
+        # 필드가 정확히 FIELDS인 보통의 레코드는 만들어 둔 함수로 한 번에 채움
+        if len(data) == len(self.FIELDS):
+            try:
+                self._fill(data)
+                return
+            except (KeyError, TypeError):
+                pass
+        extra = None
+        for key, value in data.items():
+            if key in self._field_set:
+                setattr(self, key, self._intern(key, value))
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._extra = extra
+
+    def _intern(self, key, value):
+        if key in self.INTERNED and type(value) is str:
+            return sys.intern(value)
+        if key in self.INTERNED_LISTS and type(value) is list:
+            return [sys.intern(v) if type(v) is str else v for v in value]
+        return value
+
+    @classmethod
+    def of(cls, value):
+        """dict -> 레코드 (이미 레코드이거나 dict가 아니면 그대로)"""
+        if type(value) is dict:
+            return cls(value)
+        return value
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self._field_set:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __contains__(self, key):
+        if key in self._field_set:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        """새 dict (저장할 때 codec이 씀 - dict(record)보다 훨씬 빠름)"""
+        try:
+            data = self._as_dict()
+        except AttributeError:
+            data = {key: self[key] for key in self}
+        else:
+            if self._extra is not None:
+                data.update(self._extra)
+        return data
+
+    def __reduce__(self):
+        return (type(self), (self.to_dict(),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Performance(_Record):
+    """연주 내역 레코드 (make_performance와 같은 필드)"""
+
+    FIELDS = ('id', 'user_id', 'date', 'venue', 'pieces', 'instrument', 'sub_part', 'is_guest',
+              'guest_fee', 'conductor', 'ensemble_name', 'is_public', 'youtube_url', 'poster_url',
+              'created_at', 'like_count', 'comment_count')
+    INTERNED = frozenset({'user_id', 'date', 'venue', 'instrument', 'sub_part', 'conductor', 'ensemble_name'})
+    INTERNED_LISTS = frozenset({'pieces'})     # 같은 곡이 여러 공연에 반복해서 나옴
+    __slots__ = FIELDS
+
+
+class Comment(_Record):
+    """댓글 레코드"""
+
+    FIELDS = ('id', 'performance_id', 'user_id', 'content', 'created_at')
+    INTERNED = frozenset({'performance_id', 'user_id'})
+    __slots__ = FIELDS
+
+
+class Like(_Record):
+    """좋아요 레코드"""
+
+    FIELDS = ('performance_id', 'user_id', 'created_at')
+    INTERNED = frozenset({'performance_id', 'user_id'})
+    __slots__ = FIELDS
@@ -0,0 +1,32 @@
+"""
+좋아요/댓글 수 다시 계산 (연주 내역의 like_count/comment_count가 어긋났을 때)
+
+    python -m opus_archive.recount --data-dir data
+
+OPUS_STORAGE_BACKEND로 고른 백엔드에서 실행합니다. JSON 백엔드는 likes.json과
+comments.json을 스트리밍으로 한 번씩만 읽고, 값이 다른 레코드만 고쳐서 한 번에 저장합니다.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from .backends import create_backend
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="연주 내역의 좋아요/댓글 수를 다시 계산합니다.")
+    parser.add_argument('--data-dir', default='data', help="데이터 디렉터리 (기본값: data)")
+    parser.add_argument('--backend', help="저장소 백엔드 (기본값: OPUS_STORAGE_BACKEND 또는 json)")
+    args = parser.parse_args(argv)
+    if not Path(args.data_dir).is_dir():
+        parser.error(f"데이터 디렉터리가 없습니다: {args.data_dir}")
+
+    backend = create_backend(args.data_dir, args.backend)
+    fixed = backend.recount()
+    print(f"[{backend.name}] 개수를 고친 연주 내역: {fixed}건")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
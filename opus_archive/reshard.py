@@ -0,0 +1,140 @@
+"""
+연주 내역 레이아웃 바꾸기 (JSON/jsonlog 백엔드 - 앱을 멈춘 상태에서 실행)
+
+    python -m opus_archive.reshard --data-dir data            # performances.json -> 사용자별 샤드
+    python -m opus_archive.reshard --data-dir data --single   # 샤드 -> performances.json
+    python -m opus_archive.reshard --data-dir data --repair   # 샤드 파일 기준으로 색인 다시 만들기
+
+샤드로 바꿀 때는 사용자별 샤드를 모두 쓴 뒤 마지막에 색인(performances/index.json)을
+써서, 중간에 멈추면 그대로 performances.json을 쓰는 상태로 남습니다 (다시 실행하면 됨).
+원래 파일은 performances.json.bak으로 남겨 둡니다. 반대로 되돌릴 때는
+performances.json을 먼저 쓰고 색인 -> 샤드 순서로 지웁니다.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from .backends.performance_layout import ShardedLayout, index_entry, index_path, is_sharded
+from .store import iter_json_items, load_json, save_json, watch
+
+
+def to_sharded(data_dir, log=print):
+    """performances.json -> 사용자별 샤드 + 색인 (옮긴 연주 내역 수)"""
+    data_dir = Path(data_dir)
+    watch(data_dir)     # 실행 중인 앱 프로세스에 바꾼 파일을 알림
+    source = data_dir / "performances.json"
+    if is_sharded(data_dir):
+        log("이미 샤드 레이아웃입니다.")
+        return 0
+
+    by_user = {}
+    if source.exists():
+        for perf_id, record in iter_json_items(source):
+            by_user.setdefault(record['user_id'], {})[perf_id] = record
+
+    layout = ShardedLayout(data_dir)
+    # 이전에 중단된 실행이 남긴 샤드는 지우고 새로 씀
+    for stale in layout.users_dir.glob("*.json"):
+        stale.unlink()
+    index = {}
+    for user_id, records in by_user.items():
+        save_json(layout.shard_file(user_id), records)
+        index.update((perf_id, index_entry(record)) for perf_id, record in records.items())
+    save_json(layout.index_file, index)
+
+    if source.exists():
+        os.replace(source, data_dir / "performances.json.bak")
+    log(f"샤드 {len(by_user)}개, 연주 내역 {len(index)}건 -> {layout.root}")
+    return len(index)
+
+
+def to_single(data_dir, log=print):
+    """사용자별 샤드 -> performances.json (옮긴 연주 내역 수)"""
+    data_dir = Path(data_dir)
+    watch(data_dir)     # 실행 중인 앱 프로세스에 바꾼 파일을 알림
+    if not is_sharded(data_dir):
+        log("이미 performances.json 한 파일입니다.")
+        return 0
+
+    layout = ShardedLayout(data_dir)
+    performances = layout.load_all()
+    save_json(data_dir / "performances.json", dict(performances))
+
+    # 색인을 지우는 순간 performances.json 레이아웃이 되므로 나머지는 정리만
+    index_path(data_dir).unlink()
+    shutil.rmtree(layout.root)
+    log(f"연주 내역 {len(performances)}건 -> {data_dir / 'performances.json'}")
+    return len(performances)
+
+
+def repair(data_dir, log=print):
+    """샤드 파일을 기준으로 색인을 다시 만들기 (색인 항목 수)
+
+    쓰기 도중 멈춰서 색인에 없는 레코드는 색인에 넣고, 소유자를 옮기다 멈춰서 두 샤드에
+    있는 레코드는 기존 색인이 가리키는 쪽을 남깁니다. 주인이 아닌 샤드에 있는 레코드는
+    주인 샤드로 옮깁니다.
+    """
+    data_dir = Path(data_dir)
+    watch(data_dir)     # 실행 중인 앱 프로세스에 바꾼 파일을 알림
+    if not is_sharded(data_dir):
+        log("샤드 레이아웃이 아닙니다.")
+        return 0
+
+    layout = ShardedLayout(data_dir)
+    before = load_json(layout.index_file)
+    copies = {}         # 공연 ID -> [(샤드 파일, 레코드)]
+    for shard in sorted(layout.users_dir.glob("*.json")):
+        for perf_id, record in load_json(shard).items():
+            copies.setdefault(perf_id, []).append((shard, record))
+
+    index = {}
+    removals = {}       # 샤드 파일 -> {공연 ID}
+    additions = {}      # 샤드 파일 -> {공연 ID: 레코드}
+    for perf_id, found in copies.items():
+        owner = before.get(perf_id, [None, None])[1]
+        shard, record = next((c for c in found if c[1]['user_id'] == owner), found[0])
+        home = layout.shard_file(record['user_id'])
+        for other, _ in found:
+            if other != home:
+                removals.setdefault(other, set()).add(perf_id)
+        if shard != home:
+            additions.setdefault(home, {})[perf_id] = record
+        index[perf_id] = index_entry(record)
+
+    for shard in sorted(removals.keys() | additions.keys()):
+        removed = removals.get(shard, set())
+        records = {perf_id: record for perf_id, record in load_json(shard).items() if perf_id not in removed}
+        save_json(shard, {**records, **additions.get(shard, {})})
+        log(f"{shard.name}: 옮긴 레코드 {len(removed)}건 빼고 {len(additions.get(shard, ()))}건 넣음")
+
+    if before != index:
+        save_json(layout.index_file, index)
+    log(f"색인 {len(index)}건 (추가 {len(index.keys() - before.keys())}, 삭제 {len(before.keys() - index.keys())})")
+    return len(index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="연주 내역을 사용자별 샤드 파일로 나누거나 합칩니다.")
+    parser.add_argument('--data-dir', default='data', help="데이터 디렉터리 (기본값: data)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--single', action='store_true', help="샤드를 performances.json 한 파일로 합침")
+    mode.add_argument('--repair', action='store_true', help="샤드 파일 기준으로 색인 다시 만들기")
+    args = parser.parse_args(argv)
+    if not Path(args.data_dir).is_dir():
+        parser.error(f"데이터 디렉터리가 없습니다: {args.data_dir}")
+
+    if args.repair:
+        repair(args.data_dir)
+    elif args.single:
+        to_single(args.data_dir)
+    else:
+        to_sharded(args.data_dir)
+    print("앱을 다시 시작하면 바뀐 레이아웃을 사용합니다.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
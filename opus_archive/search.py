@@ -0,0 +1,240 @@
+"""
+연주 내역 검색 색인 (역색인 + 문자 바이그램)
+
+한국어는 띄어쓰기 단위가 길고 조사가 붙어서 단어 단위 색인으로는 부분 검색이
+안 됩니다. 그래서 단어를 두 글자씩 잘라(바이그램) 색인하고, 검색어의 바이그램
+posting 목록을 교집합해서 후보를 찾은 뒤 실제 부분 문자열로 한 번 더 확인합니다.
+
+    "차이코프스키" -> 차이, 이코, 코프, 프스, 스키
+
+posting에는 공연 ID마다 어느 필드에서 나왔는지 비트마스크를 같이 저장하므로
+자유 검색(모든 필드)과 필드별 검색(장소, 지휘자 등)을 같은 색인으로 처리합니다.
+"""
+
+import re
+import unicodedata
+
+# 색인하는 필드와 관련도 가중치 (곡목이 가장 많이 검색됨)
+FIELD_WEIGHTS = {
+    'pieces': 3,
+    'conductor': 2,
+    'ensemble_name': 2,
+    'venue': 1,
+    'instrument': 1,
+}
+SEARCH_FIELDS = tuple(FIELD_WEIGHTS)
+FIELD_BITS = {field: 1 << i for i, field in enumerate(SEARCH_FIELDS)}
+ALL_FIELDS = (1 << len(SEARCH_FIELDS)) - 1
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """비교용 정규화 (NFC + 대소문자 무시)"""
+    return unicodedata.normalize('NFC', text or '').casefold()
+
+
+def field_text(record, field):
+    """레코드의 검색 대상 문자열 (곡목은 줄바꿈으로 연결)"""
+    value = record.get(field)
+    if field == 'pieces':
+        return '\n'.join(value or [])
+    return value or ''
+
+
+def query_terms(query):
+    """검색어 -> 정규화된 단어 목록"""
+    return _WORD.findall(normalize(query))
+
+
+def word_tokens(word):
+    """단어 하나의 토큰 (두 글자 이상이면 바이그램, 한 글자면 그대로)"""
+    if len(word) < 2:
+        return {word}
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def normalized_texts(record):
+    """검색 필드별 정규화된 문자열 (SEARCH_FIELDS 순서의 튜플)"""
+    return tuple(normalize(field_text(record, field)) for field in SEARCH_FIELDS)
+
+
+def texts_tokens(texts):
+    """normalized_texts 결과 -> {토큰: 필드 비트마스크}"""
+    tokens = {}
+    for text, bit in zip(texts, FIELD_BITS.values()):
+        for word in _WORD.findall(text):
+            for token in word_tokens(word):
+                tokens[token] = tokens.get(token, 0) | bit
+    return tokens
+
+
+def record_tokens(record):
+    """레코드 -> {토큰: 필드 비트마스크}"""
+    return texts_tokens(normalized_texts(record))
+
+
+def parse_query(query, field_queries):
+    """(자유 검색 단어, {필드: 단어 목록}) - 빈 값은 제외"""
+    terms = query_terms(query)
+    field_terms = {}
+    for field, value in (field_queries or {}).items():
+        words = query_terms(value)
+        if words:
+            field_terms[field] = words
+    return terms, field_terms
+
+
+def conditions(terms, field_terms):
+    """[(단어, 찾을 필드 마스크), ...] - 모두 만족해야 하는 조건"""
+    result = [(word, ALL_FIELDS) for word in terms]
+    result += [(word, FIELD_BITS[field]) for field, words in field_terms.items() for word in words]
+    return result
+
+
+def compile_query(terms, field_terms, date_from=None, date_to=None):
+    """조건 전체를 술어 하나로 컴파일 -> match(record, texts)는 관련도 점수 또는 None
+
+    texts는 normalized_texts(record)입니다 (색인이 들고 있는 것을 그대로 사용).
+    날짜와 필드 조건을 먼저 확인하고, 자유 검색 단어마다 그 단어가 들어 있는
+    필드 중 가중치가 가장 큰 값을 더합니다 (필드 값이 단어로 시작하면 0.5 추가).
+    """
+    field_checks = [(SEARCH_FIELDS.index(field), word) for field, words in field_terms.items() for word in words]
+    weighted = sorted(enumerate(FIELD_WEIGHTS.values()), key=lambda x: -x[1])
+
+    def match(record, texts):
+        if date_from is not None or date_to is not None:
+            date = record['date']
+            if (date_from is not None and date < date_from) or (date_to is not None and date > date_to):
+                return None
+        for i, word in field_checks:
+            if word not in texts[i]:
+                return None
+        score = 0
+        for word in terms:
+            best = 0
+            for i, weight in weighted:
+                if weight + 0.5 <= best:
+                    break
+                value = texts[i]
+                if word in value:
+                    bonus = 0.5 if value.startswith(word) or f"\n{word}" in value else 0
+                    best = max(best, weight + bonus)
+            if not best:
+                return None
+            score += best
+        return score
+
+    return match
+
+
+def filter_records(records, field_queries, date_from=None, date_to=None):
+    """필드별 부분 검색 + 기간 조건을 술어 하나로 확인해서 한 번만 순회 (순서 유지)"""
+    _, field_terms = parse_query('', field_queries)
+    match = compile_query([], field_terms, date_from, date_to)
+    return [r for r in records if match(r, normalized_texts(r)) is not None]
+
+
+def score_record(record, terms, field_terms):
+    """레코드 하나의 관련도 점수 (조건을 만족하지 않으면 None)"""
+    return compile_query(terms, field_terms)(record, normalized_texts(record))
+
+
+def rank(items, match):
+    """(레코드, texts) 후보를 match로 확인하고 관련도 순으로 정렬 (같으면 최신 날짜 먼저)"""
+    scored = []
+    for record, texts in items:
+        score = match(record, texts)
+        if score is not None:
+            scored.append((score, record['date'], record['id'], record))
+    scored.sort(key=lambda x: (x[0], x[1], x[2]), reverse=True)
+    return [item[3] for item in scored]
+
+
+class SearchIndex:
+    """메모리 역색인 {토큰: {공연 ID: 필드 비트마스크}}
+
+    docs에는 레코드와 정규화된 필드 문자열을 같이 들고 있어서 후보 확인 때 다시
+    소문자로 바꾸지 않습니다 (토큰은 삭제할 때 문자열에서 다시 계산).
+
+    sync(records)는 마지막으로 색인한 레코드와 객체가 달라진 것만 다시 색인합니다.
+    레코드는 수정할 때 새 dict로 교체되므로 (store.update_json) 바뀌지 않은 레코드는
+    같은 객체로 남아 있어 비교가 포인터 비교로 끝납니다.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.docs = {}        # 공연 ID -> (레코드, normalized_texts)
+        self.version = None
+
+    def add(self, record):
+        perf_id = record['id']
+        if perf_id in self.docs:
+            self.remove(perf_id)
+        texts = normalized_texts(record)
+        for token, mask in texts_tokens(texts).items():
+            self.postings.setdefault(token, {})[perf_id] = mask
+        self.docs[perf_id] = (record, texts)
+
+    def remove(self, perf_id):
+        doc = self.docs.pop(perf_id, None)
+        if doc is None:
+            return
+        for token in texts_tokens(doc[1]):
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(perf_id, None)
+                if not posting:
+                    del self.postings[token]
+
+    def sync(self, records):
+        """records(dict)와 색인을 맞춤 - 바뀐 레코드만 다시 색인 (다시 색인한 수 반환)"""
+        changed = 0
+        for perf_id in [p for p in self.docs if p not in records]:
+            self.remove(perf_id)
+            changed += 1
+        for perf_id, record in records.items():
+            doc = self.docs.get(perf_id)
+            if doc is None or doc[0] is not record:
+                self.add(record)
+                changed += 1
+        return changed
+
+    def _word_ids(self, word, mask):
+        """단어의 모든 토큰을 mask 필드에 가진 공연 ID 집합 (작은 posting부터 교집합)"""
+        if len(word) < 2:
+            # 한 글자 검색어는 그 글자가 들어간 토큰 전체의 합집합
+            ids = set()
+            for token, posting in self.postings.items():
+                if word in token:
+                    ids.update(p for p, m in posting.items() if m & mask)
+            return ids
+        postings = [self.postings.get(token) for token in word_tokens(word)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        ids = {p for p, m in postings[0].items() if m & mask}
+        for posting in postings[1:]:
+            ids = {p for p in ids if posting.get(p, 0) & mask}
+            if not ids:
+                break
+        return ids
+
+    def estimate(self, terms, field_terms):
+        """후보 수 상한 추정 - 조건 중 가장 짧은 posting 길이 (한 글자 단어는 추정 안 함)"""
+        best = len(self.docs)
+        for word, _ in conditions(terms, field_terms):
+            if len(word) >= 2:
+                for token in word_tokens(word):
+                    best = min(best, len(self.postings.get(token, ())))
+        return best
+
+    def candidates(self, terms, field_terms):
+        """모든 조건의 posting 교집합 (조건이 없으면 None)"""
+        ids = None
+        for word, mask in conditions(terms, field_terms):
+            word_ids = self._word_ids(word, mask)
+            ids = word_ids if ids is None else ids & word_ids
+            if not ids:
+                return set()
+        return ids
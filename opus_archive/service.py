@@ -0,0 +1,434 @@
+"""
+데이터 계층 진입점 - app.py 화면이 쓰는 데이터 함수 모음 (Streamlit 비의존)
+
+화면(app.py)은 레코드를 보여 주고 입력을 받는 일만 하고, 레코드 만들기/검증 메시지/
+백엔드 호출은 여기 있는 Archive가 합니다. Streamlit 없이 임포트되므로 CLI, 배치 작업,
+벤치마크, 작업 프로세스에서 같은 함수를 그대로 쓸 수 있습니다.
+
+    from opus_archive.service import get_archive
+    archive = get_archive("data")
+    archive.get_public_performances_page(20)
+
+이 모듈은 한 번만 임포트되어 프로세스 동안 유지되므로, 리런마다 함수 정의와
+metrics.timed 감싸기를 다시 하지 않습니다. 가져오기/내보내기 모듈은 쓸 때 임포트하고,
+통계용 NumPy는 백엔드가 통계를 처음 볼 때 로드합니다.
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from . import metrics, search
+from .backends import get_backend
+from .ranking import TOP_K, Rankings
+from .records import DEFAULT_CATEGORIES, make_performance, new_id
+
+# 검색 결과 정렬 (None이면 관련도순 그대로)
+SEARCH_SORTS = {
+    "관련도순": None,
+    "최신순": lambda p: (p['date'], p['id']),
+    "좋아요순": lambda p: (p.get('like_count', 0), p['date']),
+    "댓글순": lambda p: (p.get('comment_count', 0), p['date'])
+}
+
+# filters 키 -> 연주 내역 필드
+FILTER_FIELDS = {
+    'venue': 'venue',
+    'conductor': 'conductor',
+    'ensemble': 'ensemble_name',
+    'instrument': 'instrument'
+}
+
+# 카테고리 종류 -> 연주 내역 필드 (rename_category)
+CATEGORY_FIELDS = {
+    'venues': 'venue',
+    'instruments': 'instrument',
+    'sub_parts': 'sub_part'
+}
+
+# 진행률(progress)을 받는 일괄 작업이 한 번에 저장하는 연주 내역 수 - 조각마다 진행률을
+# 알리고 취소를 확인함 (opus_archive.jobs)
+BULK_CHUNK = 200
+
+_lock = threading.Lock()
+_archives = {}
+
+
+def get_archive(data_dir, kind=None):
+    """프로세스 공용 Archive (데이터 디렉터리가 없으면 만들고, 백엔드는 get_backend와 공유)"""
+    Path(data_dir).mkdir(parents=True, exist_ok=True)
+    backend = get_backend(data_dir, kind)
+    with _lock:
+        if id(backend) not in _archives:
+            _archives[id(backend)] = Archive(backend)
+        return _archives[id(backend)]
+
+
+def get_default_categories():
+    """기본 카테고리"""
+    return {key: list(values) for key, values in DEFAULT_CATEGORIES.items()}
+
+
+def export_file_name(fmt, user_id=None):
+    """내보내기 파일 이름 (opus_사용자_날짜.csv / opus_public_날짜.csv)"""
+    from .exporter import EXPORT_FORMATS
+
+    scope = user_id or 'public'
+    return f"opus_{scope}_{datetime.now().strftime('%Y%m%d')}{EXPORT_FORMATS[fmt][1]}"
+
+
+class Archive:
+    """저장소 백엔드 위의 데이터 함수 (화면 메시지와 레코드 모양을 정함)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        # 인기순/급상승순 순위 (처음 조회할 때 만들고, 이 Archive를 거친 쓰기마다 갱신)
+        self._ranking = None
+        self._ranking_lock = threading.Lock()
+        self._ranking_writes = 0       # 진행 중인 쓰기 수 (_ranked_write)
+
+    # ---------- 사용자 ----------
+
+    @metrics.timed()
+    def register_user(self, username, email, password):
+        """사용자 등록 -> (성공 여부, 메시지)"""
+        if self.backend.get_user(username) is not None:
+            return False, "이미 존재하는 사용자명입니다."
+
+        if self.backend.email_exists(email):
+            return False, "이미 등록된 이메일입니다."
+
+        user = {
+            'email': email,
+            'password': password,  # ⚠️ 실제 운영 환경에서는 해싱 필요
+            'created_at': datetime.now().isoformat()
+        }
+        if not self.backend.add_user(username, user):
+            return False, "이미 존재하는 사용자명입니다."
+        return True, "회원가입이 완료되었습니다."
+
+    @metrics.timed()
+    def login_user(self, username, password):
+        """사용자 로그인 -> (성공 여부, 메시지)"""
+        user = self.backend.get_user(username)
+
+        if user is None:
+            return False, "존재하지 않는 사용자입니다."
+
+        if user['password'] != password:
+            return False, "비밀번호가 일치하지 않습니다."
+
+        return True, "로그인 성공"
+
+    # ---------- 연주 내역 ----------
+
+    @metrics.timed()
+    def add_performance(self, user_id, data):
+        """연주 내역 추가 -> 공연 ID"""
+        record = make_performance(user_id, data)
+        self._ranked_write(lambda: self.backend.add_performance(record), lambda rankings, _: rankings.put(record))
+        return record['id']
+
+    @metrics.timed()
+    def get_performance(self, perf_id):
+        """연주 내역 한 건 조회"""
+        return self.backend.get_performance(perf_id)
+
+    @metrics.timed()
+    def get_user_performances(self, username):
+        """사용자의 연주 내역 조회"""
+        return self.backend.get_user_performances(username)
+
+    @metrics.timed()
+    def get_public_performances(self):
+        """공개 연주 내역 조회"""
+        return self.backend.get_public_performances()
+
+    @metrics.timed()
+    def get_user_performances_page(self, username, limit, cursor=None):
+        """사용자의 연주 내역 한 페이지 조회 -> (목록, 다음 페이지 커서)"""
+        return self.backend.get_user_performances_page(username, limit, cursor)
+
+    @metrics.timed()
+    def get_public_performances_page(self, limit, cursor=None):
+        """공개 연주 내역 한 페이지 조회 -> (목록, 다음 페이지 커서)"""
+        return self.backend.get_public_performances_page(limit, cursor)
+
+    @metrics.timed()
+    def count_user_performances(self, username):
+        """사용자의 연주 내역 수"""
+        return self.backend.count_user_performances(username)
+
+    @metrics.timed()
+    def count_public_performances(self):
+        """공개 연주 내역 수"""
+        return self.backend.count_public_performances()
+
+    @metrics.timed()
+    def delete_performance(self, perf_id):
+        """연주 내역 삭제 (댓글과 좋아요도 함께 삭제)"""
+        return self._ranked_write(lambda: self.backend.delete_performance(perf_id),
+                                  lambda rankings, _: rankings.remove([perf_id]))
+
+    @metrics.timed()
+    def delete_performances(self, perf_ids, progress=None):
+        """연주 내역 여러 건을 한 번에 삭제 (댓글과 좋아요도 함께) -> 삭제한 개수
+
+        progress(끝낸 수, 전체 수)를 주면 BULK_CHUNK건씩 나눠 지우면서 조각마다 부릅니다
+        (백그라운드 작업의 진행률/취소용).
+        """
+        perf_ids = list(dict.fromkeys(perf_ids))
+        if progress is None:
+            return self._ranked_write(lambda: self.backend.delete_performances(perf_ids),
+                                      lambda rankings, _: rankings.remove(perf_ids))
+        deleted = 0
+        progress(0, len(perf_ids))
+        for start in range(0, len(perf_ids), BULK_CHUNK):
+            chunk = perf_ids[start:start + BULK_CHUNK]
+            deleted += self._ranked_write(lambda: self.backend.delete_performances(chunk),
+                                          lambda rankings, _: rankings.remove(chunk))
+            progress(start + len(chunk), len(perf_ids))
+        return deleted
+
+    @metrics.timed()
+    def update_performance(self, perf_id, data):
+        """연주 내역 수정"""
+        def apply(rankings, updated):
+            perf = self.backend.get_performance(perf_id) if updated else None
+            if perf is not None:
+                rankings.put(perf)   # 공개 여부/날짜가 바뀌었을 수 있음
+
+        return self._ranked_write(
+            lambda: self.backend.update_performance(perf_id, {**data, 'updated_at': datetime.now().isoformat()}),
+            apply)
+
+    # ---------- 댓글 ----------
+
+    @metrics.timed()
+    def add_comment(self, performance_id, user_id, content):
+        """댓글 추가 -> 댓글 ID"""
+        comment_id = new_id('comment')
+        record = {
+            'id': comment_id,
+            'performance_id': performance_id,
+            'user_id': user_id,
+            'content': content,
+            'created_at': datetime.now().isoformat()
+        }
+        self._ranked_write(lambda: self.backend.add_comment(record),
+                           lambda rankings, _: rankings.engage('comment', performance_id, 1))
+        return comment_id
+
+    @metrics.timed()
+    def get_comments(self, performance_id):
+        """댓글 조회"""
+        return list(self.backend.get_comments_grouped([performance_id])[performance_id])
+
+    @metrics.timed()
+    def get_comments_grouped(self, perf_ids):
+        """여러 공연의 댓글을 한 번에 조회 ({perf_id: [댓글, ...]})"""
+        return self.backend.get_comments_grouped(perf_ids)
+
+    @metrics.timed()
+    def delete_comment(self, comment_id):
+        """댓글 삭제 (어느 공연의 댓글인지 모르므로 순위는 다음 조회 때 다시 만듦)"""
+        return self._ranked_write(lambda: self.backend.delete_comment(comment_id))
+
+    # ---------- 좋아요 ----------
+
+    @metrics.timed()
+    def toggle_like(self, performance_id, user_id):
+        """좋아요 토글 -> (좋아요 상태, 메시지)"""
+        def apply(rankings, liked):
+            # 좋아요 수는 저장된 값으로 (동시에 토글해도 ±1이 쌓여 어긋나지 않게), 급상승 점수만 증감
+            perf = self.backend.get_performance(performance_id)
+            if perf is not None:
+                rankings.put(perf)
+            rankings.engage('like', performance_id, 1 if liked else -1)
+
+        liked = self._ranked_write(
+            lambda: self.backend.toggle_like(performance_id, user_id, datetime.now().isoformat()), apply)
+        if liked:
+            return True, "좋아요 완료"
+        return False, "좋아요 취소"
+
+    @metrics.timed()
+    def get_like_count(self, performance_id):
+        """좋아요 개수 조회 (연주 내역에 저장된 개수)"""
+        perf = self.backend.get_performance(performance_id)
+        return perf.get('like_count', 0) if perf else 0
+
+    @metrics.timed()
+    def get_like_counts(self, perf_ids):
+        """여러 공연의 좋아요 개수를 한 번에 조회 ({perf_id: 개수})"""
+        return self.backend.get_like_counts(perf_ids)
+
+    @metrics.timed()
+    def get_liked_set(self, user_id, perf_ids):
+        """사용자가 좋아요한 공연 ID 집합 (perf_ids 중에서)"""
+        return self.backend.get_liked_set(user_id, perf_ids)
+
+    @metrics.timed()
+    def is_liked_by_user(self, performance_id, user_id):
+        """사용자가 이미 좋아요했는지 확인"""
+        return performance_id in self.backend.get_liked_set(user_id, [performance_id])
+
+    # ---------- 검색/필터 ----------
+
+    @metrics.timed()
+    def search_performances(self, query, field_queries=None, user_id=None, date_from=None, date_to=None):
+        """검색 색인으로 연주 내역 찾기 (user_id가 없으면 공개 아카이브에서) - 관련도 순"""
+        return self.backend.search_performances(query, field_queries, user_id, date_from, date_to)
+
+    @metrics.timed()
+    def filter_performances(self, performances, filters):
+        """연주 내역 필터링 (조건을 술어 하나로 컴파일해서 한 번만 순회)"""
+        field_queries = {field: filters.get(key) for key, field in FILTER_FIELDS.items()}
+        return search.filter_records(performances, field_queries, filters.get('date_from'), filters.get('date_to'))
+
+    # ---------- 인기순/급상승순 ----------
+
+    @metrics.timed()
+    def get_ranked_performances(self, order, limit=TOP_K):
+        """인기순(ranking.POPULAR)/급상승순(ranking.TRENDING) 공개 연주 내역 상위 limit건
+
+        미리 정렬해 둔 순위에서 limit건의 ID만 잘라 레코드를 조회합니다 (O(limit)).
+        """
+        with self._ranking_lock:
+            perf_ids = self._rankings().top(order, limit)
+        perfs = (self.backend.get_performance(perf_id) for perf_id in perf_ids)
+        return [perf for perf in perfs if perf is not None]
+
+    def _rankings(self):
+        """현재 순위 (_ranking_lock 안에서) - 다른 경로의 쓰기로 data_version이 달라졌거나
+        오래됐으면 다시 만듦 (이 Archive의 쓰기가 진행 중일 때는 끝난 뒤로 미룸)"""
+        rankings = self._ranking
+        if rankings is not None:
+            if self._ranking_writes:
+                return rankings
+            if not rankings.expired() and rankings.version == self.backend.data_version():
+                return rankings
+        version = self.backend.data_version()
+        rankings = self._ranking = Rankings.build(self.backend, version)
+        # 진행 중인 쓰기가 있으면 이미 반영됐는지 알 수 없으므로 끝난 뒤 다시 만듦
+        rankings.needs_rebuild = bool(self._ranking_writes)
+        return rankings
+
+    def _ranked_write(self, write, apply=None):
+        """쓰기 실행 후 순위에 바뀐 것만 반영 -> write()의 결과
+
+        apply(순위, 결과)가 없거나 쓰기가 실패하면 다음 조회 때 순위를 다시 만듭니다.
+        이 Archive를 거친 쓰기가 모두 끝난 시점에 순위의 version을 현재 data_version으로
+        맞추므로, 이후 version이 달라지면 다른 프로세스나 다른 경로(가져오기 등)의
+        쓰기로 보고 다시 만듭니다.
+        """
+        with self._ranking_lock:
+            self._ranking_writes += 1
+        done = False
+        try:
+            result = write()
+            done = True
+            return result
+        finally:
+            with self._ranking_lock:
+                self._ranking_writes -= 1
+                rankings = self._ranking
+                if rankings is not None:
+                    if done and apply is not None:
+                        apply(rankings, result)
+                    else:
+                        rankings.needs_rebuild = True
+                    if not self._ranking_writes:
+                        rankings.version = self.backend.data_version()
+
+    # ---------- 통계 ----------
+
+    @metrics.timed()
+    def get_performance_stats(self, user_id=None):
+        """연주 통계 (user_id가 없으면 공개 아카이브 전체) - 열 데이터에서 벡터 연산으로 집계"""
+        return self.backend.get_performance_stats(user_id)
+
+    # ---------- 변경 감지 ----------
+
+    def data_version(self):
+        """연주 내역/댓글/좋아요가 바뀌면 달라지는 값 (HTTP API의 ETag용, None이면 모름)"""
+        return self.backend.data_version()
+
+    # ---------- 가져오기/내보내기 ----------
+
+    @metrics.timed()
+    def import_performances_file(self, user_id, file, add_missing_categories=False, dry_run=False):
+        """CSV/JSONL 파일(name 속성이 있는 바이너리 파일 객체) 가져오기 -> ImportReport"""
+        from .importer import detect_format, import_file
+
+        file.seek(0)
+        return import_file(
+            self.backend, user_id, file, detect_format(file.name),
+            categories=self.load_categories(), add_missing_categories=add_missing_categories, dry_run=dry_run
+        )
+
+    def export_stream(self, fmt, user_id=None):
+        """내보내기 파일 내용을 조각(bytes) 단위로 (user_id가 없으면 공개 아카이브 전체)"""
+        from .exporter import export_stream
+
+        return export_stream(self.backend, fmt, user_id)
+
+    # ---------- 드롭다운 카테고리 ----------
+
+    @metrics.timed()
+    def load_categories(self):
+        """카테고리 로드 (없으면 기본값 생성)"""
+        categories = self.backend.load_categories()
+        if categories is None:
+            # 기본값도 update_categories로 - 그사이 다른 프로세스가 추가한 값을 덮어쓰지 않게
+            categories = self.backend.update_categories(lambda categories: categories)
+        return categories
+
+    @metrics.timed()
+    def save_categories(self, categories):
+        """카테고리 저장"""
+        self.backend.save_categories(categories)
+
+    @metrics.timed()
+    def add_category(self, category_type, value):
+        """카테고리 추가"""
+        def add(categories):
+            if value in categories[category_type]:
+                return False
+            categories[category_type].append(value)
+            return True
+        return self.backend.update_categories(add)
+
+    @metrics.timed()
+    def rename_category(self, category_type, old, new, progress=None):
+        """카테고리 값 이름 바꾸기 - 그 값을 쓰는 모든 연주 내역(비공개 포함)도 함께 -> 바꾼 연주 내역 수
+
+        목록을 먼저 바꾸고 연주 내역을 BULK_CHUNK건씩 저장합니다. 도중에 취소하면 이미
+        저장한 조각은 새 이름으로 남습니다 (다시 실행하면 나머지를 바꿈).
+        """
+        def rename(categories):
+            renamed = [new if v == old else v for v in categories[category_type]]
+            categories[category_type] = list(dict.fromkeys(renamed))   # 새 이름이 이미 있으면 하나로
+        self.backend.update_categories(rename)
+
+        field = CATEGORY_FIELDS[category_type]
+        perf_ids = [perf['id'] for perf in self.backend.iter_performances() if perf.get(field) == old]
+        if progress is not None:
+            progress(0, len(perf_ids))
+        updated = 0
+        for start in range(0, len(perf_ids), BULK_CHUNK):
+            chunk = perf_ids[start:start + BULK_CHUNK]
+            updated += self.backend.update_performances({perf_id: {field: new} for perf_id in chunk})
+            if progress is not None:
+                progress(start + len(chunk), len(perf_ids))
+        return updated
+
+    @metrics.timed()
+    def remove_category(self, category_type, value):
+        """카테고리 삭제"""
+        def remove(categories):
+            if value not in categories[category_type]:
+                return False
+            categories[category_type].remove(value)
+            return True
+        return self.backend.update_categories(remove)
@@ -0,0 +1,250 @@
+"""
+연주 통계 - 연주 내역을 열(column)별 NumPy 배열로 들고 벡터 연산으로 집계
+
+통계 화면(연도별/악기별/파트별/단체별/지휘자별 공연 수, 연도별 객원 페이 합계)을
+리런마다 레코드를 훑어서 계산하면 공개 아카이브 전체에서는 너무 느려서, 집계에 쓰는
+필드만 배열로 옮겨 둡니다.
+
+- 날짜는 datetime64[D], 연도는 int16 (날짜를 읽을 수 없으면 NaT / 0)
+- 사용자/악기/파트/단체/지휘자는 Categories의 정수 코드 (int32)
+- 페이는 float64 (객원이 아니거나 비어 있으면 0)
+
+집계는 보기 조건으로 만든 mask + np.bincount로 하는 group-by입니다. 백엔드는 이 모듈을
+통계를 처음 볼 때 임포트합니다 (NumPy 로드가 데이터 계층 임포트 시간의 대부분이라).
+sync_records/sync_rows는 search.SearchIndex.sync처럼 바뀐 레코드의 행만 고칩니다.
+삭제된 행은 비워 두었다가 다음에 추가되는 레코드가 다시 씁니다.
+"""
+
+import numpy as np
+
+CATEGORY_FIELDS = ('user_id', 'instrument', 'sub_part', 'ensemble_name', 'conductor')
+# sync_rows가 받는 행 (perf_id 다음 순서)
+SOURCE_FIELDS = ('date', 'user_id', 'instrument', 'sub_part', 'ensemble_name', 'conductor',
+                 'is_guest', 'guest_fee', 'is_public')
+EMPTY_LABEL = '(미입력)'
+
+_INITIAL_CAPACITY = 1024
+
+
+def source_values(record):
+    """레코드 -> 통계에 쓰는 필드 튜플 (SOURCE_FIELDS 순서)"""
+    return tuple(record.get(field) for field in SOURCE_FIELDS)
+
+
+def _fee(value):
+    """저장된 페이 값 -> 숫자 (비어 있거나 숫자가 아니면 0)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).replace(',', ''))
+    except ValueError:
+        return 0.0
+
+
+def _parse_dates(values):
+    """ISO 날짜 문자열 목록 -> datetime64[D] 배열 (읽을 수 없는 것은 NaT)"""
+    try:
+        return np.array(values, dtype='datetime64[D]')
+    except (TypeError, ValueError):
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(np.datetime64(value, 'D'))
+            except (TypeError, ValueError):
+                parsed.append(np.datetime64('NaT', 'D'))
+        return np.array(parsed, dtype='datetime64[D]')
+
+
+class Categories:
+    """문자열 <-> 정수 코드 (추가만 하므로 한 번 받은 코드는 바뀌지 않음)"""
+
+    def __init__(self):
+        self.labels = []
+        self.codes = {}
+
+    def code(self, value):
+        value = value or ''
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+
+
+class PerformanceColumns:
+    """연주 내역의 통계용 열 데이터
+
+    행 번호는 rows({perf_id: 행})로 찾고, alive가 거짓인 행은 빈 행입니다.
+    배열은 size까지만 유효합니다 (용량이 모자라면 두 배로 늘림).
+    """
+
+    def __init__(self):
+        self.version = None
+        self.rows = {}
+        self.size = 0
+        self.categories = {field: Categories() for field in CATEGORY_FIELDS}
+        self._sources = []      # 행 -> 마지막으로 반영한 레코드(객체 비교용) 또는 값 튜플
+        self._free = []
+        self.capacity = _INITIAL_CAPACITY
+        self.date = np.full(self.capacity, np.datetime64('NaT', 'D'))
+        self.year = np.zeros(self.capacity, np.int16)
+        self.codes = {field: np.zeros(self.capacity, np.int32) for field in CATEGORY_FIELDS}
+        self.fee = np.zeros(self.capacity, np.float64)
+        self.is_guest = np.zeros(self.capacity, bool)
+        self.is_public = np.zeros(self.capacity, bool)
+        self.alive = np.zeros(self.capacity, bool)
+
+    def _grow(self):
+        """용량을 두 배로 (기존 값 복사)"""
+        self.capacity *= 2
+
+        def resized(array):
+            new = np.zeros(self.capacity, dtype=array.dtype)
+            new[:self.size] = array[:self.size]
+            return new
+        self.date, self.year, self.fee = resized(self.date), resized(self.year), resized(self.fee)
+        self.is_guest, self.is_public, self.alive = resized(self.is_guest), resized(self.is_public), resized(self.alive)
+        self.codes = {field: resized(codes) for field, codes in self.codes.items()}
+
+    def __len__(self):
+        return len(self.rows)
+
+    # ---------- 동기화 ----------
+
+    def sync_records(self, records):
+        """records({perf_id: 레코드})와 맞춤 - 객체가 바뀐 레코드만 다시 반영 (바뀐 행 수)
+
+        레코드는 수정할 때 새 객체로 교체되므로 (store.update_json) 바뀌지 않은 레코드는
+        포인터 비교로 건너뜁니다.
+        """
+        removed = [perf_id for perf_id in self.rows if perf_id not in records]
+        changed = []
+        for perf_id, record in records.items():
+            row = self.rows.get(perf_id)
+            if row is None or self._sources[row] is not record:
+                changed.append((perf_id, record, source_values(record)))
+        return self._apply(removed, changed)
+
+    def sync_rows(self, rows):
+        """(perf_id, *SOURCE_FIELDS) 행 전체와 맞춤 - 값이 바뀐 행만 다시 반영 (바뀐 행 수)
+
+        매번 새 튜플을 만드는 저장소(SQLite)용이라 객체 대신 행 튜플 값을 비교합니다.
+        """
+        seen = set()
+        changed = []
+        for source in rows:
+            perf_id = source[0]
+            seen.add(perf_id)
+            row = self.rows.get(perf_id)
+            if row is None or self._sources[row] != source:
+                changed.append((perf_id, source, source[1:]))
+        removed = [perf_id for perf_id in self.rows if perf_id not in seen]
+        return self._apply(removed, changed)
+
+    def _apply(self, removed, changed):
+        for perf_id in removed:
+            row = self.rows.pop(perf_id)
+            self.alive[row] = False
+            self._sources[row] = None
+            self._free.append(row)
+        if not changed:
+            return len(removed)
+
+        rows = []
+        for perf_id, source, _ in changed:
+            row = self.rows.get(perf_id)
+            if row is None:
+                row = self._free.pop() if self._free else self._new_row()
+                self.rows[perf_id] = row
+            self._sources[row] = source
+            rows.append(row)
+
+        # 바뀐 행을 열마다 한 번에 씀 (처음 만들 때도 같은 경로)
+        rows = np.array(rows, dtype=np.intp)
+        values = [v for _, _, v in changed]
+        dates = _parse_dates([v[0] or 'NaT' for v in values])
+        self.date[rows] = dates
+        years = dates.astype('datetime64[Y]').astype(np.int64) + 1970
+        self.year[rows] = np.where(np.isnat(dates), 0, years)
+        for i, field in enumerate(CATEGORY_FIELDS, start=1):
+            code = self.categories[field].code
+            self.codes[field][rows] = [code(v[i]) for v in values]
+        self.is_guest[rows] = [bool(v[6]) for v in values]
+        self.fee[rows] = [_fee(v[7]) if v[6] and v[7] not in (None, '') else 0.0 for v in values]
+        self.is_public[rows] = [bool(v[8]) for v in values]
+        self.alive[rows] = True
+        return len(removed) + len(changed)
+
+    def _new_row(self):
+        if self.size == self.capacity:
+            self._grow()
+        self._sources.append(None)
+        self.size += 1
+        return self.size - 1
+
+    # ---------- 집계 ----------
+
+    def select(self, user_id=None, public_only=False, year_from=None, year_to=None):
+        """보기 조건에 맞는 행 mask (길이 size)"""
+        n = self.size
+        mask = self.alive[:n].copy()
+        if user_id is not None:
+            code = self.categories['user_id'].codes.get(user_id)
+            if code is None:
+                return np.zeros(n, bool)
+            mask &= self.codes['user_id'][:n] == code
+        if public_only:
+            mask &= self.is_public[:n]
+        if year_from is not None:
+            mask &= self.year[:n] >= year_from
+        if year_to is not None:
+            mask &= self.year[:n] <= year_to
+        return mask
+
+    def count_by(self, field, mask, top=None):
+        """[(값, 공연 수)] - 공연 수가 많은 순 (같으면 값 순), top이 있으면 앞에서 top개"""
+        labels = self.categories[field].labels
+        counts = np.bincount(self.codes[field][:self.size][mask], minlength=len(labels))
+        # 정렬하는 것은 값 종류(많아야 수천 개)뿐이라 파이썬으로
+        codes = sorted(np.flatnonzero(counts).tolist(), key=lambda c: (-counts[c], labels[c]))
+        if top is not None:
+            codes = codes[:top]
+        return [(labels[c] or EMPTY_LABEL, int(counts[c])) for c in codes]
+
+    def by_year(self, mask):
+        """연도별 {'year', 'count', 'guest_count', 'fee_total'} 목록 (공연이 없는 해도 0으로 포함)"""
+        n = self.size
+        mask = mask & (self.year[:n] > 0)
+        years = self.year[:n][mask].astype(np.int64)
+        if not len(years):
+            return {'year': [], 'count': [], 'guest_count': [], 'fee_total': []}
+        first = int(years.min())
+        index = years - first
+        length = int(years.max()) - first + 1
+        counts = np.bincount(index, minlength=length)
+        guests = np.bincount(index, weights=self.is_guest[:n][mask], minlength=length)
+        fees = np.bincount(index, weights=self.fee[:n][mask], minlength=length)
+        return {
+            'year': list(range(first, first + length)),
+            'count': counts.tolist(),
+            'guest_count': guests.astype(np.int64).tolist(),
+            'fee_total': fees.astype(np.int64).tolist(),
+        }
+
+    def summarize(self, mask, top=10):
+        """통계 화면 한 번에 필요한 집계 (JSON으로 바로 보낼 수 있는 값만)"""
+        n = self.size
+        dates = self.date[:n][mask]
+        dates = dates[~np.isnat(dates)]
+        return {
+            'total': int(mask.sum()),
+            'guest_count': int(self.is_guest[:n][mask].sum()),
+            'fee_total': int(self.fee[:n][mask].sum()),
+            'first_date': str(dates.min()) if len(dates) else None,
+            'last_date': str(dates.max()) if len(dates) else None,
+            'by_year': self.by_year(mask),
+            'by_instrument': self.count_by('instrument', mask),
+            'by_sub_part': self.count_by('sub_part', mask),
+            'by_ensemble': self.count_by('ensemble_name', mask, top),
+            'by_conductor': self.count_by('conductor', mask, top),
+        }
@@ -0,0 +1,454 @@
+"""
+JSON 데이터 파일 공유 캐시
+
+Streamlit은 리런마다 app.py 전체를 다시 실행하지만 임포트된 모듈은 프로세스에
+한 번만 로드됩니다. 그래서 캐시를 이 모듈에 두면 서버의 모든 세션이 공유합니다.
+
+- 파일은 한 번만 파싱하고, save_json이 버전 카운터를 올리면서 캐시를 갱신합니다.
+- 다른 프로세스가 파일을 쓴 경우는 mtime/size/inode 변화로 감지해 다시 읽습니다.
+  watch(data_dir)를 부른 디렉터리 아래 파일은 대신 변경 로그(changefeed)로 알림을
+  주고받아서, 다른 프로세스가 쓴 파일의 캐시만 버리고 나머지는 stat 없이 씁니다.
+- 그룹핑 같은 파생 데이터는 derived로 버전별로 한 번만 계산합니다.
+- load_json이 돌려주는 객체는 모든 세션이 공유하므로 읽기 전용으로 다룹니다.
+  수정은 update_json으로 합니다 (프로세스 간 파일 잠금 안에서 최신 내용을 읽고,
+  동시에 들어온 수정을 모아 임시 파일 + os.replace로 한 번에 저장).
+- 저장 형식(들여쓰기 JSON/압축 JSON/msgpack)은 codec이 정하고, 읽을 때 자동 감지합니다.
+- register_records로 레코드 형식을 등록한 파일은 캐시에 올릴 때 최상위 값을
+  __slots__ 레코드로 바꿔 둡니다 (records 참고 - 메모리 절약).
+"""
+
+import gc
+import itertools
+import json
+import os
+import re
+import threading
+
+from . import codec, metrics
+from .changefeed import ChangeFeed
+from .locks import file_lock
+
+_lock = threading.RLock()
+_entries = {}                     # 절대 경로 -> _Entry
+_version_counter = itertools.count(1)
+_stats = {'loads': 0, 'parses': 0, 'writes': 0, 'group_commits': 0, 'batched_updates': 0}
+_NON_WS = re.compile(r'\S')
+_record_types = {}                # 절대 경로 -> 레코드 변환 함수 (register_records)
+_feeds = {}                       # 데이터 디렉터리 절대 경로 -> ChangeFeed (watch)
+_suspect = set()                  # 변경 로그를 못 믿는 동안 mtime/size로 다시 확인할 키
+
+
+class _Entry:
+    """파일 하나의 캐시 항목"""
+
+    __slots__ = ('data', 'signature', 'version', 'derived')
+
+    def __init__(self, data, signature):
+        self.data = data
+        self.signature = signature
+        self.version = next(_version_counter)
+        self.derived = {}
+
+
+def _key(file_path):
+    return os.path.abspath(os.fspath(file_path))
+
+
+def _signature(key):
+    """파일 변경 감지용 (mtime_ns, size, inode) - 파일이 없으면 None
+
+    같은 크기로 빠르게 두 번 쓰면 mtime이 같을 수 있어서 (타임스탬프 해상도) os.replace가
+    바꾸는 inode도 같이 봅니다.
+    """
+    try:
+        st = os.stat(key)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def register_records(file_path, convert):
+    """파일의 최상위 값을 캐시에 올릴 때 convert(값)으로 바꾸도록 등록 (예: Performance.of)"""
+    with _lock:
+        _record_types[_key(file_path)] = convert
+
+
+def _to_records(key, data):
+    """등록된 파일이면 최상위 값을 레코드로 교체 (제자리 - 이미 레코드인 값은 그대로)"""
+    convert = _record_types.get(key)
+    if convert is None or not isinstance(data, dict):
+        return data
+    # codec.decode와 같은 이유로 레코드 수십만 개를 만드는 동안 순환 GC를 멈춤
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for item_key, value in data.items():
+            record = convert(value)
+            if record is not value:
+                dict.__setitem__(data, item_key, record)
+    finally:
+        if enabled:
+            gc.enable()
+    return data
+
+
+# ==================== 프로세스 간 변경 알림 ====================
+
+def watch(data_dir):
+    """data_dir 아래 파일을 변경 로그로 감시 (백엔드가 시작할 때 부름, 여러 번 불러도 됨)"""
+    root = _key(data_dir)
+    with _lock:
+        if root not in _feeds:
+            _feeds[root] = ChangeFeed(root)
+        return _feeds[root]
+
+
+def _feed_for(key):
+    for feed in _feeds.values():
+        if feed.covers(key):
+            return feed
+    return None
+
+
+def _poll(feed):
+    """변경 로그의 새 알림 반영 - 다른 프로세스가 쓴 파일의 캐시만 버림 (_lock 안에서)"""
+    changed, recheck = feed.poll()
+    for key in changed:
+        _entries.pop(key, None)
+    if recheck:
+        _suspect.update(key for key in _entries if feed.covers(key))
+
+
+def _get_entry(key, poll=True, verify=False):
+    """캐시 항목 조회 (외부 변경이 감지되면 다시 파싱)
+
+    변경 로그로 감시하는 파일은 로그에 알림이 없으면 stat 없이 캐시를 그대로 씁니다.
+    poll=False는 호출자가 방금 로그를 확인한 경우 (data_versions), verify=True는 로그와
+    관계없이 mtime/size/inode를 확인하는 경우입니다 (파일 잠금 안의 읽고-수정하고-쓰기 -
+    알림이 빠져도 다른 프로세스의 수정을 덮어쓰지 않도록).
+    """
+    entry = _entries.get(key)
+    feed = _feed_for(key) if _feeds else None
+    if feed is not None:
+        if poll:
+            _poll(feed)
+            entry = _entries.get(key)
+        if entry is not None and key not in _suspect and not verify:
+            return entry
+        _suspect.discard(key)
+
+    signature = _signature(key)
+    if entry is not None and entry.signature == signature:
+        return entry
+
+    if signature is None:
+        data = {}
+    else:
+        with open(key, 'rb') as f:
+            data = _to_records(key, codec.decode(f.read()))
+        _stats['parses'] += 1
+        metrics.add_bytes(read=signature[1])
+    entry = _Entry(data, signature)
+    _entries[key] = entry
+    return entry
+
+
+@metrics.timed()
+def load_json(file_path):
+    """JSON 파일 로드 (공유 캐시 - 반환값을 직접 수정하지 말 것)"""
+    key = _key(file_path)
+    with _lock:
+        _stats['loads'] += 1
+        return _get_entry(key).data
+
+
+def write_json_atomic(file_path, data, fmt=None):
+    """임시 파일에 쓰고 fsync 후 os.replace (쓰는 도중 죽어도 원본은 그대로)
+
+    형식은 fmt (없으면 OPUS_DATA_FORMAT, codec 참고)
+    """
+    key = _key(file_path)
+    payload = codec.encode(data, fmt)
+    tmp_path = f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            metrics.add_bytes(written=len(payload))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, key)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    feed = _feed_for(key) if _feeds else None
+    if feed is not None:
+        feed.publish(key)
+
+
+def _lock_path(key):
+    return key + '.lock'
+
+
+def _install(key, data):
+    """방금 쓴 내용으로 캐시 갱신 (버전 증가)"""
+    with _lock:
+        _stats['writes'] += 1
+        _entries[key] = _Entry(_to_records(key, data), _signature(key))
+
+
+@metrics.timed()
+def save_json(file_path, data, fmt=None):
+    """JSON 파일 전체 저장 (파일 잠금 + 원자적 교체, 저장한 객체로 캐시 갱신)"""
+    key = _key(file_path)
+    with file_lock(_lock_path(key)):
+        write_json_atomic(key, data, fmt)
+        _install(key, data)
+
+
+# ==================== 읽고-수정하고-쓰기 (그룹 커밋) ====================
+
+class _TrackedDict(dict):
+    """최상위 변경 여부를 기록하는 dict (변경이 없으면 저장 생략)"""
+
+    dirty = False
+
+    def __setitem__(self, key, value):
+        self.dirty = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self.dirty = True
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self.dirty = True
+        return super().pop(*args)
+
+    def update(self, *args, **kwargs):
+        self.dirty = True
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.dirty = True
+        return super().setdefault(key, default)
+
+
+class _Pending:
+    """대기 중인 수정 하나"""
+
+    __slots__ = ('mutate', 'result', 'error', 'done')
+
+    def __init__(self, mutate):
+        self.mutate = mutate
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class _CommitQueue:
+    """파일 하나의 수정 대기열"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pending = []
+        self.committing = False
+
+
+_queues = {}
+
+
+def _get_queue(key):
+    with _lock:
+        if key not in _queues:
+            _queues[key] = _CommitQueue()
+        return _queues[key]
+
+
+def _commit(key, batch):
+    """대기열의 수정들을 파일 잠금 안에서 최신 내용에 차례로 적용하고 한 번만 쓰기"""
+    with file_lock(_lock_path(key)):
+        with _lock:
+            # 다른 프로세스가 쓴 내용이 있으면 여기서 다시 읽음
+            current = _get_entry(key, verify=True).data
+        data = _TrackedDict(current)
+        for op in batch:
+            try:
+                op.result = op.mutate(data)
+            except Exception as e:
+                op.error = e
+        if data.dirty:
+            write_json_atomic(key, data)
+            _install(key, data)
+            with _lock:
+                _stats['group_commits'] += 1
+                _stats['batched_updates'] += len(batch)
+
+
+@metrics.timed()
+def update_json(file_path, mutate):
+    """읽고-수정하고-쓰기를 파일 잠금 안에서 실행하고 mutate의 반환값을 돌려줌
+
+    mutate(data)는 최신 내용의 최상위 복사본을 받아 직접 수정합니다 (내부 레코드는
+    공유되므로 제자리 수정 대신 교체). 검증은 수정 전에 끝내고, 예외를 던지면 그대로
+    호출자에게 전달됩니다. 여러 세션에서 동시에 들어온 수정은 한 번의 쓰기로 묶입니다.
+    """
+    key = _key(file_path)
+    queue = _get_queue(key)
+    op = _Pending(mutate)
+
+    with queue.cond:
+        queue.pending.append(op)
+        # 앞선 커밋이 끝날 때까지 기다리는 동안 들어온 수정은 다음 배치로 합쳐짐
+        while not op.done and (queue.committing or queue.pending[0] is not op):
+            queue.cond.wait()
+        leader = not op.done
+        if leader:
+            batch = queue.pending[:]
+            queue.pending.clear()
+            queue.committing = True
+
+    if leader:
+        try:
+            _commit(key, batch)
+        except BaseException as e:
+            for pending in batch:
+                pending.error = pending.error or e
+            raise
+        finally:
+            with queue.cond:
+                queue.committing = False
+                for pending in batch:
+                    pending.done = True
+                queue.cond.notify_all()
+
+    if op.error is not None:
+        raise op.error
+    return op.result
+
+
+def data_version(file_path):
+    """현재 캐시 버전 (파일 내용이 바뀔 때마다 증가)"""
+    key = _key(file_path)
+    with _lock:
+        return _get_entry(key).version
+
+
+def data_versions(file_paths):
+    """여러 파일의 캐시 버전 튜플 (변경 로그는 한 번만 확인 - 샤드 레이아웃용)"""
+    keys = [_key(path) for path in file_paths]
+    with _lock:
+        for feed in _feeds.values():
+            _poll(feed)
+        return tuple(_get_entry(key, poll=False).version for key in keys)
+
+
+def derived(file_path, name, builder):
+    """파일 내용에서 계산한 파생 데이터 캐시 (버전이 바뀌면 builder로 다시 계산)"""
+    key = _key(file_path)
+    with _lock:
+        entry = _get_entry(key)
+        if name not in entry.derived:
+            entry.derived[name] = builder(entry.data)
+        return entry.derived[name]
+
+
+def invalidate(file_path=None):
+    """캐시 무효화 (file_path가 없으면 전체)"""
+    with _lock:
+        if file_path is None:
+            _entries.clear()
+        else:
+            _entries.pop(_key(file_path), None)
+
+
+def iter_json_items(file_path, chunk_size=1 << 16):
+    """최상위 JSON 객체의 (key, value) 쌍을 파일 전체를 메모리에 올리지 않고 순서대로 읽기
+
+    바이너리 형식 파일은 스트리밍 파싱을 할 수 없어서 한 번에 읽고 순회합니다.
+    """
+    with open(file_path, 'rb') as f:
+        binary = f.read(len(codec.BINARY_MAGIC)) == codec.BINARY_MAGIC
+    if binary:
+        with open(file_path, 'rb') as f:
+            yield from codec.decode(f.read()).items()
+        return
+
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buf = ''
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip_ws():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        def expect(char):
+            nonlocal pos
+            skip_ws()
+            if pos >= len(buf) or buf[pos] != char:
+                raise ValueError(f"{file_path}: '{char}' 위치에 잘못된 JSON")
+            pos += 1
+
+        def decode():
+            nonlocal pos
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                # 숫자는 청크 경계에서 잘려도 ("-3", "12.") 디코딩되므로 뒤에 구분자가 보일 때까지 더 읽음
+                nxt = _NON_WS.search(buf, end)
+                if not eof and (nxt is None or nxt.group() not in ',:}]'):
+                    fill()
+                    continue
+                pos = end
+                return value
+
+        fill()
+        skip_ws()
+        if pos >= len(buf):
+            return
+        expect('{')
+        skip_ws()
+        if pos < len(buf) and buf[pos] == '}':
+            return
+        while True:
+            skip_ws()
+            key = decode()
+            expect(':')
+            skip_ws()
+            value = decode()
+            yield key, value
+            skip_ws()
+            if pos < len(buf) and buf[pos] == ',':
+                pos += 1
+                continue
+            expect('}')
+            return
+
+
+def get_stats():
+    """캐시 통계 (loads: 호출 수, parses: 실제 파싱 수, writes: 저장 수,
+    group_commits/batched_updates: 그룹 커밋 횟수와 거기에 묶인 수정 수,
+    notices: 변경 로그로 받은 다른 프로세스의 쓰기 알림 수)"""
+    with _lock:
+        return {**_stats, 'notices': sum(feed.received for feed in _feeds.values())}
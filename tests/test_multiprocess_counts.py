@@ -0,0 +1,135 @@
+"""
+여러 프로세스가 같은 데이터 디렉터리에 좋아요/댓글을 동시에 쓴 뒤 연주 내역의
+like_count/comment_count가 실제 좋아요/댓글 수와 같은지 확인 (JSON 백엔드, 단일 파일/샤드)
+
+    python -m unittest tests.test_multiprocess_counts
+    python -m pytest tests/test_multiprocess_counts.py
+
+PROCS개 프로세스가 함께 시작해서 각자 THREADS개 스레드로 한 공연에 좋아요 토글과 댓글
+추가를 섞어 씁니다. 첫 프로세스가 WRITES번씩 쓰고 나면 프로세스 하나가 더 시작해서
+같은 일을 하고, 먼저 시작한 프로세스들은 그 프로세스가 끝날 때까지 계속 씁니다 - 새로
+시작하는 프로세스(get_backend의 시작 처리 포함)가 이미 쓰고 있는 프로세스들의 개수를
+어긋나게 하지 않는지 보려고.
+"""
+
+import multiprocessing
+import random
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "benchmarks"))
+
+from datagen import generate_dataset  # noqa: E402
+
+PROCS = 3               # 함께 시작하는 프로세스 수 (+ 도중에 시작하는 프로세스 하나)
+THREADS = 4             # 프로세스마다 쓰는 스레드 수
+WRITES = 20             # 스레드마다 쓰기 수 (좋아요 토글 또는 댓글 추가)
+USERS = 12              # 좋아요를 토글하는 사용자 수 (같은 사용자가 여러 번 토글하도록 적게)
+TIMEOUT = 300           # 초
+
+
+def run_writer(data_dir, worker, perf_id, start_at, started, stop, done):
+    """프로세스 하나 - THREADS개 스레드로 perf_id에 좋아요 토글/댓글 추가 -> done에 (번호, 댓글 수)
+
+    스레드마다 WRITES번 쓰고, stop이 있으면 stop이 설정될 때까지 더 씁니다.
+    started가 있으면 WRITES번씩 다 쓴 뒤에 설정합니다.
+    """
+    from opus_archive.service import get_archive
+
+    archive = get_archive(data_dir, 'json')
+    time.sleep(max(0.0, start_at - time.time()))
+    written = [0]
+    comments = [0]
+    lock = threading.Lock()
+
+    def write(thread):
+        rng = random.Random(worker * 1000 + thread)
+        i = 0
+        deadline = time.monotonic() + TIMEOUT
+        while i < WRITES or (stop is not None and not stop.is_set() and time.monotonic() < deadline):
+            if rng.random() < 0.5:
+                archive.toggle_like(perf_id, f"user{rng.randrange(USERS):05d}")
+            else:
+                archive.add_comment(perf_id, f"user{rng.randrange(USERS):05d}", f"댓글 {worker}-{thread}-{i}")
+                with lock:
+                    comments[0] += 1
+            i += 1
+            with lock:
+                written[0] += 1
+                if written[0] == THREADS * WRITES and started is not None:
+                    started.set()
+
+    threads = [threading.Thread(target=write, args=(t,)) for t in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.put((worker, comments[0]))
+
+
+class MultiProcessCountsTest(unittest.TestCase):
+    sharded = False
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmp.name) / "data"
+        generate_dataset(self.data_dir, 200, seed=7, log=lambda *a: None)
+        if self.sharded:
+            from opus_archive.reshard import to_sharded
+            to_sharded(self.data_dir, log=lambda *a: None)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _perf_id(self):
+        from opus_archive.backends.json_backend import JsonBackend
+        return JsonBackend(self.data_dir).get_public_performances()[0]['id']
+
+    def test_counts_match_after_concurrent_writes(self):
+        perf_id = self._perf_id()
+        context = multiprocessing.get_context('spawn')
+        done = context.Queue()
+        started = context.Event()
+        stop = context.Event()
+        start_at = time.time() + 3
+        procs = [context.Process(target=run_writer, args=(self.data_dir, w, perf_id, start_at,
+                                                          started if w == 0 else None, stop, done))
+                 for w in range(PROCS)]
+        for proc in procs:
+            proc.start()
+        self.assertTrue(started.wait(TIMEOUT), "첫 프로세스가 쓰기를 시작하지 못함")
+        late = context.Process(target=run_writer, args=(self.data_dir, PROCS, perf_id, 0, None, None, done))
+        late.start()
+        procs.append(late)
+        finished = dict([done.get(timeout=TIMEOUT)])     # 먼저 끝나는 것은 도중에 시작한 프로세스
+        stop.set()
+        finished.update(done.get(timeout=TIMEOUT) for _ in procs[1:])
+        for proc in procs:
+            proc.join(TIMEOUT)
+            self.assertEqual(proc.exitcode, 0)
+        self.assertEqual(sorted(finished), list(range(PROCS + 1)))
+
+        from opus_archive import store
+        from opus_archive.backends.json_backend import JsonBackend
+        store.invalidate()      # 캐시 없이 파일에서 다시 읽음
+        backend = JsonBackend(self.data_dir)
+        perf = backend.get_performance(perf_id)
+        comments = backend.get_comments_grouped([perf_id])[perf_id]
+        self.assertEqual(perf['like_count'], backend.get_like_counts([perf_id])[perf_id])
+        self.assertEqual(perf['comment_count'], len(comments))
+        added = [c for c in comments if c['content'].startswith("댓글 ")]
+        self.assertEqual(len(added), sum(finished.values()))
+
+
+class ShardedMultiProcessCountsTest(MultiProcessCountsTest):
+    sharded = True
+
+
+if __name__ == '__main__':
+    unittest.main()